@@ -94,6 +94,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file rather than shared-cache memory: concurrent writers in the
+        # worker tests then wait on the busy timeout instead of failing
+        # with "database table is locked".
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
@@ -143,6 +147,85 @@ MEDIA_ROOT = BASE_DIR / "media"
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Django REST Framework
+# Lists use keyset (cursor) pagination so that page cost stays flat however
+# deep a client pages. Clients may ask for ?page_size= up to the view's max.
+
+REST_FRAMEWORK = {
+    "DEFAULT_PAGINATION_CLASS": "jobs.pagination.KeysetCursorPagination",
+    "PAGE_SIZE": int(os.getenv("API_PAGE_SIZE", "50")),
+    "DEFAULT_RENDERER_CLASSES": [
+        "jobs.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
+# Cache
+# A table in the default database (created by migration jobs 0016), shared
+# by every process: web workers and run_workers see each other's entries
+# and deletes.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    }
+}
+
+# /api/jobs/stats/ is cached and dropped, for every process, whenever a job
+# or company changes; the timeout only bounds staleness from writes that
+# bypass both the ORM signals and jobs.stats.invalidate (raw SQL, other
+# clients of the database).
+JOB_STATS_CACHE_TIMEOUT = int(os.getenv("JOB_STATS_CACHE_TIMEOUT", "86400"))
+
+
+# Outbound HTTP for job post fetching (jobs.fetchers). One pooled client is
+# shared per process: FETCH_POOL_MAXSIZE keep-alive connections per host,
+# for up to FETCH_POOL_HOSTS hosts. 5xx responses and connection errors are
+# retried FETCH_RETRIES times with exponential backoff (FETCH_BACKOFF seconds
+# base). 429/503 are not retried in-process; instead they widen the gap
+# between requests to that host (from FETCH_THROTTLE_INTERVAL up to
+# FETCH_MAX_INTERVAL seconds, and at least Retry-After). After
+# FETCH_BREAKER_FAILURES failures in a row a host's circuit opens and
+# fetches fail fast for FETCH_BREAKER_COOLDOWN seconds. Callers wait at most
+# FETCH_MAX_WAIT seconds for a slot. See /api/diagnostics/fetch-hosts/.
+FETCH_POOL_MAXSIZE = int(os.getenv("FETCH_POOL_MAXSIZE", "10"))
+FETCH_POOL_HOSTS = int(os.getenv("FETCH_POOL_HOSTS", "32"))
+FETCH_RETRIES = int(os.getenv("FETCH_RETRIES", "3"))
+FETCH_BACKOFF = float(os.getenv("FETCH_BACKOFF", "0.5"))
+FETCH_THROTTLE_INTERVAL = float(os.getenv("FETCH_THROTTLE_INTERVAL", "1"))
+FETCH_MAX_INTERVAL = float(os.getenv("FETCH_MAX_INTERVAL", "60"))
+FETCH_MAX_WAIT = float(os.getenv("FETCH_MAX_WAIT", "10"))
+FETCH_BREAKER_FAILURES = int(os.getenv("FETCH_BREAKER_FAILURES", "5"))
+FETCH_BREAKER_COOLDOWN = float(os.getenv("FETCH_BREAKER_COOLDOWN", "60"))
+# Fetched pages are streamed to a temp file (kept in memory up to
+# FETCH_SPOOL_BYTES) and cut off past FETCH_MAX_BYTES.
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", str(5 * 1024 * 1024)))
+FETCH_SPOOL_BYTES = int(os.getenv("FETCH_SPOOL_BYTES", str(256 * 1024)))
+
+# Parse results are cached in the database by (SHA-256 of the HTML, job
+# board, parser version) (jobs.parse_cache). Past PARSE_CACHE_MAX_BYTES of
+# stored results the least recently used ones are evicted. See
+# /api/diagnostics/parse-cache/.
+PARSE_CACHE_MAX_BYTES = int(
+    os.getenv("PARSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Background tasks (jobs.tasks, run by `manage.py run_workers`). Failed tasks
+# are retried after TASK_RETRY_BACKOFF * 2**(attempt - 1) seconds; RUNNING
+# tasks whose worker has been silent for TASK_LOCK_TIMEOUT are requeued.
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+TASK_RETRY_BACKOFF = float(os.getenv("TASK_RETRY_BACKOFF", "30"))
+TASK_LOCK_TIMEOUT = int(os.getenv("TASK_LOCK_TIMEOUT", "900"))
+
+# POST /api/jobs/from-url/ (jobs.quick_entry) answers within
+# JOB_FROM_URL_BUDGET seconds; whatever is not done by then (fetch, parse,
+# company, job, store) finishes in the background, on one of
+# JOB_FROM_URL_WORKERS threads per process. Each intake is recorded as a
+# job_from_url task, so a worker finishes it if the process dies first.
+JOB_FROM_URL_BUDGET = float(os.getenv("JOB_FROM_URL_BUDGET", "5"))
+JOB_FROM_URL_WORKERS = int(os.getenv("JOB_FROM_URL_WORKERS", "4"))
+
+
 # CORS Development Configuration
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
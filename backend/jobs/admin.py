@@ -1,10 +1,9 @@
-from django.contrib import admin
-from django.core.files.base import ContentFile
-from django.db import transaction
-from jobs.models import Company, Job, Attachment
-from jobs.fetchers import fetch_job_post_html
-import mimetypes
-import traceback
+from django.contrib import admin, messages
+from django.utils import timezone
+from django.utils.html import format_html
+from jobs import tasks
+from jobs.parse_cache import cached_parse
+from jobs.models import Company, Job, Attachment, Task, FetchLog
 
 
 @admin.register(Company)
@@ -27,59 +26,60 @@ class JobAdmin(admin.ModelAdmin):
         "date_posted",
     )
     search_fields = ("position_title", "company__name")
-    list_filter = ("status", "is_remote", "employment_type", "role_type")
+    list_filter = (
+        "status",
+        "is_remote",
+        "employment_type",
+        "role_type",
+        ("posting_closed_at", admin.EmptyFieldListFilter),
+    )
     ordering = ("-priority",)
 
     actions = ["fetch_job_post"]
 
     def fetch_job_post(self, request, queryset):
-        """Admin action: fetch job post HTML and save it as an attachment."""
-        for job in queryset:
-            if not job.job_post_url:
-                self.message_user(request, f"{job} has no job_post_url set.")
-                continue
-
-            try:
-                html = fetch_job_post_html(job.job_post_url)
-                filename = (
-                    f"{job.company.name or 'unknown'}-{job.position_title}.html"
-                ).replace(" ", "_")
-
-                # Determine MIME type
-                mime_type, _ = mimetypes.guess_type(filename)
-                if mime_type != "text/html":
-                    mime_type = "text/html"
-
-                print(
-                    f"Fetched {len(html)} bytes from {job.job_post_url} [{mime_type}]")
-
-                # Remove old job_post attachments for this job
-                Attachment.objects.filter(job=job, type="job_post").delete()
-
-                # Save file and record atomically
-                with transaction.atomic():
-                    content = ContentFile(html.encode("utf-8"), name=filename)
-                    attachment = Attachment(job=job, type="job_post")
-                    attachment.file.save(filename, content, save=False)
-                    attachment.mime_type = mime_type
-                    attachment.save()
-
-                print(f"✅ Saved attachment: {attachment.file.name}")
-
-                self.message_user(
-                    request,
-                    f"✅ Saved job post HTML ({len(html)} bytes) for "
-                    f"'{job.position_title}' at {job.company.name}.",
-                )
-
-            except Exception as e:
-                print("❌ Error saving job post attachment:\n",
-                      traceback.format_exc())
-                self.message_user(request, f"❌ Error fetching {job}: {e}")
+        """Admin action: queue a background fetch of each job's post HTML."""
+        jobs = list(queryset.values_list("pk", "job_post_url"))
+        missing = [pk for pk, url in jobs if not url]
+        queued = tasks.enqueue_many(
+            "fetch_job_post", [{"job_id": str(pk)} for pk, url in jobs if url])
+
+        if missing:
+            self.message_user(
+                request, f"{len(missing)} job(s) have no job_post_url set.",
+                level=messages.WARNING)
+        self.message_user(
+            request,
+            f"Queued {len(queued)} job post fetch(es); progress is under "
+            "Tasks. Run `manage.py run_workers` to process them.",
+        )
 
     fetch_job_post.short_description = "Fetch and save job post HTML"
 
 
+@admin.register(FetchLog)
+class FetchLogAdmin(admin.ModelAdmin):
+    list_display = (
+        "job",
+        "status",
+        "changed",
+        "closed",
+        "size_bytes",
+        "duration_ms",
+        "fetched_at",
+    )
+    list_filter = ("status", "changed", "closed")
+    search_fields = ("url", "job__position_title", "job__company__name")
+    ordering = ("-fetched_at",)
+    list_select_related = ("job__company",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Attachment)
 class AttachmentAdmin(admin.ModelAdmin):
     list_display = (
@@ -93,3 +93,65 @@ class AttachmentAdmin(admin.ModelAdmin):
     list_filter = ("type",)
     search_fields = ("filename", "job__position_title", "job__company__name")
     ordering = ("-uploaded_at",)
+    readonly_fields = ("parsed_preview",)
+
+    @admin.display(description="Parsed fields")
+    def parsed_preview(self, obj):
+        """What jobs.parsing extracts from a stored job post (cached)."""
+        if obj.type != "job_post" or not obj.file:
+            return "-"
+        try:
+            with obj.file.open("rb") as file:
+                body = file.read()
+        except OSError as exc:
+            return f"Cannot read the file: {exc}"
+        fields = cached_parse(body, obj.job.job_post_url or "",
+                              sha256=obj.sha256).as_dict()
+        return format_html(
+            "<pre style='white-space: pre-wrap'>{}</pre>",
+            "\n".join(f"{name}: {value}" for name, value in fields.items()))
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        "name",
+        "status",
+        "attempts",
+        "max_attempts",
+        "created_at",
+        "run_after",
+        "finished_at",
+        "locked_by",
+    )
+    list_filter = ("status", "name")
+    search_fields = ("name", "payload", "error")
+    ordering = ("-created_at",)
+    readonly_fields = (
+        "name",
+        "payload",
+        "status",
+        "attempts",
+        "max_attempts",
+        "run_after",
+        "locked_by",
+        "locked_at",
+        "result",
+        "error",
+        "created_at",
+        "finished_at",
+    )
+
+    actions = ["retry"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def retry(self, request, queryset):
+        """Admin action: put failed/finished tasks back on the queue."""
+        count = queryset.exclude(status=Task.Status.RUNNING).update(
+            status=Task.Status.QUEUED, attempts=0, run_after=timezone.now(),
+            error="", finished_at=None)
+        self.message_user(request, f"Requeued {count} task(s).")
+
+    retry.short_description = "Retry selected tasks"
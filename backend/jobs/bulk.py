@@ -0,0 +1,191 @@
+"""
+Bulk create / update / delete for jobs.
+
+Each operation validates its whole payload up front and then writes in a
+single transaction with ``bulk_create``, one ``UPDATE`` (or
+``bulk_update`` for per-row changes) and one ``DELETE`` per table.
+``bulk_*`` writes skip model signals, so the side effects those signals
+normally take care of (search index, stats cache, attachment files) are
+done here in batches.
+"""
+from django.db import models, transaction
+from django.db.models.deletion import get_candidate_relations_to_delete
+from django.http import QueryDict
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from jobs import search, stats
+from jobs.filters import JobFilterSet
+from jobs.models import Attachment, Job
+from jobs.serializers import JobSerializer
+from jobs.storage import delete_files
+
+MAX_BULK_ITEMS = 1000
+
+_INDEXED = {name for name, _ in search.INDEXED_FIELDS}
+
+
+def _as_list(value, name):
+    if not isinstance(value, list) or not value:
+        raise ValidationError({name: "Expected a non-empty list."})
+    if len(value) > MAX_BULK_ITEMS:
+        raise ValidationError(
+            {name: f"At most {MAX_BULK_ITEMS} items per request."})
+    return value
+
+
+def select_jobs(data):
+    """
+    Resolve the target of a bulk update/delete.
+
+    ``{"ids": [...]}`` selects by primary key, ``{"filter": {...}}`` takes
+    the same parameters as ``GET /api/jobs/`` (see ``JobFilterSet``).
+    """
+    if "ids" in data:
+        ids = _as_list(data["ids"], "ids")
+        field = Job._meta.pk
+        try:
+            ids = [field.to_python(pk) for pk in ids]
+        except Exception:
+            raise ValidationError({"ids": "Invalid job id."}) from None
+        return Job.objects.filter(pk__in=ids)
+
+    if "filter" in data:
+        params = data["filter"]
+        if not isinstance(params, dict) or not params:
+            raise ValidationError({"filter": "Expected a non-empty object."})
+        query = QueryDict(mutable=True)
+        for key, value in params.items():
+            query.setlist(key, [str(v) for v in value] if isinstance(value, list) else [str(value)])
+        filterset = JobFilterSet(query, queryset=Job.objects.all())
+        if not filterset.is_valid():
+            raise ValidationError({"filter": filterset.errors})
+        unknown = set(params) - set(filterset.filters)
+        if unknown:
+            raise ValidationError(
+                {"filter": f"Unknown filter(s): {', '.join(sorted(unknown))}"})
+        return filterset.qs
+
+    raise ValidationError("Provide either 'ids' or 'filter'.")
+
+
+def _validated_changes(data, context):
+    serializer = JobSerializer(data=data, partial=True, context=context)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+def create_jobs(items, context):
+    """Validate and insert ``items``; returns the new job ids."""
+    items = _as_list(items, "items")
+    serializer = JobSerializer(data=items, many=True, context=context)
+    serializer.is_valid(raise_exception=True)
+
+    jobs = [Job(**validated) for validated in serializer.validated_data]
+    with transaction.atomic():
+        Job.objects.bulk_create(jobs, batch_size=500)
+        search.index_jobs([job.pk for job in jobs])
+        transaction.on_commit(stats.invalidate)
+    return [job.pk for job in jobs]
+
+
+def update_jobs(queryset, changes, context):
+    """
+    Apply the same partial ``changes`` to every selected job with a single
+    UPDATE. Returns the number of rows changed.
+    """
+    if not isinstance(changes, dict) or not changes:
+        raise ValidationError({"changes": "Expected a non-empty object."})
+    validated = _validated_changes(changes, context)
+
+    with transaction.atomic():
+        reindex = _INDEXED & set(validated)
+        ids = list(queryset.order_by().values_list("pk", flat=True)) if reindex else None
+        count = queryset.order_by().update(**validated, updated_at=timezone.now())
+        if reindex:
+            search.index_jobs(ids)
+        transaction.on_commit(stats.invalidate)
+    return count
+
+
+def update_job_items(items, context):
+    """Apply per-row partial changes: ``[{"id": ..., <field>: ...}, ...]``."""
+    items = _as_list(items, "items")
+    field = Job._meta.pk
+    changes = {}
+    for item in items:
+        if not isinstance(item, dict) or "id" not in item:
+            raise ValidationError({"items": "Every item needs an 'id'."})
+        data = {k: v for k, v in item.items() if k != "id"}
+        try:
+            pk = field.to_python(item["id"])
+        except Exception:
+            raise ValidationError(
+                {"items": f"Invalid job id {item['id']!r}."}) from None
+        changes[pk] = _validated_changes(data, context)
+
+    fields = sorted({name for validated in changes.values() for name in validated})
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = Job.objects.only("pk", *fields).in_bulk(list(changes))
+        missing = set(changes) - set(jobs)
+        if missing:
+            raise ValidationError(
+                {"items": f"Unknown job id(s): {', '.join(map(str, missing))}"})
+        for pk, job in jobs.items():
+            for name, value in changes[pk].items():
+                setattr(job, name, value)
+            job.updated_at = now
+        Job.objects.bulk_update(
+            jobs.values(), fields=[*fields, "updated_at"], batch_size=500)
+        if _INDEXED & set(fields):
+            search.index_jobs(list(jobs))
+        transaction.on_commit(stats.invalidate)
+    return list(jobs)
+
+
+def _delete_referrers(model, selected):
+    """
+    Apply ``on_delete`` for every table pointing at the ``selected`` rows
+    of ``model`` (a ``values("pk")`` queryset), one statement per table:
+    the relations Django's collector would follow, without loading rows.
+    """
+    for rel in get_candidate_relations_to_delete(model._meta):
+        rows = rel.related_model._base_manager.filter(
+            **{f"{rel.field.name}__in": selected})
+        if rel.on_delete is models.CASCADE:
+            _delete_referrers(rel.related_model, rows.values("pk"))
+            rows._raw_delete(rows.db)
+        elif rel.on_delete is models.SET_NULL:
+            rows.update(**{rel.field.name: None})
+        elif rel.on_delete is not models.DO_NOTHING:
+            raise NotImplementedError(
+                f"Bulk delete cannot apply on_delete="
+                f"{rel.on_delete.__name__} of {rel.field}.")
+
+
+def delete_jobs(queryset):
+    """
+    Delete the selected jobs and whatever points at them (attachments,
+    fetch logs, ...) with one statement per table, then remove the
+    attachment files in batches after commit.
+    Returns the number of jobs deleted.
+    """
+    selected = queryset.order_by().values("pk")
+    with transaction.atomic():
+        ids = list(selected.values_list("pk", flat=True))
+        if not ids:
+            return 0
+        # _raw_delete skips the per-object collector and its signals; the
+        # signal side effects (files, search index) are batched here.
+        names = list(Attachment.objects.filter(
+            job__in=selected).values_list("file", flat=True))
+        _delete_referrers(Job, selected)
+        search.remove_jobs(ids)
+        jobs = Job.objects.filter(pk__in=selected)
+        count = jobs._raw_delete(jobs.db)
+
+        storage = Attachment._meta.get_field("file").storage
+        transaction.on_commit(lambda: delete_files(storage, names))
+        transaction.on_commit(stats.invalidate)
+    return count
@@ -0,0 +1,190 @@
+"""
+Concurrent, per-host polite crawler for job post URLs.
+
+URLs are grouped by host. Every host gets a token bucket (``rate``
+requests/second, ``burst`` tokens) and at most ``per_host`` requests in
+flight; a bounded thread pool runs all hosts side by side. Throughput
+therefore grows with the number of distinct hosts while each single host
+sees no more than ``rate`` requests/second.
+
+An optional ``total_rate`` additionally caps requests/second across all
+hosts, to spread a fixed budget of requests over a window.
+
+A ``429``/``503`` response pauses its whole host for ``Retry-After``
+seconds (or an exponential backoff when the header is missing) and the URL
+is put back in the host's queue, up to ``max_attempts`` tries.
+
+Bodies are streamed to spooled temp files with the same size cap and
+content-type check as ``jobs.fetchers.fetch_job_post``; a ``304`` to a
+conditional request yields an empty page with ``not_modified`` set. ``Crawler.crawl``
+yields ``FetchResult`` objects in the calling thread as they complete, so
+callers can write to the database without sharing connections across
+threads.
+"""
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+
+from jobs.fetchers import (
+    THROTTLE_STATUSES, FetchedPage, HttpClient, host_of, parse_retry_after,
+    read_page)
+
+
+class TokenBucket:
+    """Thread-safe token bucket; ``acquire`` blocks until a token is free."""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity,
+                              self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = self.clock()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now,
+                           (1 - self.tokens) / self.rate if self.rate else 1.0)
+            self.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every caller back for ``seconds`` (e.g. ``Retry-After``)."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, self.clock() + seconds)
+            # Resume with a single token rather than a full burst.
+            self.tokens = 1.0
+            self.updated = self.paused_until
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: Optional[int] = None
+    # FetchedPage with the streamed body; the consumer closes it.
+    page: Optional[FetchedPage] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class Crawler:
+    def __init__(self, rate=1.0, burst=1, per_host=2, workers=16,
+                 max_attempts=3, backoff=5.0, timeout=(5, 15), max_bytes=None,
+                 client=None, total_rate=None):
+        self.rate = rate
+        self.burst = burst
+        self.per_host = per_host
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        # Throttling statuses are handled here (per host), not by urllib3.
+        self.client = client or HttpClient(
+            pool_maxsize=per_host, pool_connections=max(workers, 10),
+            retries=2, retry_statuses=())
+        self.buckets = defaultdict(lambda: TokenBucket(self.rate, self.burst))
+        self.total = TokenBucket(total_rate) if total_rate else None
+
+    def crawl(self, urls, headers=None):
+        """
+        Fetch ``urls`` concurrently; yields a ``FetchResult`` per URL.
+        ``headers`` maps a URL to extra request headers (e.g. validators).
+        """
+        headers = headers or {}
+        hosts = defaultdict(deque)
+        for url in dict.fromkeys(urls):
+            hosts[host_of(url)].append([url, 0])
+        if not hosts:
+            return
+
+        remaining = sum(len(pending) for pending in hosts.values())
+        results = queue.Queue()
+        runners = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for host, pending in hosts.items():
+                lock = threading.Lock()
+                for _ in range(min(self.per_host, len(pending))):
+                    runners.append(pool.submit(
+                        self._run_host, host, pending, lock, results, headers))
+            while remaining:
+                item = results.get()
+                if isinstance(item, BaseException):
+                    raise item
+                remaining -= 1
+                yield item
+        for runner in runners:
+            runner.result()
+
+    def _run_host(self, host, pending, lock, results, headers):
+        bucket = self.buckets[host]
+        try:
+            while True:
+                with lock:
+                    if not pending:
+                        return
+                    entry = pending.popleft()
+                bucket.acquire()
+                if self.total is not None:
+                    self.total.acquire()
+                entry[1] += 1
+                result, retry_in = self._fetch(
+                    entry[0], entry[1], headers.get(entry[0]))
+                if retry_in is not None and entry[1] < self.max_attempts:
+                    bucket.pause(retry_in)
+                    with lock:
+                        pending.append(entry)
+                    continue
+                results.put(result)
+        except BaseException as exc:  # surface bugs in the caller's thread
+            results.put(exc)
+
+    def _fetch(self, url, attempt, headers=None):
+        """Return ``(FetchResult, retry_in)``; ``retry_in`` set if throttled."""
+        start = time.perf_counter()
+        result = FetchResult(url=url, attempts=attempt)
+        try:
+            resp = self.client.get(url, timeout=self.timeout, headers=headers,
+                                   allow_redirects=True, stream=True)
+            result.status = resp.status_code
+            if resp.status_code in THROTTLE_STATUSES:
+                resp.close()
+                result.error = f"HTTP {resp.status_code}"
+                retry_in = parse_retry_after(resp.headers.get("Retry-After"))
+                if retry_in is None:
+                    retry_in = self.backoff * 2 ** (attempt - 1)
+                return result, retry_in
+            if resp.status_code >= 400:
+                resp.close()
+                result.error = f"HTTP {resp.status_code}"
+                return result, None
+            result.page = read_page(resp, self.max_bytes)
+        except (requests.RequestException, ValueError) as exc:
+            result.error = str(exc)
+        finally:
+            result.elapsed = time.perf_counter() - start
+        return result, None
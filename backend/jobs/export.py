@@ -0,0 +1,192 @@
+"""
+Streaming CSV / NDJSON export.
+
+Rows are read with ``values().iterator(chunk_size=...)`` and written out a
+chunk at a time through ``StreamingHttpResponse``, so memory stays flat
+however many rows match. Related columns (``company__name``) come from the
+same joined query.
+
+In CSV, JSON columns are flattened into one column per key path
+(``education.bachelor.requirement``); lists of scalars are joined with
+``"; "``. Since JSON shapes vary between rows, the header is built from a
+first streaming pass over the JSON columns only, keeping just the set of
+paths seen. NDJSON keeps JSON values nested and needs a single pass.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.http import StreamingHttpResponse
+
+from .models import Company, Job
+from .renderers import orjson
+
+CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+LIST_SEPARATOR = "; "
+
+
+class ExportSpec:
+    """
+    What to export from a model: its scalar columns, the JSON columns to
+    flatten and any joined ``<relation>__<field>`` columns (nested under
+    ``<relation>`` in NDJSON, ``<relation>.<field>`` in CSV). Fields in
+    ``exclude`` are internal and left out.
+    """
+
+    def __init__(self, model, related=(), exclude=()):
+        self.model = model
+        self.columns = []
+        self.json_fields = []
+        for field in model._meta.concrete_fields:
+            if field.name in exclude:
+                continue
+            if isinstance(field, models.JSONField):
+                self.json_fields.append(field.name)
+            else:
+                self.columns.append(field.attname)
+        self.related = list(related)
+
+    def values(self, queryset):
+        return queryset.values(*self.columns, *self.related, *self.json_fields)
+
+
+JOB_EXPORT = ExportSpec(Job, related=[
+    "company__name", "company__website", "company__industry", "company__size",
+])
+COMPANY_EXPORT = ExportSpec(Company, exclude=["name_key"])
+
+
+# ----------------------------------------------------------------------
+# Cell conversion
+# ----------------------------------------------------------------------
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, list):
+        if any(isinstance(item, (dict, list)) for item in value):
+            return json.dumps(value, ensure_ascii=False)
+        return LIST_SEPARATOR.join("" if item is None else str(item)
+                                   for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False) if value else ""
+    return value
+
+
+def _walk(value, path, out):
+    """Collect ``path -> leaf`` for every non-dict leaf under ``value``."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _walk(item, (*path, str(key)), out)
+    else:
+        out[path] = value
+
+
+def json_paths(queryset, spec, chunk_size=CHUNK_SIZE):
+    """
+    First pass for CSV: the key paths present in each JSON column, in
+    first-seen order. Only the path set is kept in memory.
+    """
+    paths = {name: {} for name in spec.json_fields}
+    if not spec.json_fields:
+        return {}
+    rows = queryset.order_by().values_list(*spec.json_fields)
+    for row in rows.iterator(chunk_size=chunk_size):
+        for name, value in zip(spec.json_fields, row):
+            if value in (None, {}, []):
+                continue
+            leaves = {}
+            _walk(value, (), leaves)
+            for path in leaves:
+                paths[name].setdefault(path, None)
+    return {name: list(found) for name, found in paths.items()}
+
+
+# ----------------------------------------------------------------------
+# Writers
+# ----------------------------------------------------------------------
+
+def csv_chunks(queryset, spec, chunk_size=CHUNK_SIZE):
+    paths = json_paths(queryset, spec, chunk_size)
+    header = list(spec.columns)
+    header += [column.replace("__", ".") for column in spec.related]
+    for name in spec.json_fields:
+        header += [".".join((name, *path)) if path else name
+                   for path in paths[name]]
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    scalar = [*spec.columns, *spec.related]
+
+    for n, row in enumerate(spec.values(queryset).iterator(
+            chunk_size=chunk_size), 1):
+        cells = [_cell(row[column]) for column in scalar]
+        for name in spec.json_fields:
+            leaves = {}
+            value = row[name]
+            if value is not None:
+                _walk(value, (), leaves)
+            cells += [_cell(leaves.get(path)) for path in paths[name]]
+        writer.writerow(cells)
+        if n % chunk_size == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _json_default(value):
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError
+
+
+if orjson is not None:
+    def _dumps(value):
+        return orjson.dumps(value, default=_json_default,
+                            option=orjson.OPT_UTC_Z)
+else:  # pragma: no cover - orjson is in requirements.txt
+    def _dumps(value):
+        return json.dumps(value, cls=DjangoJSONEncoder,
+                          ensure_ascii=False).encode("utf-8")
+
+
+def ndjson_chunks(queryset, spec, chunk_size=CHUNK_SIZE):
+    lines = []
+    for row in spec.values(queryset).iterator(chunk_size=chunk_size):
+        for column in spec.related:
+            relation, field = column.split("__", 1)
+            row.setdefault(relation, {})[field] = row.pop(column)
+        lines.append(_dumps(row))
+        if len(lines) == chunk_size:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+WRITERS = {"csv": csv_chunks, "ndjson": ndjson_chunks}
+
+
+def stream(queryset, spec, fmt, filename, chunk_size=CHUNK_SIZE):
+    """Return a ``StreamingHttpResponse`` exporting ``queryset`` as ``fmt``."""
+    response = StreamingHttpResponse(
+        WRITERS[fmt](queryset, spec, chunk_size),
+        content_type=CONTENT_TYPES[fmt],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    return response
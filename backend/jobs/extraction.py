@@ -0,0 +1,77 @@
+"""
+Filling ``Job`` fields from stored job posts.
+
+Stored posts are parsed by ``jobs.parse_worker.parse_stored``, which only
+touches storage so it can run in a worker process. ``apply_parsed``
+copies a ``ParsedJob`` onto its ``Job`` without saving, for the caller to
+``bulk_update``. ``pending_attachments`` lists the posts that still need a parse by the current ``PARSER_VERSION``:
+an attachment is skipped once its ``sha256`` was parsed by that version.
+"""
+from django.db.models import Exists, F, OuterRef, Q
+
+from jobs.models import Attachment, Job
+from jobs.parsing import PARSER_VERSION
+
+# ParsedJob fields copied onto Job. Company changes are left to the user.
+JOB_FIELDS = (
+    "position_title", "location", "is_remote", "department",
+    "employment_type", "date_posted", "salary_min", "salary_max",
+    "salary_currency", "salary_raw", "about", "responsibilities",
+    "requirements", "benefits",
+)
+CURRENCIES = set(Job.Currency.values)
+
+
+def pending_attachments(version=PARSER_VERSION):
+    """
+    The newest ``job_post`` attachment of each job, unless its current
+    content was already parsed by ``version``.
+    """
+    newer = Attachment.objects.filter(
+        job=OuterRef("job"), type="job_post",
+        uploaded_at__gt=OuterRef("uploaded_at"))
+    return (
+        Attachment.objects
+        .filter(type="job_post")
+        .exclude(file="")
+        .filter(~Exists(newer))
+        .exclude(Q(parser_version=version) & ~Q(sha256="")
+                 & Q(parsed_sha256=F("sha256")))
+    )
+
+
+def local_path(attachment):
+    """The attachment file's path on local disk, if the storage has one."""
+    try:
+        return attachment.file.path
+    except NotImplementedError:  # remote storage (S3)
+        return None
+
+
+def _clean(job, name, value):
+    if name == "salary_currency" and value not in CURRENCIES:
+        return Job.Currency.OTHER
+    limit = getattr(job._meta.get_field(name), "max_length", None)
+    if limit and isinstance(value, str):
+        return value[:limit]
+    return value
+
+
+def apply_parsed(job, parsed, overwrite=False):
+    """
+    Copy found fields of ``parsed`` onto ``job`` (not saved). Fields the
+    job already has are kept unless ``overwrite``. Returns the names of
+    the fields that changed.
+    """
+    changed = []
+    for name in JOB_FIELDS:
+        value = getattr(parsed, name)
+        if value is None:
+            continue
+        current = getattr(job, name)
+        empty = current in (None, "") or (name == "is_remote" and not current)
+        value = _clean(job, name, value)
+        if (overwrite or empty) and current != value:
+            setattr(job, name, value)
+            changed.append(name)
+    return changed
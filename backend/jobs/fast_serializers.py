@@ -0,0 +1,259 @@
+"""
+Read-only fast path for list endpoints.
+
+``ValuesSerializer`` is compiled once per request from a bound DRF
+``ModelSerializer`` and then builds the exact same primitives straight from
+``QuerySet.values()`` rows: no model instances, no per-row ``get_attribute``
+traversal, and a precomputed converter per column. Nested serializers become
+joined ``company__*`` columns and nested ``many=True`` serializers over a
+reverse foreign key become a single extra ``values()`` query.
+
+Output is only produced for field types whose representation is known to be
+reproducible; anything else makes ``compile`` return ``None`` so the caller
+falls back to the regular serializer.
+"""
+import re
+from collections import defaultdict
+
+from django.db import models
+from django.db.models.fields.files import FieldFile
+from django.db.models.functions import Cast
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .renderers import orjson
+
+# DRF fields whose to_representation() is the identity for the Python value
+# the database driver hands back.
+_IDENTITY_FIELDS = (
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+)
+
+# DRF fields whose to_representation() is reused as-is (bound method).
+_BOUND_FIELDS = (
+    serializers.DecimalField,
+    serializers.DateField,
+)
+
+
+def _exact_floats(value):
+    """
+    Wrap floats whose ``repr`` orjson would spell differently (``1e+16`` vs
+    ``1e16``) in a raw fragment so the fast renderer stays byte-identical
+    to ``json.dumps``.
+    """
+    if isinstance(value, float):
+        text = repr(value)
+        return orjson.Fragment(text) if "e" in text else value
+    if isinstance(value, dict):
+        return {k: _exact_floats(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_exact_floats(v) for v in value]
+    return value
+
+
+_EXPONENT = re.compile(r"\d[eE][-+]?\d")
+
+
+def _load_json(text):
+    """Decode a raw JSON column with orjson instead of Django's json.loads."""
+    value = orjson.loads(text)
+    if _EXPONENT.search(text):
+        value = _exact_floats(value)
+    return value
+
+
+def _datetime_converter(field):
+    """
+    ``DateTimeField.to_representation`` with the timezone lookup hoisted out
+    of the per-row path (it goes through a thread-local on every call).
+    """
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+    tz = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+    if tz is None:
+        return field.to_representation
+
+    def convert(value):
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        text = value.astimezone(tz).isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    return convert
+
+
+def _pk_converter(model):
+    if isinstance(model._meta.pk, models.UUIDField):
+        return str
+    return None
+
+
+class ValuesSerializer:
+    """Compiled, read-only mirror of a ``ModelSerializer`` over values() rows."""
+
+    def __init__(self, model, prefix=""):
+        self.model = model
+        self.prefix = prefix
+        self.columns = []
+        # alias -> expression, for columns read through an annotation
+        self.expressions = {}
+        # Output keys in serializer order; rows start as dict.fromkeys(keys)
+        # so the key order matches the serializer however steps are grouped.
+        self.keys = []
+        # (output key, column, converter or None)
+        self.steps = []
+        # (output key, pk column, nested ValuesSerializer)
+        self.nested = []
+        # (output key, fk name on child, child ValuesSerializer)
+        self.many = []
+
+    # ------------------------------------------------------------------
+    # Compilation
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def compile(cls, serializer, prefix=""):
+        """Build a plan for ``serializer`` or return ``None`` if unsupported."""
+        model = serializer.Meta.model
+        plan = cls(model, prefix)
+        opts = model._meta
+
+        for field in serializer._readable_fields:
+            source = field.source
+            if "." in source or source == "*":
+                return None
+            key = field.field_name
+            column = prefix + source
+            plan.keys.append(key)
+
+            if isinstance(field, serializers.ListSerializer):
+                child = field.child
+                if not isinstance(child, serializers.ModelSerializer):
+                    return None
+                try:
+                    rel = opts.get_field(source)
+                except Exception:
+                    return None
+                if not isinstance(rel, models.ManyToOneRel):
+                    return None
+                child_plan = cls.compile(child)
+                if child_plan is None:
+                    return None
+                plan.many.append((key, rel.field.name, child_plan))
+                continue
+
+            if isinstance(field, serializers.ModelSerializer):
+                try:
+                    fk = opts.get_field(source)
+                except Exception:
+                    return None
+                if not isinstance(fk, models.ForeignKey):
+                    return None
+                child_plan = cls.compile(field, prefix=f"{column}__")
+                if child_plan is None or child_plan.many:
+                    return None
+                related_pk = f"{column}__{fk.related_model._meta.pk.name}"
+                plan.nested.append((key, related_pk, child_plan))
+                plan.columns.append(related_pk)
+                plan.columns.extend(child_plan.columns)
+                plan.expressions.update(child_plan.expressions)
+                continue
+
+            try:
+                model_field = opts.get_field(source)
+            except Exception:
+                return None
+
+            if isinstance(field, serializers.PrimaryKeyRelatedField):
+                if field.pk_field is not None:
+                    return None
+                converter = _pk_converter(model_field.related_model)
+            elif isinstance(field, serializers.FileField):
+                converter = cls._file_converter(field, model_field)
+            elif isinstance(field, serializers.UUIDField):
+                if field.uuid_format != "hex_verbose":
+                    return None
+                converter = str
+            elif isinstance(field, serializers.JSONField):
+                if field.binary:
+                    return None
+                converter = None
+                if orjson is not None:
+                    # Read the stored JSON text and decode it with orjson.
+                    alias = "_json_" + column.replace("__", "_")
+                    plan.expressions[alias] = Cast(column, models.TextField())
+                    plan.steps.append((key, alias, _load_json))
+                    continue
+            elif isinstance(field, serializers.DateTimeField):
+                converter = _datetime_converter(field)
+            elif isinstance(field, _BOUND_FIELDS):
+                converter = field.to_representation
+            elif isinstance(field, _IDENTITY_FIELDS):
+                converter = None
+            else:
+                return None
+
+            plan.steps.append((key, column, converter))
+            plan.columns.append(column)
+
+        if plan.many:
+            # Needed to attach the reverse relation rows to their parent.
+            plan.columns.append(prefix + opts.pk.name)
+        return plan
+
+    @staticmethod
+    def _file_converter(field, model_field):
+        def convert(name):
+            return field.to_representation(FieldFile(None, model_field, name))
+        return convert
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def values(self, queryset, extra=()):
+        """Turn ``queryset`` into a values() queryset carrying every column."""
+        columns = list(dict.fromkeys([*self.columns, *extra]))
+        return queryset.prefetch_related(None).values(
+            *columns, **self.expressions)
+
+    def build(self, rows):
+        """Convert an iterable of values() dicts into serialized dicts."""
+        rows = list(rows)
+        related = [
+            (key, self._fetch_many(fk_name, child, rows))
+            for key, fk_name, child in self.many
+        ]
+        pk_name = self.model._meta.pk.name
+        return [self._row(row, related, pk_name) for row in rows]
+
+    def _row(self, row, related=(), pk_name=None):
+        out = dict.fromkeys(self.keys)
+        for key, column, converter in self.steps:
+            value = row[column]
+            if value is not None and converter is not None:
+                value = converter(value)
+            out[key] = value
+        for key, pk_column, child in self.nested:
+            out[key] = None if row[pk_column] is None else child._row(row)
+        for key, grouped in related:
+            out[key] = grouped.get(row[pk_name], [])
+        return out
+
+    def _fetch_many(self, fk_name, child, rows):
+        parent_pk = self.model._meta.pk.name
+        ids = [row[parent_pk] for row in rows]
+        grouped = defaultdict(list)
+        if not ids:
+            return grouped
+        child_rows = list(child.model._default_manager.filter(
+            **{f"{fk_name}__in": ids}).values(
+                *dict.fromkeys([*child.columns, fk_name]), **child.expressions))
+        built = child.build(child_rows)
+        for raw, data in zip(child_rows, built):
+            grouped[raw[fk_name]].append(data)
+        return grouped
@@ -1,39 +1,485 @@
+import hashlib
+import logging
+import tempfile
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
 import requests
+from django.conf import settings
 from requests.adapters import HTTPAdapter, Retry
 
+logger = logging.getLogger(__name__)
 
 HEADERS = {
     "User-Agent": "CTS-LocalFetcher/0.1 (local dev)"
 }
 
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# "Slow down" answers; with a HostGuard these are not retried in-process.
+THROTTLE_STATUSES = (429, 503)
+
+
+def host_of(url):
+    return urlsplit(url).netloc.lower()
+
+
+class HttpClient:
+    """
+    Process-wide pooled HTTP client.
+
+    One ``HTTPAdapter`` (a urllib3 pool manager, which is thread-safe) is
+    shared by every thread, so keep-alive connections and TLS sessions are
+    reused across fetches to the same host. ``requests.Session`` itself is
+    not thread-safe (cookie jar, adapters dict), so each thread gets its own
+    lightweight session mounted on the shared adapter.
+
+    With a ``HostGuard`` every request is checked against (and reported to)
+    its host's rate limit and circuit breaker.
+    """
+
+    def __init__(self, pool_maxsize=10, pool_connections=32, retries=3,
+                 backoff_factor=0.5, headers=None,
+                 retry_statuses=RETRY_STATUSES, guard=None):
+        self.headers = dict(headers or HEADERS)
+        self.guard = guard
+        if guard is not None:
+            # Throttling is the guard's job; retrying it here would keep
+            # hammering a host that asked us to slow down.
+            retry_statuses = tuple(
+                s for s in retry_statuses if s not in THROTTLE_STATUSES)
+        self.retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=retry_statuses,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            # Otherwise urllib3 retries any 429/503 carrying a Retry-After,
+            # whatever the status list, and sleeps it out uncapped without
+            # the guard ever seeing the throttle. Retry-After is the
+            # guard's to honour.
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=self.retry,
+        )
+        self._local = threading.local()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            pool_maxsize=settings.FETCH_POOL_MAXSIZE,
+            pool_connections=settings.FETCH_POOL_HOSTS,
+            retries=settings.FETCH_RETRIES,
+            backoff_factor=settings.FETCH_BACKOFF,
+            guard=HostGuard.from_settings(),
+        )
+
+    @property
+    def session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            session.mount("https://", self.adapter)
+            session.mount("http://", self.adapter)
+            self._local.session = session
+        return session
+
+    def get(self, url, **kwargs):
+        if self.guard is None:
+            return self.session.get(url, **kwargs)
+        host = host_of(url)
+        self.guard.before(host)
+        try:
+            resp = self.session.get(url, **kwargs)
+        except BaseException:
+            self.guard.record(host)
+            raise
+        self.guard.record(host, resp.status_code,
+                          resp.headers.get("Retry-After"))
+        return resp
+
+    def close(self):
+        """Drop every pooled connection."""
+        self.adapter.close()
+
+
+def parse_retry_after(value, now=None):
+    """
+    Seconds to wait according to a ``Retry-After`` header (delta-seconds or
+    HTTP-date), or ``None`` if absent/unparseable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (now or time.time()))
+
+
+class HostUnavailable(requests.RequestException):
+    """A request refused locally because its host is being backed off."""
+
+    def __init__(self, host, retry_in, reason):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"{host} is {reason}; retry in {retry_in:.0f}s")
+
+
+class HostState:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, host):
+        self.host = host
+        self.breaker = self.CLOSED
+        self.failures = 0          # consecutive
+        self.interval = 0.0        # enforced gap between requests (seconds)
+        self.next_at = 0.0         # clock time the next request may start
+        self.open_until = 0.0
+        self.probing = False       # half-open trial request in flight
+        self.last_status = None
+        self.requests = self.throttled = self.errors = self.rejected = 0
+
+
+class HostGuard:
+    """
+    Per-host adaptive rate limit and circuit breaker, shared by all threads.
+
+    Rate: each 429/503 doubles the gap enforced between requests to the
+    host (from ``throttle_interval`` up to ``max_interval``) and holds it
+    back for at least ``Retry-After``; each success shrinks the gap by
+    ``decay`` until it is gone again.
+
+    Breaker: ``failures`` errors in a row (429/503, other 5xx, connection
+    errors) open it for ``cooldown`` seconds, or ``Retry-After`` if longer,
+    and requests fail fast with ``HostUnavailable``. After that a single
+    probe is let through; success closes the breaker, failure re-opens it.
+
+    Nobody sleeps more than ``max_wait`` for a slot; longer waits raise
+    ``HostUnavailable`` too. State is per process.
+    """
+
+    def __init__(self, failures=5, cooldown=60.0, throttle_interval=1.0,
+                 max_interval=60.0, max_wait=10.0, decay=0.8,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.throttle_interval = throttle_interval
+        self.max_interval = max_interval
+        self.max_wait = max_wait
+        self.decay = decay
+        self.clock = clock
+        self.sleep = sleep
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            failures=settings.FETCH_BREAKER_FAILURES,
+            cooldown=settings.FETCH_BREAKER_COOLDOWN,
+            throttle_interval=settings.FETCH_THROTTLE_INTERVAL,
+            max_interval=settings.FETCH_MAX_INTERVAL,
+            max_wait=settings.FETCH_MAX_WAIT,
+        )
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(host)
+        return state
+
+    def _reject(self, state, retry_in, reason):
+        state.rejected += 1
+        raise HostUnavailable(state.host, retry_in, reason)
+
+    def before(self, host):
+        """Wait for ``host``'s next slot, or raise ``HostUnavailable``."""
+        while True:
+            with self._lock:
+                state = self._state(host)
+                now = self.clock()
+                if state.breaker == HostState.OPEN:
+                    if now < state.open_until:
+                        self._reject(state, state.open_until - now,
+                                     "failing (circuit open)")
+                    state.breaker = HostState.HALF_OPEN
+                if state.breaker == HostState.HALF_OPEN and state.probing:
+                    self._reject(state, self.cooldown,
+                                 "failing (probe in flight)")
+                wait = state.next_at - now
+                if wait > self.max_wait:
+                    self._reject(state, wait, "rate limited")
+                if wait <= 0:
+                    state.next_at = now + state.interval
+                    state.requests += 1
+                    state.probing = state.breaker == HostState.HALF_OPEN
+                    return
+            self.sleep(wait)
+
+    def record(self, host, status=None, retry_after=None):
+        """Feed back a response status (``None`` for a transport error)."""
+        with self._lock:
+            state = self._state(host)
+            now = self.clock()
+            state.last_status = status
+            state.probing = False
+            throttled = status in THROTTLE_STATUSES
+            delay = (parse_retry_after(retry_after) if throttled else None) or 0
+
+            if throttled:
+                state.throttled += 1
+                state.interval = min(self.max_interval, max(
+                    state.interval * 2, self.throttle_interval))
+                state.next_at = max(state.next_at,
+                                    now + max(state.interval, delay))
+            elif status is None or status >= 500:
+                state.errors += 1
+            else:
+                state.interval *= self.decay
+                if state.interval < self.throttle_interval / 16:
+                    state.interval = 0.0
+                if state.breaker != HostState.CLOSED:
+                    logger.info("Circuit for %s closed", host)
+                state.breaker = HostState.CLOSED
+                state.failures = 0
+                return
+
+            state.failures += 1
+            if (state.breaker == HostState.HALF_OPEN
+                    or state.failures >= self.failures):
+                if state.breaker != HostState.OPEN:
+                    logger.warning("Circuit for %s opened after %d failures",
+                                   host, state.failures)
+                state.breaker = HostState.OPEN
+                state.open_until = now + max(self.cooldown, delay)
+
+    def snapshot(self):
+        """Current per-host state, for diagnostics."""
+        with self._lock:
+            now = self.clock()
+            return [{
+                "host": state.host,
+                "breaker": state.breaker,
+                "failures": state.failures,
+                "interval": round(state.interval, 3),
+                "retry_in": round(max(
+                    0.0, state.next_at - now,
+                    state.open_until - now
+                    if state.breaker == HostState.OPEN else 0.0), 3),
+                "last_status": state.last_status,
+                "requests": state.requests,
+                "throttled": state.throttled,
+                "errors": state.errors,
+                "rejected": state.rejected,
+            } for state in sorted(self._hosts.values(),
+                                  key=lambda state: state.host)]
+
+    def reset(self, host=None):
+        """Forget the state of ``host`` (or of every host)."""
+        with self._lock:
+            if host is None:
+                self._hosts.clear()
+            else:
+                self._hosts.pop(host, None)
 
-def fetch_job_post_html(url: str, timeout=(5, 15)) -> str:
-    """Fetch raw HTML for a job post URL and return it as text."""
-    session = requests.Session()
-    retries = Retry(
-        total=2,
-        backoff_factor=0.3,
-        status_forcelist=[429, 500, 502, 503, 504],
-    )
-    session.mount("https://", HTTPAdapter(max_retries=retries))
-    session.mount("http://", HTTPAdapter(max_retries=retries))
-
-    print(f"Fetching {url} ...")
-    resp = session.get(url, headers=HEADERS,
-                       timeout=timeout, allow_redirects=True)
-    resp.raise_for_status()
 
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Return the shared client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient.from_settings()
+    return _client
+
+
+def reset_client():
+    """Close the shared client; the next fetch builds a new one."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+class ResponseTooLarge(ValueError):
+    pass
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class FetchedPage:
+    """
+    A response body streamed into a spooled temporary file (in memory up
+    to ``FETCH_SPOOL_BYTES``, then on disk), with its size and SHA-256
+    computed while it was read. Use as a context manager or ``close()``.
+
+    A ``304 Not Modified`` answer to a conditional request is an empty page
+    with ``not_modified`` set.
+    """
+
+    def __init__(self, url, status, content_type, charset=None,
+                 spool_bytes=None, etag="", last_modified=""):
+        self.url = url
+        self.status = status
+        self.content_type = content_type
+        self.charset = charset
+        # Validators to send back as If-None-Match / If-Modified-Since.
+        self.etag = etag
+        self.last_modified = last_modified
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self.file = tempfile.SpooledTemporaryFile(
+            max_size=settings.FETCH_SPOOL_BYTES if spool_bytes is None
+            else spool_bytes)
+
+    @classmethod
+    def from_response(cls, resp):
+        content_type = resp.headers.get("content-type", "")
+        return cls(resp.url, resp.status_code, content_type,
+                   _charset(content_type),
+                   etag=resp.headers.get("etag", ""),
+                   last_modified=resp.headers.get("last-modified", ""))
+
+    @property
+    def not_modified(self):
+        return self.status == 304
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    def write(self, chunk):
+        self.file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def text(self, limit=None):
+        """Decode the body (or its first ``limit`` bytes)."""
+        self.file.seek(0)
+        data = self.file.read() if limit is None else self.file.read(limit)
+        return data.decode(self.charset or "utf-8", errors="replace")
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _charset(content_type):
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset":
+            return value.strip().strip("\"'") or None
+    return None
+
+
+def check_html(resp):
+    """Raise before the body is read if ``resp`` is not HTML."""
     content_type = resp.headers.get("content-type", "").lower()
     if "html" not in content_type:
+        resp.close()
         raise ValueError(f"Non-HTML content type: {content_type}")
 
-    return resp.text
+
+def read_body(resp, max_bytes=None):
+    """
+    Stream the body of a ``stream=True`` response into a ``FetchedPage``,
+    aborting with ``ResponseTooLarge`` as soon as it exceeds ``max_bytes``
+    (``FETCH_MAX_BYTES`` by default).
+    """
+    max_bytes = settings.FETCH_MAX_BYTES if max_bytes is None else max_bytes
+    try:
+        length = resp.headers.get("content-length", "")
+        if length.isdigit() and int(length) > max_bytes:
+            raise ResponseTooLarge(
+                f"Response is {length} bytes; the limit is {max_bytes}.")
+
+        page = FetchedPage.from_response(resp)
+        try:
+            for chunk in resp.iter_content(CHUNK_SIZE):
+                page.write(chunk)
+                if page.size > max_bytes:
+                    raise ResponseTooLarge(
+                        f"Response exceeds the {max_bytes} byte limit.")
+        except BaseException:
+            page.close()
+            raise
+    finally:
+        resp.close()
+    page.file.seek(0)
+    return page
+
+
+def read_page(resp, max_bytes=None):
+    """``read_body`` for HTML responses; an empty page for a ``304``."""
+    if resp.status_code == 304:
+        resp.close()
+        return FetchedPage.from_response(resp)
+    check_html(resp)
+    return read_body(resp, max_bytes)
+
+
+def conditional_headers(etag="", last_modified=""):
+    """Request headers revalidating a copy fetched with these validators."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def fetch_job_post(url: str, timeout=(5, 15), max_bytes=None,
+                   headers=None) -> FetchedPage:
+    """
+    Fetch a job post URL into a ``FetchedPage`` without holding the whole
+    body in memory. Non-HTML responses are rejected before their body is
+    read and bodies over ``max_bytes`` are cut off. Pass
+    ``conditional_headers(...)`` as ``headers`` to revalidate a stored copy.
+    """
+    logger.info("Fetching %s ...", url)
+    resp = get_client().get(url, timeout=timeout, allow_redirects=True,
+                            stream=True, headers=headers)
+    try:
+        resp.raise_for_status()
+    except requests.HTTPError:
+        resp.close()
+        raise
+    return read_page(resp, max_bytes)
+
+
+def fetch_job_post_html(url: str, timeout=(5, 15)) -> str:
+    """Fetch raw HTML for a job post URL and return it as text."""
+    with fetch_job_post(url, timeout=timeout) as page:
+        return page.text()
 
 
-def fetch_job_post_for_save(url: str) -> str:
+def fetch_job_post_for_save(url: str) -> FetchedPage:
     """
     Fetch job post HTML for saving as an attachment.
-    This is a thin wrapper around fetch_job_post_html().
+    This is a thin wrapper around fetch_job_post(); close the page after
+    storing it.
     """
-    html = fetch_job_post_html(url)
-    return html
+    return fetch_job_post(url)
@@ -0,0 +1,49 @@
+import django_filters
+from django.db.models import Q
+
+from jobs.models import Job
+
+
+class JobFilterSet(django_filters.FilterSet):
+    """
+    Server-side filters for /api/jobs/.
+
+    Status/company, the salary bounds and the main date ranges are backed by
+    indexes on ``Job`` (see ``Job.Meta.indexes``) so they seek instead of
+    scanning the table.
+    """
+
+    status = django_filters.MultipleChoiceFilter(choices=Job.Status.choices)
+    role_type = django_filters.MultipleChoiceFilter(
+        choices=Job.RoleType.choices)
+    employment_type = django_filters.CharFilter(lookup_expr="iexact")
+    # Substring match on title or company name, as the job list's search box
+    # always did; full-text search is /api/jobs/search/.
+    search = django_filters.CharFilter(method="filter_search")
+
+    class Meta:
+        model = Job
+        fields = {
+            "company": ["exact"],
+            "is_remote": ["exact"],
+            "priority": ["exact", "gte", "lte"],
+            "salary_currency": ["exact"],
+            "salary_min": ["gte", "lte"],
+            "salary_max": ["gte", "lte"],
+            "date_deadline": ["gte", "lte"],
+            "date_applied": ["gte", "lte"],
+            "date_interviewed": ["gte", "lte"],
+            "date_offered": ["gte", "lte"],
+            "date_posted": ["gte", "lte"],
+            "date_accepted": ["gte", "lte"],
+            "date_rejected": ["gte", "lte"],
+            "created_at": ["gte", "lte"],
+            "updated_at": ["gte", "lte"],
+        }
+
+    def filter_search(self, queryset, name, value):
+        value = value.strip()
+        if not value:
+            return queryset
+        return queryset.filter(Q(position_title__icontains=value)
+                               | Q(company__name__icontains=value))
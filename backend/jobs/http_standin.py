@@ -0,0 +1,113 @@
+"""
+Local HTTP stand-in for job boards, for tests and fetch benchmarks.
+
+Serves HTTP/1.1 with keep-alive from a background thread on 127.0.0.1 and
+counts TCP connections and requests, so callers can check that connections
+are reused. Responses can be scripted per path (e.g. a few 503s before a
+200), and ``connect_delay`` adds a fixed cost to every new connection to
+model the TCP + TLS handshake of a remote host.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_HTML = (
+    "<html><head><title>Job</title></head><body>"
+    + "<p>Job description.</p>" * 200
+    + "</body></html>"
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without TCP_NODELAY every
+    # keep-alive response would stall ~40 ms on Nagle + delayed ACK.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        standin = self.server.standin
+        with standin.lock:
+            standin.connections += 1
+        if standin.connect_delay:
+            time.sleep(standin.connect_delay)
+
+    def do_GET(self):
+        standin = self.server.standin
+        path = self.path.split("?", 1)[0]
+        with standin.lock:
+            standin.requests += 1
+            standin.hits[path] += 1
+            queued = standin.scripts.get(path)
+            response = queued.popleft() if queued else None
+        if response is None:
+            response = (200, {"Content-Type": standin.content_type}, standin.body)
+        if callable(response):
+            response = response(self)
+        status, headers, body = response
+        body = body.encode("utf-8") if isinstance(body, str) else body
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up mid-body (e.g. a size cap); not an error.
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer:
+    def __init__(self, body=DEFAULT_HTML,
+                 content_type="text/html; charset=utf-8", connect_delay=0.0):
+        self.body = body
+        self.content_type = content_type
+        self.connect_delay = connect_delay
+        self.lock = threading.Lock()
+        self.scripts = {}
+        self.hits = defaultdict(int)
+        self.connections = 0
+        self.requests = 0
+        self._server = None
+        self._thread = None
+
+    def script(self, path, *responses):
+        """
+        Queue ``(status, headers, body)`` responses (or callables taking the
+        request handler and returning one) for ``path``; once used up the
+        default 200 page is served again.
+        """
+        with self.lock:
+            self.scripts.setdefault(path, deque()).extend(responses)
+
+    def url(self, path="/"):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.standin = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,74 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+from requests.adapters import HTTPAdapter, Retry
+
+from jobs import fetchers
+from jobs.http_standin import StandInServer
+
+
+def unpooled_fetch(url, timeout=(5, 15)):
+    """The pre-pooling fetcher: a new session and adapters on every call."""
+    session = requests.Session()
+    retries = Retry(total=2, backoff_factor=0.3,
+                    status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(max_retries=retries))
+    session.mount("http://", HTTPAdapter(max_retries=retries))
+    resp = session.get(url, headers=fetchers.HEADERS, timeout=timeout,
+                       allow_redirects=True)
+    resp.raise_for_status()
+    return resp.text
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark job post fetching against a local HTTP stand-in: a new "
+        "session per fetch vs the shared pooled client"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200,
+                            help="Fetches per run")
+        parser.add_argument("--threads", type=int, default=1,
+                            help="Concurrent fetching threads")
+        parser.add_argument(
+            "--connect-delay-ms", type=float, action="append",
+            help="Simulated TCP+TLS handshake cost per new connection; may be "
+                 "given several times (default: 0 and 30)")
+
+    def handle(self, *args, **options):
+        for delay in options["connect_delay_ms"] or [0.0, 30.0]:
+            self._bench(delay, options["requests"], options["threads"])
+
+    def _run(self, fetch, server, count, threads):
+        url = server.url("/jobs/1")
+        fetch(url)  # warm up
+        before = server.connections
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for _ in pool.map(lambda _: fetch(url), range(count)):
+                pass
+        elapsed = time.perf_counter() - start
+        return elapsed, server.connections - before
+
+    def _bench(self, delay_ms, count, threads):
+        with StandInServer(connect_delay=delay_ms / 1000) as server:
+            old, old_conns = self._run(unpooled_fetch, server, count, threads)
+            fetchers.reset_client()
+            new, new_conns = self._run(
+                fetchers.fetch_job_post_html, server, count, threads)
+            fetchers.reset_client()
+
+        self.stdout.write(self.style.NOTICE(
+            f"{count} fetches, {threads} thread(s), "
+            f"{delay_ms:g} ms connect delay"))
+        self.stdout.write(
+            f"  session per fetch: {old / count * 1000:7.2f} ms/fetch, "
+            f"{old_conns} connections")
+        self.stdout.write(
+            f"  pooled client:     {new / count * 1000:7.2f} ms/fetch, "
+            f"{new_conns} connections")
+        self.stdout.write(
+            f"  saved:             {(old - new) / count * 1000:7.2f} ms/fetch")
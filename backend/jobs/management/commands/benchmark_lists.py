@@ -0,0 +1,84 @@
+import io
+import time
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from jobs.models import Attachment, Job
+from jobs.views import CompanyViewSet, JobViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark /api/jobs/ and /api/companies/ list serialization "
+        "(ModelSerializer vs values() fast path) in a throwaway database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=2000,
+                            help="Number of jobs to seed")
+        parser.add_argument("--companies", type=int, default=200,
+                            help="Number of companies to seed")
+        parser.add_argument("--page-size", type=int, default=500,
+                            help="page_size used while walking the list")
+        parser.add_argument("--repeat", type=int, default=3,
+                            help="Best-of-N timing runs per path")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0)
+        old_config = runner.setup_databases()
+        try:
+            call_command("seed_data", jobs=options["jobs"],
+                         companies=options["companies"], stdout=io.StringIO())
+            Attachment.objects.bulk_create([
+                Attachment(job_id=pk, type="job_post",
+                           file=f"attachments/{pk}.html",
+                           filename=f"{pk}.html", mime_type="text/html")
+                for pk in Job.objects.values_list("pk", flat=True)
+            ])
+            self._bench("jobs", JobViewSet, options)
+            self._bench("companies", CompanyViewSet, options)
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+    def _walk(self, url):
+        """Page through ``url``; returns rows, body bytes and request time."""
+        client = APIClient()
+        rows, chunks, elapsed = 0, [], 0.0
+        while url:
+            start = time.perf_counter()
+            response = client.get(url)
+            elapsed += time.perf_counter() - start
+            chunks.append(response.content)
+            data = response.json()
+            rows += len(data["results"])
+            url = data["next"]
+        return rows, b"".join(chunks), elapsed
+
+    def _time(self, url, repeat):
+        best = None
+        for _ in range(repeat):
+            rows, body, elapsed = self._walk(url)
+            best = elapsed if best is None else min(best, elapsed)
+        return rows, body, best
+
+    def _bench(self, name, viewset, options):
+        url = f"/api/{name}/?page_size={options['page_size']}"
+        with mock.patch.object(viewset, "fast_list", False):
+            rows, slow_body, slow = self._time(url, options["repeat"])
+        _, fast_body, fast = self._time(url, options["repeat"])
+
+        identical = "identical" if slow_body == fast_body else "DIFFERENT"
+        self.stdout.write(self.style.NOTICE(f"/api/{name}/ ({rows} rows)"))
+        self.stdout.write(
+            f"  serializer: {rows / slow:10.0f} rows/sec ({slow * 1000:.1f} ms)")
+        self.stdout.write(
+            f"  fast path:  {rows / fast:10.0f} rows/sec ({fast * 1000:.1f} ms)")
+        self.stdout.write(
+            f"  speedup:    {slow / fast:10.2f}x, output {identical}")
@@ -0,0 +1,194 @@
+import copy
+import ctypes
+import importlib.util
+import json
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.parsing import Parser, parse
+
+PARSING_DIR = Path(settings.BASE_DIR) / "testing" / "parsing"
+SAMPLES_DIR = PARSING_DIR / "samples"
+
+
+def load_legacy_parsers():
+    """
+    The pre-``jobs.parsing`` parsers from ``testing/parsing``:
+    ``(parse_core, parse_generic, parse_greenhouse)``.
+    """
+    def load(name, path):
+        spec = importlib.util.spec_from_file_location(name, PARSING_DIR / path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return (
+        load("parse_core", "parse_core.py").parse_core,
+        load("parse_generic", "archive/1-parse-generic.py").parse_generic,
+        load("parse_greenhouse",
+             "archive/2-parse-greenhouse.py").parse_greenhouse,
+    )
+
+
+def legacy_parse(parsers, html, url):
+    """The three legacy parsers in sequence, each building its own tree."""
+    parse_core, parse_generic, parse_greenhouse = parsers
+    core = parse_core(html)
+    return core, parse_greenhouse(html, url, parse_generic(html, url))
+
+
+def with_jsonld(html, job):
+    """``html`` with a schema.org JobPosting for ``job`` added to its head."""
+    posting = {
+        "@context": "https://schema.org",
+        "@graph": [{"@type": "WebPage", "url": job.job_post_url}, {
+            "@type": ["JobPosting"],
+            "title": job.position_title,
+            "hiringOrganization": {"@type": "Organization",
+                                   "name": job.company},
+            "description": "".join(f"<p>{line}</p>" for line in
+                                   (job.about or "").splitlines()),
+            "jobLocation": {"@type": "Place", "address": {
+                "@type": "PostalAddress", "addressLocality": job.location}},
+            "datePosted": job.date_posted and job.date_posted.isoformat(),
+        }],
+    }
+    script = ('<script type="application/ld+json">'
+              + json.dumps(posting).replace("</", "<\\/") + "</script>")
+    return html.replace("</head>", script + "</head>", 1)
+
+
+PATHS = {
+    "dom": Parser(lazy_dom=False),
+    "fast": Parser(),
+}
+
+
+class _MallInfo2(ctypes.Structure):
+    _fields_ = [(name, ctypes.c_size_t) for name in (
+        "arena", "ordblks", "smblks", "hblks", "hblkhd", "usmblks",
+        "fsmblks", "uordblks", "fordblks", "keepcost")]
+
+
+def _load_mallinfo2():
+    try:
+        mallinfo2 = ctypes.CDLL(None).mallinfo2
+    except (AttributeError, OSError):
+        return None  # not glibc 2.33+
+    mallinfo2.restype = _MallInfo2
+    return mallinfo2
+
+
+_mallinfo2 = _load_mallinfo2()
+HEAP_SAMPLING = _mallinfo2 is not None
+
+
+def heap_in_use():
+    """Bytes currently handed out by ``malloc`` (glibc only)."""
+    info = _mallinfo2()
+    return info.uordblks + info.hblkhd
+
+
+def peak_heap(parser, docs, url=""):
+    """
+    ``(mean, largest)`` peak heap growth per parse of ``docs`` in KiB, or
+    ``None`` without glibc. Sampled around each stage of ``parser``, while
+    the lxml tree is alive: libxml2 allocates it with ``malloc``, where
+    tracemalloc and (at this size) ru_maxrss can't see it. Small Python
+    objects live in pymalloc's arenas and are not counted.
+    """
+    if not HEAP_SAMPLING:
+        return None
+    base = peak = 0
+
+    def sampled(stage):
+        def run(doc, result):
+            nonlocal peak
+            peak = max(peak, heap_in_use() - base)
+            stage(doc, result)
+            peak = max(peak, heap_in_use() - base)
+        run.needs_dom = getattr(stage, "needs_dom", True)
+        return run
+
+    instrumented = copy.copy(parser)
+    instrumented.stages = tuple(sampled(stage) for stage in parser.stages)
+    peaks = []
+    for html in docs:
+        base, peak = heap_in_use(), 0
+        instrumented.parse(html, url)
+        peaks.append(peak)
+    return sum(peaks) / len(peaks) / 1024, max(peaks) / 1024
+
+
+def docs_per_second(func, docs, seconds):
+    count = 0
+    start = time.perf_counter()
+    while True:
+        for html in docs:
+            func(html)
+        count += len(docs)
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return count / elapsed
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark job post parsing on testing/parsing/samples: the three "
+        "legacy BeautifulSoup parsers in sequence vs jobs.parsing, and the "
+        "full-DOM path vs the JSON-LD fast path (docs/sec and heap per parse)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pattern", default="greenhouse-*.html",
+                            help="Sample files to parse (glob)")
+        parser.add_argument("--seconds", type=float, default=3.0,
+                            help="Minimum run time per parser")
+        parser.add_argument("--skip-legacy", action="store_true",
+                            help="Only compare the DOM and fast paths")
+
+    def handle(self, *args, **options):
+        files = sorted(SAMPLES_DIR.glob(options["pattern"]))
+        if not files:
+            raise CommandError(f"No samples match {options['pattern']}.")
+        docs = [path.read_text(encoding="utf-8") for path in files]
+        url = "https://job-boards.greenhouse.io/example/jobs/1"
+        seconds = options["seconds"]
+
+        self.stdout.write(self.style.NOTICE(
+            f"Parsing {len(docs)} sample(s), "
+            f"{sum(map(len, docs)) // 1024} KiB ..."))
+        if not options["skip_legacy"]:
+            legacy = load_legacy_parsers()
+            old = docs_per_second(
+                lambda html: legacy_parse(legacy, html, url), docs, seconds)
+            new = docs_per_second(lambda html: parse(html, url), docs, seconds)
+            self.stdout.write(f"legacy (3 parsers): {old:8.1f} docs/s")
+            self.stdout.write(f"jobs.parsing:       {new:8.1f} docs/s")
+            self.stdout.write(self.style.SUCCESS(
+                f"Speed-up: {new / old:.1f}x"))
+
+        corpora = {
+            "as is": docs,
+            "with JSON-LD": [with_jsonld(html, parse(html, url))
+                             for html in docs],
+        }
+        self.stdout.write(self.style.NOTICE(
+            "\nDOM vs JSON-LD fast path (heap per parse, mean / largest):"))
+        for name, corpus in corpora.items():
+            rates = {}
+            for path, parser in PATHS.items():
+                rates[path] = docs_per_second(
+                    lambda html, parser=parser: parser.parse(html, url),
+                    corpus, seconds)
+                heap = peak_heap(parser, corpus, url)
+                memory = (f"{heap[0]:.0f} / {heap[1]:.0f} KiB" if heap
+                          else "n/a (needs glibc)")
+                self.stdout.write(
+                    f"{name:>13} {path:>5}: {rates[path]:8.1f} docs/s, "
+                    f"heap {memory}")
+            self.stdout.write(self.style.SUCCESS(
+                f"{name:>13}  fast/dom: {rates['fast'] / rates['dom']:.1f}x"))
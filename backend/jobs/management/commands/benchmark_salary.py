@@ -0,0 +1,98 @@
+import re
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from jobs.management.commands.benchmark_parsing import (
+    SAMPLES_DIR, docs_per_second)
+from jobs.management.commands.check_parser import URL
+from jobs.parsing import parse
+from jobs.parsing.compensation import find_salary
+
+CORPUS = SAMPLES_DIR / "salaries.tsv"
+FIELDS = ("min", "max", "currency", "unit", "raw")
+
+# The single pattern used before jobs.parsing.compensation, for comparison.
+LEGACY = re.compile(
+    r"(\$|USD)\s?(\d{2,3}(?:,\d{3})*)"
+    r"(?:\s*-\s*(\$|USD)?\s?(\d{2,3}(?:,\d{3})*))?")
+
+
+def legacy_salary(text):
+    """What the old ``salary`` stage found, as ``find_salary`` would return it."""
+    match = LEGACY.search(text or "")
+    if match is None:
+        return None
+    low = Decimal(match.group(2).replace(",", ""))
+    high = Decimal(match.group(4).replace(",", "")) if match.group(4) else low
+    return (low, high, "USD", "YEAR", match.group(0).strip())
+
+
+def read_corpus(path=CORPUS):
+    """
+    ``[(text, expected)]`` from a tab-separated corpus: the text (``\\n``
+    for line breaks), then one column per ``FIELDS`` (``None``: not found).
+    """
+    rows = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip() or line.startswith("#"):
+            continue
+        text, *columns = line.split("\t")
+        rows.append((text.replace("\\n", "\n"),
+                     [None if value == "None" else value for value in columns]))
+    return rows
+
+
+def matches(found, expected):
+    """Whether ``find_salary``'s result has every expected value."""
+    values = found if found is not None else (None,) * len(FIELDS)
+    for value, want in zip(values, expected):
+        if value is None or want is None:
+            if value is not want:
+                return False
+        elif Decimal(want) != value if isinstance(value, Decimal) \
+                else want != value:
+            return False
+    return True
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark salary extraction: accuracy on the table-driven corpus "
+        "in testing/parsing/samples/salaries.tsv, and extractions/sec on "
+        "that corpus and on the sample job descriptions (old single regex "
+        "vs jobs.parsing.compensation)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=2.0,
+                            help="Minimum run time per extractor and corpus")
+        parser.add_argument("--verbose-misses", action="store_true",
+                            help="List the corpus rows each extractor gets "
+                                 "wrong")
+
+    def handle(self, *args, **options):
+        rows = read_corpus()
+        descriptions = [
+            parse(path.read_text(encoding="utf-8"), URL).about or ""
+            for path in sorted(SAMPLES_DIR.glob("greenhouse-*.html"))]
+        extractors = {"legacy regex": legacy_salary,
+                      "compensation": find_salary}
+        seconds = options["seconds"]
+
+        self.stdout.write(self.style.NOTICE(
+            f"{len(rows)} corpus row(s), {len(descriptions)} description(s) "
+            f"of {sum(map(len, descriptions)) // 1024} KiB ..."))
+        for name, extract in extractors.items():
+            wrong = [text for text, expected in rows
+                     if not matches(extract(text), expected)]
+            corpus_rate = docs_per_second(
+                extract, [text for text, _ in rows], seconds)
+            description_rate = docs_per_second(extract, descriptions, seconds)
+            self.stdout.write(
+                f"{name:>13}: {len(rows) - len(wrong)}/{len(rows)} right, "
+                f"{corpus_rate:10.0f} rows/s, "
+                f"{description_rate:8.0f} descriptions/s")
+            if options["verbose_misses"]:
+                for text in wrong:
+                    self.stdout.write(f"  {text!r}")
@@ -0,0 +1,314 @@
+import copy
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from functools import partial
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.management.commands.benchmark_parsing import (
+    SAMPLES_DIR, docs_per_second, peak_heap)
+from jobs.parsing import golden
+
+GOLDEN_DIR = SAMPLES_DIR / "expected"
+URL = "https://job-boards.greenhouse.io/example/jobs/1"
+# Rows of the stage table that are not stages.
+DOM_ROW = "(build DOM)"
+OTHER_ROW = "(document, other)"
+
+
+def checkout_parser(ref, into):
+    """Write ``jobs/parsing`` as of git ``ref`` under ``into``; returns the dir."""
+    def git(*args):
+        try:
+            return subprocess.run(
+                ["git", "-C", str(settings.BASE_DIR), *args], check=True,
+                capture_output=True).stdout
+        except (OSError, subprocess.CalledProcessError) as exc:
+            raise CommandError(f"Cannot read jobs/parsing at {ref}: "
+                               f"{getattr(exc, 'stderr', b'').decode() or exc}")
+
+    target = Path(into) / "parsing"
+    target.mkdir(parents=True)
+    paths = git("ls-tree", "--name-only", ref, "jobs/parsing/").decode()
+    for path in paths.split():
+        if path.endswith(".py"):
+            (target / Path(path).name).write_bytes(
+                git("show", f"{ref}:./{path}"))
+    return target
+
+
+def load_parser(source=None):
+    """
+    The default ``Parser`` of ``jobs.parsing``, or of a copy of the package
+    in ``source`` (see ``checkout_parser``), imported under its own name.
+    """
+    if source is None:
+        from jobs.parsing.pipeline import default_parser
+        return default_parser
+    # Named after its (unique) temporary directory.
+    name = f"_parsing_{Path(source).parent.name}"
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            name, Path(source) / "__init__.py",
+            submodule_search_locations=[str(source)])
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name].pipeline.default_parser
+
+
+def parse_function(source=None):
+    return partial(load_parser(source).parse, url=URL)
+
+
+def stage_name(stage):
+    return getattr(stage, "__name__", type(stage).__name__)
+
+
+def stage_timings(parser, docs, seconds):
+    """
+    Average milliseconds per document spent in each stage of ``parser``.
+    Building the lxml tree on demand is timed on its own row; the rest
+    (``Document`` set-up, skipped stages) is left to ``OTHER_ROW``.
+    """
+    totals = defaultdict(float)
+
+    def timed(stage):
+        needs_dom = getattr(stage, "needs_dom", True)
+
+        def run(doc, result):
+            if needs_dom and not getattr(doc, "has_dom", True):
+                start = time.perf_counter()
+                # Property access builds the tree; build() is not in
+                # parser versions checked out from before it existed.
+                _ = doc.root
+                totals[DOM_ROW] += time.perf_counter() - start
+            start = time.perf_counter()
+            stage(doc, result)
+            totals[stage_name(stage)] += time.perf_counter() - start
+        run.needs_dom = needs_dom
+        return run
+
+    instrumented = copy.copy(parser)
+    instrumented.stages = tuple(timed(stage) for stage in parser.stages)
+    count = 0
+    start = time.perf_counter()
+    while not count or time.perf_counter() - start < seconds:
+        for html in docs:
+            instrumented.parse(html, URL)
+        count += len(docs)
+    elapsed = time.perf_counter() - start
+    totals[OTHER_ROW] = max(elapsed - sum(totals.values()), 0)
+    return {name: total * 1000 / count for name, total in totals.items()}
+
+
+def accuracy(parser, docs, expected):
+    """
+    Per-field ``[matched, checked]`` counts against the golden outputs,
+    and the fields each sample got wrong.
+    """
+    fields = defaultdict(lambda: [0, 0])
+    misses = {}
+    for name, html in docs.items():
+        if name not in expected:
+            continue
+        scores = golden.score(parser.parse(html, URL), expected[name])
+        for field, matched in scores.items():
+            fields[field][0] += matched
+            fields[field][1] += 1
+        misses[name] = sorted(field for field, ok in scores.items() if not ok)
+    return dict(fields), misses
+
+
+def overall(report):
+    matched = sum(m for m, _ in report["accuracy"].values())
+    checked = sum(n for _, n in report["accuracy"].values())
+    return matched / checked if checked else 1.0
+
+
+def run_suite(label, source, docs, expected, seconds, memory=True):
+    """Benchmark and score one parser version; returns a JSON-able report."""
+    parser = load_parser(source)
+    parse = parse_function(source)
+    texts = list(docs.values())
+    report = {
+        "label": label,
+        "docs": len(texts),
+        "docs_per_sec": docs_per_second(parse, texts, seconds),
+        "stages_ms": stage_timings(parser, texts, seconds / 2),
+        "heap_kib": None,
+    }
+    if memory:
+        heap = peak_heap(parser, texts, URL)
+        report["heap_kib"] = heap and round(heap[0])
+    report["accuracy"], report["misses"] = accuracy(parser, docs, expected)
+    return report
+
+
+def regressions(baseline, candidate, max_slowdown, max_accuracy_drop):
+    """Why ``candidate`` is worse than ``baseline`` beyond the thresholds."""
+    problems = []
+    floor = baseline["docs_per_sec"] * (1 - max_slowdown)
+    if candidate["docs_per_sec"] < floor:
+        problems.append(
+            f"throughput {candidate['docs_per_sec']:.1f} docs/s is below "
+            f"{floor:.1f} ({baseline['docs_per_sec']:.1f} - {max_slowdown:.0%})")
+    for field, (matched, checked) in sorted(baseline["accuracy"].items()):
+        was = matched / checked
+        new = candidate["accuracy"].get(field)
+        now = new[0] / new[1] if new else 0.0
+        if was - now > max_accuracy_drop:
+            problems.append(f"{field} accuracy fell from {was:.0%} to {now:.0%}")
+    if overall(baseline) - overall(candidate) > max_accuracy_drop:
+        problems.append(f"overall accuracy fell from {overall(baseline):.1%} "
+                        f"to {overall(candidate):.1%}")
+    return problems
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark and accuracy suite for jobs.parsing over "
+        "testing/parsing/samples: per-stage timings, docs/sec, peak memory "
+        "and per-field accuracy against the golden outputs in "
+        "samples/expected. With --against or --baseline, compares two parser "
+        "versions and exits non-zero when throughput or accuracy regresses"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pattern", default="greenhouse-*.html",
+                            help="Sample files to parse (glob)")
+        parser.add_argument("--seconds", type=float, default=2.0,
+                            help="Minimum benchmark time per parser version")
+        parser.add_argument("--against", metavar="GIT_REF",
+                            help="Compare with jobs/parsing as of this commit")
+        parser.add_argument("--baseline", metavar="FILE",
+                            help="Compare with a report saved by --save")
+        parser.add_argument("--save", metavar="FILE",
+                            help="Write this run's report as JSON")
+        parser.add_argument("--max-slowdown", type=float, default=0.10,
+                            help="Allowed docs/sec drop vs the baseline "
+                                 "(fraction)")
+        parser.add_argument("--max-accuracy-drop", type=float, default=0.0,
+                            help="Allowed accuracy drop per field and overall "
+                                 "(fraction)")
+        parser.add_argument("--no-memory", action="store_true",
+                            help="Skip the heap per parse measurement")
+        parser.add_argument("--write-golden", action="store_true",
+                            help="Write golden files for samples that have "
+                                 "none, from the current parser (review "
+                                 "them before committing)")
+
+    def handle(self, *args, **options):
+        if options["against"] and options["baseline"]:
+            raise CommandError("Use either --against or --baseline.")
+        files = sorted(SAMPLES_DIR.glob(options["pattern"]))
+        if not files:
+            raise CommandError(f"No samples match {options['pattern']}.")
+        docs = {path.name: path.read_text(encoding="utf-8") for path in files}
+
+        if options["write_golden"]:
+            self.write_golden(docs)
+        expected = {}
+        for path in sorted(GOLDEN_DIR.glob("*.txt")):
+            expected.update(golden.read_golden(path.read_text("utf-8")))
+        unchecked = sorted(set(docs) - set(expected))
+        if unchecked:
+            self.stdout.write(self.style.WARNING(
+                f"No golden output for: {', '.join(unchecked)}"))
+
+        run = partial(run_suite, docs=docs, expected=expected,
+                      seconds=options["seconds"],
+                      memory=not options["no_memory"])
+        self.stdout.write(self.style.NOTICE(
+            f"Checking {len(docs)} sample(s), "
+            f"{sum(map(len, docs.values())) // 1024} KiB ..."))
+        reports = [run("working tree", None)]
+        if options["against"]:
+            with tempfile.TemporaryDirectory() as tmp:
+                source = checkout_parser(options["against"], tmp)
+                reports.insert(0, run(options["against"], source))
+        elif options["baseline"]:
+            try:
+                with open(options["baseline"], encoding="utf-8") as file:
+                    reports.insert(0, json.load(file))
+            except (OSError, ValueError) as exc:
+                raise CommandError(
+                    f"Cannot read {options['baseline']}: {exc}")
+
+        self.print_reports(reports)
+        if options["save"]:
+            with open(options["save"], "w", encoding="utf-8") as file:
+                json.dump(reports[-1], file, indent=2)
+            self.stdout.write(f"Report saved to {options['save']}.")
+
+        if len(reports) == 2:
+            problems = regressions(*reports, options["max_slowdown"],
+                                   options["max_accuracy_drop"])
+            if problems:
+                raise CommandError(
+                    f"Regression vs {reports[0]['label']}:\n  "
+                    + "\n  ".join(problems))
+            self.stdout.write(self.style.SUCCESS(
+                f"No regression vs {reports[0]['label']}."))
+
+    def write_golden(self, docs):
+        GOLDEN_DIR.mkdir(exist_ok=True)
+        parser = load_parser()
+        for name, html in docs.items():
+            path = GOLDEN_DIR / f"{Path(name).stem}.txt"
+            if not path.exists():
+                path.write_text(
+                    golden.format_golden(name, parser.parse(html, URL)),
+                    encoding="utf-8")
+                self.stdout.write(f"Wrote {path}")
+
+    def print_reports(self, reports):
+        width = 20
+        header = "".join(f"{report['label'][:width - 2]:>{width}}"
+                         for report in reports)
+        write = self.stdout.write
+
+        write(self.style.MIGRATE_HEADING(f"\n{'':<22}{header}"))
+        write(f"{'docs/sec':<22}" + "".join(
+            f"{report['docs_per_sec']:>{width}.1f}" for report in reports))
+        # .get: reports saved before heap_kib have none.
+        write(f"{'heap/parse (KiB)':<22}" + "".join(
+            f"{report['heap_kib']:>{width}}"
+            if report.get("heap_kib") is not None else f"{'-':>{width}}"
+            for report in reports))
+
+        write(self.style.MIGRATE_HEADING("\nms/doc by stage"))
+        stages = list(dict.fromkeys(
+            name for report in reports for name in report["stages_ms"]))
+        for name in stages:
+            write(f"  {name:<20}" + "".join(
+                f"{report['stages_ms'].get(name, 0):>{width}.3f}"
+                for report in reports))
+
+        write(self.style.MIGRATE_HEADING("\naccuracy by field"))
+        fields = list(dict.fromkeys(
+            name for report in reports for name in report["accuracy"]))
+        for name in fields:
+            cells = []
+            for report in reports:
+                matched, checked = report["accuracy"].get(name, (0, 0))
+                cells.append(f"{matched}/{checked}")
+            write(f"  {name:<20}" + "".join(
+                f"{cell:>{width}}" for cell in cells))
+        write(f"  {'overall':<20}" + "".join(
+            f"{overall(report):>{width}.1%}" for report in reports))
+
+        misses = {name: fields for name, fields
+                  in reports[-1]["misses"].items() if fields}
+        if misses:
+            write(self.style.MIGRATE_HEADING(
+                f"\nmisses ({reports[-1]['label']})"))
+            for name, fields in misses.items():
+                write(f"  {name}: {', '.join(fields)}")
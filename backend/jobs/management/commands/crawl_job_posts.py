@@ -0,0 +1,149 @@
+import shutil
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import postings
+from jobs.crawler import Crawler, host_of
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetch job post URLs concurrently with per-host rate limits and save "
+        "them as job_post attachments; stored posts are revalidated and only "
+        "rewritten when they changed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "url_files", nargs="*",
+            help="Files with one URL per line; URLs matching a job's "
+                 "job_post_url are saved on that job")
+        parser.add_argument("--jobs", action="store_true",
+                            help="Crawl every job's job_post_url")
+        parser.add_argument("--missing", action="store_true",
+                            help="With --jobs, only jobs without a job_post "
+                                 "attachment")
+        parser.add_argument("--output-dir",
+                            help="Write pages for URLs with no matching job "
+                                 "here (otherwise they are skipped)")
+        parser.add_argument("--rate", type=float, default=0.5,
+                            help="Requests per second per host")
+        parser.add_argument("--burst", type=int, default=1,
+                            help="Requests a host may receive back to back")
+        parser.add_argument("--per-host", type=int, default=2,
+                            help="Concurrent requests per host")
+        parser.add_argument("--workers", type=int, default=16,
+                            help="Fetching threads shared by all hosts")
+        parser.add_argument("--max-attempts", type=int, default=3,
+                            help="Tries per URL when throttled (429/503)")
+
+    def handle(self, *args, **options):
+        jobs_by_url = defaultdict(list)
+        urls = []
+
+        if options["jobs"]:
+            jobs = Job.objects.exclude(job_post_url__isnull=True).exclude(
+                job_post_url="").select_related("company")
+            if options["missing"]:
+                jobs = jobs.exclude(attachments__type="job_post")
+            for job in jobs:
+                jobs_by_url[job.job_post_url].append(job)
+                urls.append(job.job_post_url)
+
+        listed = []
+        for path in options["url_files"]:
+            try:
+                with open(path, encoding="utf-8") as file:
+                    listed += [line.strip() for line in file
+                               if line.strip() and not line.startswith("#")]
+            except OSError as exc:
+                raise CommandError(f"Cannot read {path}: {exc}")
+        if listed:
+            for job in Job.objects.filter(
+                    job_post_url__in=listed).select_related("company"):
+                if job not in jobs_by_url[job.job_post_url]:
+                    jobs_by_url[job.job_post_url].append(job)
+            urls += listed
+
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            raise CommandError("Nothing to crawl; pass URL files or --jobs.")
+
+        output_dir = Path(options["output_dir"]) if options["output_dir"] else None
+        if output_dir:
+            output_dir.mkdir(parents=True, exist_ok=True)
+
+        current = postings.current_job_posts(
+            [job for jobs in jobs_by_url.values() for job in jobs])
+        headers = postings.shared_revalidation_headers(jobs_by_url, current)
+
+        crawler = Crawler(
+            rate=options["rate"], burst=options["burst"],
+            per_host=options["per_host"], workers=options["workers"],
+            max_attempts=options["max_attempts"])
+        hosts = {host_of(url) for url in urls}
+        self.stdout.write(self.style.NOTICE(
+            f"Crawling {len(urls)} URL(s) across {len(hosts)} host(s) ..."))
+
+        start = time.perf_counter()
+        saved = unchanged = closed = failed = skipped = 0
+        for n, result in enumerate(crawler.crawl(urls, headers=headers), 1):
+            prefix = f"[{n}/{len(urls)}]"
+            jobs = jobs_by_url.get(result.url)
+            if not result.ok:
+                logs = postings.apply_fetch(
+                    jobs, result.url, result.elapsed, status=result.status,
+                    error=result.error, current=current) if jobs else []
+                if logs and logs[0].closed:
+                    closed += 1
+                    self.stdout.write(self.style.WARNING(
+                        f"{prefix} {result.url}: closed ({result.error})"))
+                    continue
+                failed += 1
+                self.stdout.write(self.style.ERROR(
+                    f"{prefix} ❌ {result.url}: {result.error}"))
+                continue
+
+            with result.page as page:
+                if jobs:
+                    logs = postings.apply_fetch(
+                        jobs, result.url, result.elapsed, page=page,
+                        current=current)
+                    if logs[0].closed:
+                        closed += 1
+                        self.stdout.write(self.style.WARNING(
+                            f"{prefix} {result.url}: closed ({logs[0].error})"))
+                    elif any(log.changed for log in logs):
+                        saved += 1
+                        self.stdout.write(f"{prefix} ✅ {result.url}: saved")
+                    else:
+                        unchanged += 1
+                        self.stdout.write(f"{prefix} {result.url}: unchanged "
+                                          f"({page.status})")
+                elif output_dir:
+                    path = output_dir / self._filename(result.url)
+                    with open(path, "wb") as out:
+                        page.file.seek(0)
+                        shutil.copyfileobj(page.file, out)
+                    self.stdout.write(f"{prefix} ✅ {result.url} -> {path}")
+                    saved += 1
+                else:
+                    skipped += 1
+                    self.stdout.write(f"{prefix} {result.url}: no matching job")
+
+        crawler.client.close()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {elapsed:.1f}s: {saved} saved, {unchanged} unchanged, "
+            f"{closed} closed, {failed} failed, {skipped} skipped."))
+
+    @staticmethod
+    def _filename(url):
+        host = host_of(url).replace(":", "_")
+        path = url.split("://", 1)[-1].split("?", 1)[0].rstrip("/")
+        tail = path.rsplit("/", 3)[1:] if "/" in path else []
+        return "-".join([host, *tail]).replace("/", "-") + ".html"
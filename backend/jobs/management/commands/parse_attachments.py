@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from jobs import extraction, parse_worker, search, stats
+from jobs.parse_cache import board_of, get_cache
+from jobs.models import Attachment, Job
+from jobs.parsing import PARSER_VERSION
+
+INDEXED = {name for name, _ in search.INDEXED_FIELDS}
+
+
+def chunks(queryset, size):
+    """``queryset`` in lists of ``size``, by primary key (keyset paging)."""
+    queryset = queryset.select_related("job").order_by("pk")
+    last = None
+    while True:
+        page = queryset if last is None else queryset.filter(pk__gt=last)
+        batch = list(page[:size])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1].pk
+
+
+class Command(BaseCommand):
+    help = (
+        "Parse stored job_post attachments into their jobs' fields on all "
+        "cores. Resumable: attachments whose content was already parsed by "
+        "the current parser version are skipped, and bodies in the parse "
+        "cache are not parsed again"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=0,
+                            help="Parsing processes (default: one per core)")
+        parser.add_argument("--chunk-size", type=int, default=200,
+                            help="Attachments read and written per batch")
+        parser.add_argument("--overwrite", action="store_true",
+                            help="Replace fields the jobs already have "
+                                 "(default: only fill empty ones)")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        workers = options["workers"] or os.cpu_count() or 1
+        pending = extraction.pending_attachments()
+        total = pending.count()
+        if not total:
+            self.stdout.write("Every job post is parsed by parser version "
+                              f"{PARSER_VERSION}.")
+            return
+        self.stdout.write(self.style.NOTICE(
+            f"Parsing {total} job post(s) with parser version "
+            f"{PARSER_VERSION} on {workers} process(es) ..."))
+
+        self.counts = dict.fromkeys(
+            ("parsed", "cached", "updated", "failed"), 0)
+        self.cache = get_cache()
+        self.overwrite = options["overwrite"]
+        start = time.perf_counter()
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context,
+                                 initializer=parse_worker.init) as pool:
+            # Keep one batch parsing while the previous one is written.
+            inflight = deque()
+            for batch in chunks(pending, options["chunk_size"]):
+                inflight.append(self.submit(pool, batch))
+                if len(inflight) > 1:
+                    self.write(*inflight.popleft())
+            while inflight:
+                self.write(*inflight.popleft())
+
+        elapsed = time.perf_counter() - start
+        done = sum(self.counts[name] for name in ("parsed", "cached", "failed"))
+        summary = ", ".join(f"{count} {name}"
+                            for name, count in self.counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {elapsed:.1f}s ({done / elapsed:.1f} posts/s): "
+            f"{summary}."))
+
+    def submit(self, pool, batch):
+        """
+        Queue a batch. Posts with the same content (and board) are parsed
+        once, and posts whose key is in the parse cache not at all.
+        """
+        cached = self.cache.get_many(map(self.key, batch))
+        futures = {}
+        for attachment in batch:
+            key = self.key(attachment)
+            if key not in futures and key not in cached:
+                futures[key] = pool.submit(
+                    parse_worker.parse_stored, attachment.file.name,
+                    extraction.local_path(attachment),
+                    attachment.job.job_post_url or "")
+        return batch, cached, futures
+
+    @staticmethod
+    def key(attachment):
+        # The parse cache's key; unhashed posts stand alone.
+        return (attachment.sha256 or attachment.pk,
+                board_of(attachment.job.job_post_url))
+
+    def write(self, batch, cached, futures):
+        """Apply a parsed batch: one bulk update for jobs, one for posts."""
+        jobs, fields, parsed, fresh = [], set(), [], {}
+        for attachment in batch:
+            key = self.key(attachment)
+            if key in cached:
+                sha256, result, error = key[0], cached[key], ""
+                self.counts["cached"] += 1
+            else:
+                sha256, result, error = futures[key].result()
+                if not error:
+                    fresh[sha256, key[1]] = result
+                    self.counts["parsed"] += 1
+            if error:
+                self.counts["failed"] += 1
+                self.stdout.write(self.style.ERROR(
+                    f"{attachment.filename}: {error}"))
+                continue
+            changed = extraction.apply_parsed(
+                attachment.job, result, overwrite=self.overwrite)
+            if changed:
+                jobs.append(attachment.job)
+                fields.update(changed)
+            attachment.sha256 = attachment.parsed_sha256 = sha256
+            attachment.parser_version = PARSER_VERSION
+            parsed.append(attachment)
+        self.cache.put_many(fresh)
+
+        now = timezone.now()
+        for job in jobs:
+            job.updated_at = now  # bulk_update skips auto_now
+        with transaction.atomic():
+            if jobs:
+                # bulk_update sends no post_save: index and invalidate here.
+                Job.objects.bulk_update(jobs, [*sorted(fields), "updated_at"])
+                if INDEXED & fields:
+                    search.index_jobs([job.pk for job in jobs])
+                transaction.on_commit(stats.invalidate)
+            Attachment.objects.bulk_update(
+                parsed, ["sha256", "parsed_sha256", "parser_version"])
+        self.counts["updated"] += len(jobs)
+        done = sum(self.counts[name] for name in ("parsed", "cached", "failed"))
+        self.stdout.write(f"{done} processed, {self.counts['updated']} "
+                          f"job(s) updated")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from jobs import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for jobs from scratch"
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            self.stdout.write(self.style.WARNING(
+                "Full-text search is not supported on this database; "
+                "search falls back to icontains."))
+            return
+        count = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"✅ Indexed {count} jobs."))
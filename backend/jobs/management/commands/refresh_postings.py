@@ -0,0 +1,91 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import postings
+from jobs.crawler import Crawler, host_of
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-check open jobs' posting URLs, most urgent first, within a "
+        "request budget; flags postings that were taken down. Meant to run "
+        "periodically (e.g. hourly from cron)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--budget", type=int, default=100,
+                            help="Maximum requests this run")
+        parser.add_argument("--host-budget", type=int, default=20,
+                            help="Maximum requests to any one host this run")
+        parser.add_argument("--min-age-hours", type=float, default=24,
+                            help="Skip jobs checked more recently than this")
+        parser.add_argument("--spread", type=float, default=0,
+                            help="Spread the run's requests evenly over this "
+                                 "many seconds (0: as fast as --rate allows)")
+        parser.add_argument("--rate", type=float, default=0.2,
+                            help="Requests per second per host")
+        parser.add_argument("--workers", type=int, default=8,
+                            help="Fetching threads shared by all hosts")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Only list what would be checked")
+
+    def handle(self, *args, **options):
+        if options["budget"] < 1:
+            raise CommandError("--budget must be at least 1.")
+        plan = postings.plan_refresh(
+            options["budget"], per_host=options["host_budget"],
+            min_age=timedelta(hours=options["min_age_hours"]))
+        if not plan:
+            self.stdout.write("No postings are due for a check.")
+            return
+
+        hosts = {host_of(url) for url in plan}
+        self.stdout.write(self.style.NOTICE(
+            f"Checking {len(plan)} posting(s) across {len(hosts)} host(s) ..."))
+        if options["dry_run"]:
+            for url, jobs in plan.items():
+                self.stdout.write(f"{url} ({', '.join(map(str, jobs))})")
+            return
+
+        current = postings.current_job_posts(
+            [job for jobs in plan.values() for job in jobs])
+        crawler = Crawler(
+            rate=options["rate"], per_host=1, workers=options["workers"],
+            total_rate=len(plan) / options["spread"] if options["spread"]
+            else None)
+
+        start = time.perf_counter()
+        counts = dict.fromkeys(("changed", "unchanged", "closed", "failed"), 0)
+        headers = postings.shared_revalidation_headers(plan, current)
+        for n, result in enumerate(crawler.crawl(plan, headers=headers), 1):
+            jobs = plan[result.url]
+            if result.page is not None:
+                with result.page as page:
+                    logs = postings.apply_fetch(
+                        jobs, result.url, result.elapsed, page=page,
+                        current=current)
+            else:
+                logs = postings.apply_fetch(
+                    jobs, result.url, result.elapsed, status=result.status,
+                    error=result.error, current=current)
+
+            if logs[0].closed:
+                outcome, style = "closed", self.style.WARNING
+            elif not result.ok:
+                outcome, style = "failed", self.style.ERROR
+            elif any(log.changed for log in logs):
+                outcome, style = "changed", str
+            else:
+                outcome, style = "unchanged", str
+            counts[outcome] += 1
+            detail = f" ({logs[0].error})" if logs[0].error else ""
+            self.stdout.write(style(
+                f"[{n}/{len(plan)}] {result.url}: {outcome}{detail}"))
+
+        crawler.client.close()
+        elapsed = time.perf_counter() - start
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {elapsed:.1f}s: {summary}."))
@@ -0,0 +1,100 @@
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from jobs import tasks
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Run background task workers (see jobs.tasks) until interrupted"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4,
+                            help="Number of worker threads")
+        parser.add_argument("--poll-interval", type=float, default=1.0,
+                            help="Seconds to sleep when the queue is empty")
+        parser.add_argument("--once", action="store_true",
+                            help="Exit once no task is due instead of polling")
+        parser.add_argument("--requeue-interval", type=float, default=60.0,
+                            help="Seconds between looks for tasks abandoned "
+                                 "by dead workers")
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        previous = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                previous[signum] = signal.signal(signum, self._shutdown)
+        try:
+            self._run(options)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def _run(self, options):
+        self._requeue()
+
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        threads = [
+            threading.Thread(
+                target=self._work, name=f"{prefix}:{n}",
+                args=(f"{prefix}:{n}", options), daemon=True)
+            for n in range(options["workers"])
+        ]
+        self.stdout.write(self.style.NOTICE(
+            f"Starting {len(threads)} worker(s); Ctrl+C to stop."))
+        for thread in threads:
+            thread.start()
+        requeued_at = time.monotonic()
+        while threads:
+            threads[0].join(timeout=min(0.5, options["requeue_interval"]))
+            threads = [thread for thread in threads if thread.is_alive()]
+            if time.monotonic() - requeued_at >= options["requeue_interval"]:
+                self._requeue()
+                requeued_at = time.monotonic()
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
+
+    def _requeue(self):
+        """Hand tasks of dead workers back out (see tasks.requeue_stale)."""
+        try:
+            requeued = tasks.requeue_stale()
+        except Exception:
+            logger.exception("Could not requeue stale tasks")
+            return
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale task(s).")
+
+    def _shutdown(self, signum, frame):
+        self.stdout.write("Stopping after current tasks ...")
+        self.stop.set()
+
+    def _work(self, worker, options):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                task = tasks.claim(worker)
+                if task is None:
+                    if options["once"]:
+                        break
+                    self.stop.wait(options["poll_interval"])
+                    continue
+                try:
+                    with tasks.heartbeat(task):
+                        task = tasks.run(task)
+                except Exception:
+                    # Couldn't record the outcome (e.g. DB error); the task
+                    # stays RUNNING and is requeued once its lock goes stale.
+                    logger.exception("[%s] lost task %s", worker, task.pk)
+                    continue
+                self.stdout.write(
+                    f"[{worker}] {task.name} {task.pk}: {task.status}")
+        finally:
+            connection.close()
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# The schema as of this migration, frozen: jobs.search may change later.
+FTS_TABLE = "jobs_job_fts"
+PG_TABLE = "jobs_job_search"
+COLUMNS = ("position_title", "requirements", "responsibilities", "about",
+           "benefits", "job_notes")
+PG_WEIGHTS = ("A", "B", "B", "C", "D", "C")
+
+PG_DOCUMENT = " || ".join(
+    f"setweight(to_tsvector('english', coalesce({name}, '')), '{weight}')"
+    for name, weight in zip(COLUMNS, PG_WEIGHTS))
+
+SQLITE_CREATE = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"job_id UNINDEXED, {', '.join(COLUMNS)}, tokenize='porter unicode61')",
+    f"INSERT INTO {FTS_TABLE} (job_id, {', '.join(COLUMNS)}) "
+    f"SELECT id, {', '.join(COLUMNS)} FROM jobs_job",
+]
+PG_CREATE = [
+    f"CREATE TABLE IF NOT EXISTS {PG_TABLE} ("
+    "job_id uuid PRIMARY KEY REFERENCES jobs_job(id) "
+    "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "document tsvector NOT NULL)",
+    f"CREATE INDEX IF NOT EXISTS {PG_TABLE}_document_gin "
+    f"ON {PG_TABLE} USING GIN (document)",
+    f"INSERT INTO {PG_TABLE} (job_id, document) "
+    f"SELECT id, {PG_DOCUMENT} FROM jobs_job",
+]
+
+
+def create_search_index(apps, schema_editor):
+    statements = {"sqlite": SQLITE_CREATE, "postgresql": PG_CREATE}
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    table = {"sqlite": FTS_TABLE, "postgresql": PG_TABLE}.get(
+        schema_editor.connection.vendor)
+    if table:
+        schema_editor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_job_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
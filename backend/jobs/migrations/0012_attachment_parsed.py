@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_job_posting_checks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachment',
+            name='parsed_sha256',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='parser_version',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
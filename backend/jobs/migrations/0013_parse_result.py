@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:36
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_attachment_parsed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParseResult',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('sha256', models.CharField(max_length=64)),
+                ('parser_version', models.CharField(max_length=32)),
+                ('data', models.JSONField()),
+                ('size_bytes', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['used_at'], name='parseresult_used_idx')],
+                'constraints': [models.UniqueConstraint(fields=('sha256', 'parser_version'), name='parseresult_key_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_parse_result'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='name_key',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:36
+
+from django.db import migrations, models
+
+
+def drop_cached_results(apps, schema_editor):
+    # Existing rows do not say which board parsed them; they are only a
+    # cache, so start it over.
+    apps.get_model("jobs", "ParseResult").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_company_name_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_cached_results, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='parseresult',
+            name='parseresult_key_uniq',
+        ),
+        migrations.AddField(
+            model_name='parseresult',
+            name='board',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddConstraint(
+            model_name='parseresult',
+            constraint=models.UniqueConstraint(fields=('sha256', 'board', 'parser_version'), name='parseresult_key_uniq'),
+        ),
+    ]
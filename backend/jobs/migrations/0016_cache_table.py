@@ -0,0 +1,20 @@
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    # The database cache (settings.CACHES) shares /api/jobs/stats/ across
+    # processes; createcachetable skips tables that already exist.
+    call_command("createcachetable", database=schema_editor.connection.alias,
+                 verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_parse_result_board'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
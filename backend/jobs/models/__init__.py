@@ -1,5 +1,8 @@
 from .company import Company
 from .job import Job
 from .attachment import Attachment
+from .task import Task
+from .fetch_log import FetchLog
+from .parse_result import ParseResult
 
-__all__ = ["Company", "Job", "Attachment"]
+__all__ = ["Company", "Job", "Attachment", "Task", "FetchLog", "ParseResult"]
@@ -51,10 +51,24 @@ class Attachment(models.Model):
     filename = models.CharField(max_length=255, blank=True)
     mime_type = models.CharField(max_length=100, blank=True)
     size_bytes = models.PositiveIntegerField(blank=True, null=True)
+    # Content hash and HTTP validators of fetched job posts, so re-fetches
+    # can be conditional and unchanged bodies are not stored again.
+    sha256 = models.CharField(max_length=64, blank=True)
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    # Content hash and jobs.parsing version of the last parse into the job
+    # (manage.py parse_attachments), so unchanged posts are not re-parsed.
+    parsed_sha256 = models.CharField(max_length=64, blank=True)
+    parser_version = models.CharField(max_length=32, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-uploaded_at"]
+        indexes = [
+            # Keyset pagination order for /api/attachments/
+            models.Index(fields=["-uploaded_at", "id"],
+                         name="attachment_uploaded_id_idx"),
+        ]
         verbose_name = "attachment"
         verbose_name_plural = "attachments"
 
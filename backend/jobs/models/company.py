@@ -17,6 +17,10 @@ class Company(models.Model):
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
+    # Normalized name of companies created from a job post URL
+    # (jobs.quick_entry); unique, so concurrent intakes can't duplicate one.
+    name_key = models.CharField(
+        max_length=255, unique=True, blank=True, null=True, editable=False)
     website = models.URLField(blank=True, null=True)
 
     notes = models.TextField(blank=True, null=True)
@@ -35,8 +39,14 @@ class Company(models.Model):
         help_text="Company size range by employee count",
     )
 
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
         ordering = ["name"]
+        indexes = [
+            # Keyset pagination order for /api/companies/
+            models.Index(fields=["name", "id"], name="company_name_id_idx"),
+        ]
         verbose_name = "company"
         verbose_name_plural = "companies"
 
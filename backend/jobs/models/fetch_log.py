@@ -0,0 +1,38 @@
+from django.db import models
+from django.utils import timezone
+import uuid
+
+
+class FetchLog(models.Model):
+    """
+    One attempt to fetch a job's posting (see ``jobs.postings``).
+
+    ``changed`` is set only when a new body was stored; ``304`` answers and
+    bodies with the same SHA-256 as the stored copy leave it unset.
+    ``closed`` marks a fetch that showed the posting was taken down.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    job = models.ForeignKey(
+        "Job", on_delete=models.CASCADE, related_name="fetch_logs")
+    url = models.URLField(max_length=500)
+
+    status = models.PositiveSmallIntegerField(blank=True, null=True)
+    size_bytes = models.PositiveIntegerField(default=0)
+    duration_ms = models.PositiveIntegerField(default=0)
+    changed = models.BooleanField(default=False)
+    closed = models.BooleanField(default=False)
+    sha256 = models.CharField(max_length=64, blank=True)
+    error = models.TextField(blank=True)
+
+    fetched_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-fetched_at"]
+        indexes = [
+            models.Index(fields=["job", "-fetched_at"],
+                         name="fetchlog_job_fetched_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.url} ({self.status or 'error'})"
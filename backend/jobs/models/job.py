@@ -149,9 +149,33 @@ class Job(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     archived_at = models.DateTimeField(blank=True, null=True)
+    # When the job_post_url was last re-checked, and when it was found
+    # closed (404/410 or a "no longer available" page); see jobs.postings.
+    posting_checked_at = models.DateTimeField(blank=True, null=True)
+    posting_closed_at = models.DateTimeField(blank=True, null=True)
 
     class Meta:
         ordering = ["-priority"]
+        indexes = [
+            # Keyset pagination order for /api/jobs/
+            models.Index(fields=["-priority", "id"],
+                         name="job_priority_id_idx"),
+            # JobFilterSet / ordering on /api/jobs/
+            models.Index(fields=["status", "-priority", "id"],
+                         name="job_status_priority_idx"),
+            models.Index(fields=["company", "status"],
+                         name="job_company_status_idx"),
+            models.Index(fields=["created_at"], name="job_created_idx"),
+            models.Index(fields=["updated_at"], name="job_updated_idx"),
+            models.Index(fields=["date_deadline"], name="job_deadline_idx"),
+            models.Index(fields=["date_applied"], name="job_applied_idx"),
+            models.Index(fields=["date_posted"], name="job_posted_idx"),
+            models.Index(fields=["salary_min"], name="job_salary_min_idx"),
+            models.Index(fields=["salary_max"], name="job_salary_max_idx"),
+            # refresh_postings picks the least recently checked first.
+            models.Index(fields=["posting_checked_at"],
+                         name="job_posting_checked_idx"),
+        ]
 
     def __str__(self):
         return f"{self.position_title} at {self.company.name}"
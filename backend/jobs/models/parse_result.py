@@ -0,0 +1,36 @@
+from django.db import models
+from django.utils import timezone
+import uuid
+
+
+class ParseResult(models.Model):
+    """
+    A cached ``jobs.parsing`` result for one HTML body (see
+    ``jobs.parse_cache``), keyed by the body's SHA-256, the job board
+    extractor that parsed it (``""`` for none) and the parser version.
+    ``used_at`` orders least-recently-used eviction.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    sha256 = models.CharField(max_length=64)
+    board = models.CharField(max_length=32, blank=True, default="")
+    parser_version = models.CharField(max_length=32)
+    data = models.JSONField()
+    size_bytes = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sha256", "board", "parser_version"],
+                name="parseresult_key_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["used_at"], name="parseresult_used_idx"),
+        ]
+
+    def __str__(self):
+        board = f"{self.board}, " if self.board else ""
+        return f"{self.sha256[:12]} ({board}parser {self.parser_version})"
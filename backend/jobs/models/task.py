@@ -0,0 +1,53 @@
+from django.db import models
+from django.utils import timezone
+import uuid
+
+
+class Task(models.Model):
+    """
+    A unit of background work, run by ``manage.py run_workers``.
+
+    The table doubles as the queue: workers claim the oldest due ``QUEUED``
+    row, run the registered function for ``name`` (see ``jobs.tasks``) and
+    record the outcome here, so status, retries and results show up in the
+    admin without any external broker.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED", "Queued"
+        RUNNING = "RUNNING", "Running"
+        SUCCEEDED = "SUCCEEDED", "Succeeded"
+        FAILED = "FAILED", "Failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.QUEUED,
+    )
+
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            # Workers claim with status = QUEUED ORDER BY run_after.
+            models.Index(fields=["status", "run_after"],
+                         name="task_status_run_after_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
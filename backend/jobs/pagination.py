@@ -0,0 +1,285 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a composite, unique ordering.
+
+    Unlike DRF's ``CursorPagination``, which only seeks on the first ordering
+    field and falls back to an OFFSET for ties, the cursor here stores the
+    value of *every* ordering field of the boundary row. Each page is fetched
+    with a ``WHERE (a, b, id) > (...) LIMIT n`` style filter, so the cost of a
+    page is the same on page 1 and page 10,000 as long as an index covers the
+    ordering.
+
+    On nullable ordering fields NULLs always sort as the largest value
+    (``nulls_last`` ascending, ``nulls_first`` descending) so that the seek
+    predicate is well defined on every database backend. Non-nullable fields
+    use plain ``ASC``/``DESC`` so the database can walk a matching index.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE or 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    # Default ordering; views may override it with a ``pagination_ordering``
+    # attribute. The primary key is always appended as the final tie-breaker.
+    ordering = ("-pk",)
+
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        position, reverse = self.decode_cursor(request)
+        self.has_cursor = position is not None
+
+        queryset = queryset.order_by(
+            *self._order_expressions(reverse=reverse))
+        try:
+            if position is not None:
+                queryset = queryset.filter(
+                    self._seek_filter(position, reverse))
+            rows = list(queryset[:self.page_size + 1])
+        except (ValidationError, ValueError, TypeError):
+            # Tampered cursor values that don't fit the field type.
+            raise NotFound(self.invalid_cursor_message)
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        if reverse:
+            self.has_next = self.has_cursor
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.has_cursor
+
+        return self.page
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the ordering as a tuple of ``(field, descending, nullable)``.
+
+        Honours an ``OrderingFilter`` on the view if one is configured,
+        otherwise the view's ``pagination_ordering``, otherwise ``ordering``.
+        """
+        ordering = None
+        for backend in getattr(view, "filter_backends", ()):
+            if hasattr(backend, "get_ordering"):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = getattr(view, "pagination_ordering", None) or self.ordering
+
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+
+        opts = queryset.model._meta
+        terms = []
+        for term in ordering:
+            field = term.lstrip("-")
+            if field == "pk":
+                field = opts.pk.name
+            if field not in (t[0] for t in terms):
+                terms.append((field, term.startswith("-"),
+                              self._is_nullable(opts, field)))
+
+        if opts.pk.name not in (t[0] for t in terms):
+            terms.append((opts.pk.name, False, False))
+        return tuple(terms)
+
+    @staticmethod
+    def _is_nullable(opts, field):
+        try:
+            return opts.get_field(field).null
+        except Exception:
+            # Related lookups ("company__name") may be NULL through the join.
+            return True
+
+    # ------------------------------------------------------------------
+    # Query building
+    # ------------------------------------------------------------------
+
+    def _order_expressions(self, reverse=False):
+        expressions = []
+        for field, descending, nullable in self.ordering:
+            if descending != reverse:
+                expressions.append(
+                    F(field).desc(nulls_first=True) if nullable else F(field).desc())
+            else:
+                expressions.append(
+                    F(field).asc(nulls_last=True) if nullable else F(field).asc())
+        return expressions
+
+    def _seek_filter(self, position, reverse=False):
+        """Build ``(f1, f2, ...) > (v1, v2, ...)`` in the current direction."""
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = None
+        for (field, descending, nullable), value in reversed(
+                list(zip(self.ordering, position))):
+            strict = self._strictly_after(
+                field, value, descending != reverse, nullable)
+            if condition is None:
+                condition = strict
+            else:
+                condition = strict | (self._equal(field, value) & condition)
+        return condition
+
+    @staticmethod
+    def _strictly_after(field, value, descending, nullable=True):
+        if value is None:
+            # NULL is the largest value: nothing comes after it ascending,
+            # every non-NULL value comes after it descending.
+            if descending:
+                return Q(**{f"{field}__isnull": False})
+            return Q(pk__in=[])
+        if descending:
+            return Q(**{f"{field}__lt": value})
+        if not nullable:
+            return Q(**{f"{field}__gt": value})
+        return Q(**{f"{field}__gt": value}) | Q(**{f"{field}__isnull": True})
+
+    @staticmethod
+    def _equal(field, value):
+        if value is None:
+            return Q(**{f"{field}__isnull": True})
+        return Q(**{field: value})
+
+    # ------------------------------------------------------------------
+    # Cursor encoding
+    # ------------------------------------------------------------------
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            payload = json.loads(
+                base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+            position = payload["p"]
+            reverse = bool(payload.get("r", False))
+            if not isinstance(position, list):
+                raise ValueError(position)
+        except (KeyError, TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse=False):
+        payload = {"p": position}
+        if reverse:
+            payload["r"] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        ).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _position(self, item):
+        position = []
+        for field, _, _ in self.ordering:
+            if isinstance(item, dict):
+                value = item[field]
+            else:
+                value = getattr(item, field)
+            if not (value is None or isinstance(value, (bool, int, float, str))):
+                value = str(value)
+            position.append(value)
+        return position
+
+    # ------------------------------------------------------------------
+    # Links & response
+    # ------------------------------------------------------------------
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Reversed past the start; re-enter from the top.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self._position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class JobPagination(KeysetCursorPagination):
+    ordering = ("-priority", "id")
+
+
+class CompanyPagination(KeysetCursorPagination):
+    ordering = ("name", "id")
+
+
+class AttachmentPagination(KeysetCursorPagination):
+    ordering = ("-uploaded_at", "id")
@@ -0,0 +1,202 @@
+"""
+Persistent cache of job post parse results.
+
+Results are ``ParseResult`` rows keyed by the SHA-256 of the HTML, the
+job board the URL belongs to and ``jobs.parsing.PARSER_VERSION``;
+bumping the version makes every old row a miss, and the next eviction
+deletes them. Rows are evicted least
+recently used first once they add up to more than
+``PARSE_CACHE_MAX_BYTES``. Hit/miss counters are kept per process (see
+``/api/diagnostics/parse-cache/``).
+
+The URL matters to the parser only through the board extractor it picks
+(``jobs.parsing.boards``; ``""`` for hosts without one, which get the
+generic heuristics), so a cached result is reused for any URL on the
+same board; only ``job_post_url`` and ``domain`` are filled in per call.
+Keys are ``(sha256, board)`` pairs, see ``board_of``.
+"""
+import hashlib
+import json
+import threading
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from jobs.models import ParseResult
+from jobs.parsing import PARSER_VERSION, ParsedJob, parse
+from jobs.parsing.boards import board_for
+
+# A hit only rewrites used_at when it is older than this, so reads stay
+# reads; LRU order is kept to this granularity.
+TOUCH_INTERVAL = timedelta(minutes=10)
+# Eviction leaves this share of the budget free, so it runs in batches.
+EVICT_TO = 0.9
+
+
+def sha256_of(html):
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+    return hashlib.sha256(html).hexdigest()
+
+
+def board_of(url):
+    """Name of the board extractor that parses ``url``, ``""`` if none."""
+    extractor = board_for(urlsplit(url or "").netloc.lower())
+    return extractor.__name__ if extractor is not None else ""
+
+
+def _with_url(job, url):
+    job.job_post_url = url or None
+    job.domain = urlsplit(url or "").netloc.lower() or None
+    return job
+
+
+class ParseCache:
+    """``ParseResult`` lookups and stores for one parser version."""
+
+    def __init__(self, max_bytes, version=PARSER_VERSION, evict_every=50,
+                 clock=timezone.now):
+        self.max_bytes = max_bytes
+        self.version = version
+        self.evict_every = evict_every
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.stores = self.evictions = 0
+
+    @classmethod
+    def from_settings(cls):
+        return cls(settings.PARSE_CACHE_MAX_BYTES)
+
+    def get_many(self, keys):
+        """
+        ``{(sha256, board): ParsedJob}`` for the cached ones among
+        ``keys``, ``(sha256, board)`` pairs.
+        """
+        keys = {key for key in keys if key[0]}
+        if not keys:
+            return {}
+        rows = [row for row in ParseResult.objects.filter(
+            parser_version=self.version,
+            sha256__in={sha256 for sha256, _ in keys},
+            board__in={board for _, board in keys},
+        ).values_list("pk", "sha256", "board", "data", "used_at")
+            if row[1:3] in keys]
+        now = self.clock()
+        stale = [pk for pk, *_, used_at in rows
+                 if used_at < now - TOUCH_INTERVAL]
+        if stale:
+            ParseResult.objects.filter(pk__in=stale).update(used_at=now)
+        with self.lock:
+            self.hits += len(rows)
+            self.misses += len(keys) - len(rows)
+        return {(sha256, board): ParsedJob.from_json(data)
+                for _, sha256, board, data, _ in rows}
+
+    def get(self, sha256, board=""):
+        return self.get_many([(sha256, board)]).get((sha256, board))
+
+    def put_many(self, results):
+        """
+        Store ``{(sha256, board): ParsedJob}``; evicts every
+        ``evict_every`` puts.
+        """
+        rows = []
+        for (sha256, board), job in results.items():
+            data = job.to_json()
+            data.pop("job_post_url", None)
+            data.pop("domain", None)
+            rows.append(ParseResult(
+                sha256=sha256, board=board, parser_version=self.version,
+                data=data,
+                size_bytes=len(json.dumps(data, separators=(",", ":")))))
+        if not rows:
+            return
+        # Another process may have stored the same key meanwhile.
+        ParseResult.objects.bulk_create(rows, ignore_conflicts=True)
+        with self.lock:
+            before = self.stores
+            self.stores += len(rows)
+            due = before // self.evict_every != self.stores // self.evict_every
+        if due or before == 0:
+            self.evict()
+
+    def put(self, sha256, job, board=""):
+        self.put_many({(sha256, board): job})
+
+    def parse(self, html, url="", sha256=None):
+        """Like ``jobs.parsing.parse``, but answered from the cache if it can."""
+        sha256 = sha256 or sha256_of(html)
+        board = board_of(url)
+        job = self.get(sha256, board)
+        if job is None:
+            job = parse(html, url)
+            self.put(sha256, job, board)
+        return _with_url(job, url)
+
+    def evict(self):
+        """
+        Delete rows of other parser versions, then the least recently used
+        rows until the rest fit in the budget. Returns the rows deleted.
+        """
+        deleted, _ = ParseResult.objects.exclude(
+            parser_version=self.version).delete()
+        total = ParseResult.objects.aggregate(
+            total=Sum("size_bytes"))["total"] or 0
+        if total > self.max_bytes:
+            excess = total - int(self.max_bytes * EVICT_TO)
+            doomed = []
+            for pk, size in ParseResult.objects.order_by(
+                    "used_at").values_list("pk", "size_bytes").iterator():
+                doomed.append(pk)
+                excess -= size
+                if excess <= 0:
+                    break
+            for start in range(0, len(doomed), 500):
+                deleted += ParseResult.objects.filter(
+                    pk__in=doomed[start:start + 500]).delete()[0]
+        with self.lock:
+            self.evictions += deleted
+        return deleted
+
+    def stats(self):
+        usage = ParseResult.objects.filter(parser_version=self.version) \
+            .aggregate(entries=Count("pk"), bytes=Sum("size_bytes"))
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "parser_version": self.version,
+                "entries": usage["entries"],
+                "bytes": usage["bytes"] or 0,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
+
+    def reset_counters(self):
+        with self.lock:
+            self.hits = self.misses = self.stores = self.evictions = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ParseCache:
+    """Return the process's ``ParseCache``, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ParseCache.from_settings()
+    return _cache
+
+
+def cached_parse(html, url="", sha256=None):
+    """Parse ``html`` through the shared cache; returns a ``ParsedJob``."""
+    return get_cache().parse(html, url, sha256)
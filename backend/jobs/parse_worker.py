@@ -0,0 +1,32 @@
+"""
+Worker-process side of ``manage.py parse_attachments``.
+
+Kept free of model imports: spawned workers unpickle these functions
+before Django is set up, and then only need storage and ``jobs.parsing``.
+"""
+import hashlib
+
+import django
+
+
+def init():
+    """Pool initializer; remote storage backends need the settings."""
+    django.setup()
+
+
+def parse_stored(name, path=None, url=""):
+    """
+    Read stored file ``name`` (from ``path`` when it is on local disk) and
+    parse it as a post from ``url``. Returns ``(sha256, ParsedJob, error)``; the hash is computed
+    here so posts stored without one get it too.
+    """
+    from django.core.files.storage import default_storage
+    from jobs.parsing import parse
+
+    try:
+        with open(path, "rb") if path else default_storage.open(name, "rb") \
+                as file:
+            body = file.read()
+    except Exception as exc:  # missing file, storage backend errors
+        return None, None, f"{type(exc).__name__}: {exc}"
+    return hashlib.sha256(body).hexdigest(), parse(body, url), ""
@@ -0,0 +1,27 @@
+"""
+Job post parsing.
+
+``parse(html, url)`` parses the HTML once into an lxml tree and runs a
+pipeline of extractor stages over it, each filling fields of a typed
+``ParsedJob``. ``Parser(stages=...)`` builds a pipeline with other stages.
+Board-specific extractors are picked by the URL's host (``boards``);
+the slow generic heuristics only run for unknown hosts. Pages whose
+JSON-LD ``JobPosting`` has the required fields are answered from a
+streaming scan of the ``<script>`` tags without building a DOM.
+"""
+from .document import Document
+from .jsonld import iter_jsonld
+from .pipeline import (
+    DEFAULT_STAGES, PARSER_VERSION, REQUIRED_FIELDS, Parser, parse)
+from .result import ParsedJob
+
+__all__ = [
+    "DEFAULT_STAGES",
+    "PARSER_VERSION",
+    "REQUIRED_FIELDS",
+    "Document",
+    "ParsedJob",
+    "Parser",
+    "iter_jsonld",
+    "parse",
+]
@@ -0,0 +1,183 @@
+"""
+Job board extractors, dispatched on the job post's host.
+
+``register(*hosts)`` adds an extractor (a stage) for hosts and all their
+subdomains, so ``greenhouse.io`` covers ``boards.greenhouse.io``,
+``job-boards.greenhouse.io`` and ``job-boards.eu.greenhouse.io``. The
+``board`` stage runs the extractor for ``doc.domain``; stages wrapped in
+``unknown_hosts`` (the slow generic heuristics) only run when there is
+none. Each board's XPath is compiled once, here.
+
+Ashby and Workday render in the browser; their server HTML mostly has
+the JSON-LD ``JobPosting`` (read before this stage) and little markup.
+"""
+import functools
+import re
+
+from lxml import etree
+
+from .document import text, xpath_class
+from .stages import H1, PUBLISHED, TITLE, _date
+
+BOARDS = {}
+
+
+def register(*hosts):
+    """Register the decorated extractor for ``hosts`` and their subdomains."""
+    def decorator(extractor):
+        for host in hosts:
+            BOARDS[host] = extractor
+        return extractor
+    return decorator
+
+
+def board_for(domain):
+    """The extractor for ``domain`` (or a parent domain), or ``None``."""
+    domain = (domain or "").partition(":")[0]
+    while domain:
+        if domain in BOARDS:
+            return BOARDS[domain]
+        domain = domain.partition(".")[2]
+    return None
+
+
+def board(doc, result):
+    """Run the extractor registered for the post's host, if any."""
+    extractor = board_for(doc.domain)
+    if extractor is not None:
+        extractor(doc, result)
+
+
+def unknown_hosts(stage):
+    """Run ``stage`` only for hosts without a registered extractor."""
+    @functools.wraps(stage)
+    def run(doc, result):
+        if board_for(doc.domain) is None:
+            stage(doc, result)
+    return run
+
+
+def _fill(doc, result, name, xpath, separator=""):
+    if getattr(result, name) is None:
+        result.set(name, text(doc.find(xpath), separator))
+
+
+def _location(doc, result, xpath):
+    if result.location is None:
+        location = text(doc.find(xpath))
+        result.set("location", location)
+        if location:
+            result.set("is_remote", "remote" in location.lower())
+
+
+# ----------------------------------------------------------------------
+# Greenhouse (job-boards.greenhouse.io, and the classic boards.* layout)
+# ----------------------------------------------------------------------
+
+GREENHOUSE_LOGO = xpath_class("image-container", "//img")
+GREENHOUSE_COMPANY = xpath_class("company-name")
+GREENHOUSE_TITLE = re.compile(r"^Job Application for .+ at (.+)$", re.DOTALL)
+GREENHOUSE_DESCRIPTION = xpath_class("job__description")
+GREENHOUSE_LOCATION = xpath_class("job__location")
+# boards.greenhouse.io: <div id="app_body"><div id="header">...<div id="content">
+CLASSIC_DESCRIPTION = etree.XPath("//div[@id='app_body']/div[@id='content']")
+CLASSIC_LOCATION = etree.XPath(
+    "//div[@id='app_body']/div[@id='header']/*[@class='location']")
+
+
+@register("greenhouse.io")
+def greenhouse(doc, result):
+    """
+    Company from the logo, the "Job Application for ... at Company" title
+    or ``.company-name``; ``.job__description`` and ``.job__location``.
+    """
+    _fill(doc, result, "position_title", H1)
+    if result.company is None:
+        logo = doc.find(GREENHOUSE_LOGO)
+        if logo is not None and logo.get("alt"):
+            result.set("company", logo.get("alt").replace(" Logo", "").strip())
+    if result.company is None:
+        title = GREENHOUSE_TITLE.match(text(doc.find(TITLE)))
+        result.set("company", title.group(1).strip() if title else None)
+    if result.company is None:
+        name = text(doc.find(GREENHOUSE_COMPANY))
+        result.set("company", name.removeprefix("at ").strip())
+    _fill(doc, result, "about", GREENHOUSE_DESCRIPTION, "\n")
+    _fill(doc, result, "about", CLASSIC_DESCRIPTION, "\n")
+    _location(doc, result, GREENHOUSE_LOCATION)
+    _location(doc, result, CLASSIC_LOCATION)
+    if result.date_posted is None:
+        published = doc.find(PUBLISHED)
+        result.set("date_posted", _date(published) if published else None)
+
+
+# ----------------------------------------------------------------------
+# Lever (jobs.lever.co, jobs.eu.lever.co)
+# ----------------------------------------------------------------------
+
+LEVER_TITLE = xpath_class("posting-headline", "//h2")
+LEVER_LOGO = xpath_class("main-header-logo", "//img/@alt")
+LEVER_CATEGORIES = "//*[contains(concat(' ', normalize-space(@class), ' '),"\
+    " ' posting-categories ')]"
+LEVER_LOCATION = etree.XPath(
+    f"{LEVER_CATEGORIES}//*[contains(@class, 'location')]")
+LEVER_DEPARTMENT = etree.XPath(
+    f"{LEVER_CATEGORIES}//*[contains(@class, 'department')]")
+LEVER_COMMITMENT = etree.XPath(
+    f"{LEVER_CATEGORIES}//*[contains(@class, 'commitment')]")
+LEVER_DESCRIPTION = etree.XPath("//*[@data-qa='job-description']")
+
+
+@register("lever.co")
+def lever(doc, result):
+    """``.posting-headline``, ``.posting-categories`` and the description."""
+    _fill(doc, result, "position_title", LEVER_TITLE)
+    if result.company is None:
+        logo = doc.find(LEVER_LOGO)
+        result.set("company", logo.replace(" logo", "").strip() if logo
+                   else None)
+    _location(doc, result, LEVER_LOCATION)
+    _fill(doc, result, "department", LEVER_DEPARTMENT)
+    _fill(doc, result, "employment_type", LEVER_COMMITMENT)
+    _fill(doc, result, "about", LEVER_DESCRIPTION, "\n")
+
+
+# ----------------------------------------------------------------------
+# Ashby (jobs.ashbyhq.com)
+# ----------------------------------------------------------------------
+
+ASHBY_TITLE = etree.XPath("(//title)[1]")
+
+
+@register("ashbyhq.com")
+def ashby(doc, result):
+    """Title and company from the ``<title>``, "Role @ Company"."""
+    element = doc.find(ASHBY_TITLE)
+    title, at, company = text(element).rpartition(" @ ")
+    if at:
+        result.set("position_title", title.strip())
+        result.set("company", company.strip())
+
+
+# ----------------------------------------------------------------------
+# Workday (*.myworkdayjobs.com, *.myworkdaysite.com)
+# ----------------------------------------------------------------------
+
+def _automation_id(name, tail=""):
+    return etree.XPath(f"(//*[@data-automation-id='{name}']{tail})[1]")
+
+
+WORKDAY_TITLE = _automation_id("jobPostingHeader")
+# <div data-automation-id="locations"><dl><dt>locations</dt><dd>...
+WORKDAY_LOCATION = _automation_id("locations", "//dd")
+WORKDAY_EMPLOYMENT = _automation_id("time", "//dd")
+WORKDAY_DESCRIPTION = _automation_id("jobPostingDescription")
+
+
+@register("myworkdayjobs.com", "myworkdaysite.com")
+def workday(doc, result):
+    """``data-automation-id`` fields of the rendered posting."""
+    _fill(doc, result, "position_title", WORKDAY_TITLE)
+    _location(doc, result, WORKDAY_LOCATION)
+    _fill(doc, result, "employment_type", WORKDAY_EMPLOYMENT)
+    _fill(doc, result, "about", WORKDAY_DESCRIPTION, "\n")
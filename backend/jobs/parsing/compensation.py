@@ -0,0 +1,201 @@
+"""
+Salary extraction from job description text.
+
+``find_salary(text)`` scans for money amounts with a currency: ``$120,000
+- $150,000``, ``€55k``, ``140,000-200,000 USD/Year``, ``Up to $25/hr``.
+It returns the most salary-like one as a ``Salary``, or ``None``. Every
+pattern is compiled here, at import time.
+
+Each amount is scored on its surroundings (a range, an explicit unit,
+words like "salary" or "hourly rate" before it) and dropped when the
+value is implausible for its unit (``$500 annual wellness``), has a
+magnitude suffix (``$475M``), or follows words like "reimbursement" in
+the same sentence with no salary word after them.
+Amounts without a unit count as annual, so small ones without one are
+dropped too. Currencies are ISO codes; the ones ``Job.Currency`` has no
+choice for are stored as ``OTHER`` (see ``jobs.extraction``).
+"""
+import re
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+# Symbols and ISO codes, longest symbols first. Covers every Job.Currency.
+SYMBOLS = {
+    "US$": "USD", "CA$": "CAD", "C$": "CAD", "AU$": "AUD", "A$": "AUD",
+    "$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "￥": "JPY", "₹": "INR",
+}
+CODES = (
+    "USD", "EUR", "GBP", "CAD", "AUD", "JPY",
+    "CHF", "SEK", "NOK", "DKK", "PLN", "INR", "NZD", "SGD", "HKD", "MXN",
+    "BRL", "ZAR", "ILS",
+)
+
+# schema.org unitText for each way of writing a unit.
+UNITS = {
+    "hour": "HOUR", "hr": "HOUR", "hourly": "HOUR",
+    "day": "DAY", "daily": "DAY",
+    "week": "WEEK", "wk": "WEEK", "weekly": "WEEK",
+    "month": "MONTH", "mo": "MONTH", "monthly": "MONTH",
+    "year": "YEAR", "yr": "YEAR", "annum": "YEAR", "annual": "YEAR",
+    "annually": "YEAR", "yearly": "YEAR",
+}
+# Smallest and largest believable pay per unit (in any currency but JPY).
+PLAUSIBLE = {
+    "HOUR": (Decimal(7), Decimal(1_000)),
+    "DAY": (Decimal(50), Decimal(10_000)),
+    "WEEK": (Decimal(200), Decimal(50_000)),
+    "MONTH": (Decimal(500), Decimal(200_000)),
+    "YEAR": (Decimal(10_000), Decimal(10_000_000)),
+}
+# Amounts in these are in small units: ¥5,000,000 a year is ordinary.
+SMALL_UNIT_CURRENCIES = {"JPY": 100, "INR": 50}
+
+_SIGNS = "".join(sorted({symbol[-1] for symbol in SYMBOLS}))
+_CURRENCY = "|".join(
+    [re.escape(symbol) for symbol in SYMBOLS]
+    + [rf"(?<![A-Za-z]){code}(?![A-Za-z])" for code in CODES])
+
+
+def _amount(name):
+    # 120,000 / 120.000 / 120 000 (also no-break spaces) / 35.00 / 1.5 + "k".
+    return (rf"(?P<{name}>\d{{1,3}}(?:[,. \u00a0\u202f]\d{{3}})+|\d+)"
+            rf"(?:[.,](?P<{name}_frac>\d{{1,2}})(?!\d))?"
+            rf"(?P<{name}_k>\s?[kK](?![A-Za-z]))?")
+
+
+# Anchored on a currency sign or a digit, so the scan skips plain words
+# quickly; letters before the match ("USD 95,000", "CA$") are read by
+# PREFIX afterwards.
+SALARY = re.compile(
+    rf"(?=[\d{_SIGNS}])(?:(?P<sign>[{_SIGNS}])\s?)?{_amount('low')}"
+    rf"(?:\s*(?:-|–|—|~|to)\s*(?P<between>{_CURRENCY})?\s?{_amount('high')})?"
+    rf"(?:\s?(?P<after>(?<![A-Za-z])(?:{'|'.join(CODES)})(?![A-Za-z])))?")
+PREFIX = re.compile(r"(?<![A-Za-z])[A-Z]{1,3}\s?$")
+NOT_DIGITS = re.compile(r"\D")
+UNIT = re.compile(
+    r"\s*(?:/\s*|per\s+|an?\s+|each\s+|\(\s*)?"
+    rf"(?P<unit>{'|'.join(sorted(UNITS, key=len, reverse=True))})s?\b\)?",
+    re.IGNORECASE)
+MAGNITUDE = re.compile(r"\s?(?:[mMbB]n?|million|billion)\b")
+# Words in the text just before an amount.
+UNIT_WORDS = re.compile(
+    r"\b(hourly|daily|weekly|monthly|annual|annually|yearly)\b", re.IGNORECASE)
+SALARY_WORDS = re.compile(
+    r"\b(salary|salaries|compensation|pay|wages?|rate|base|earn|ote|range)\b",
+    re.IGNORECASE)
+NOT_SALARY_WORDS = re.compile(
+    r"reimburse|stipend|allowance|budget|raised|valuation|revenue|funding"
+    r"|credit|gift|donat|fee\b|cost|worth|\bbonus of", re.IGNORECASE)
+# Everything up to the last sentence end in a window.
+SENTENCES = re.compile(r".*[.!?;]\s", re.DOTALL)
+UP_TO = re.compile(r"\b(?:up to|maximum of|max\.?)\s*$", re.IGNORECASE)
+FROM = re.compile(r"\b(?:starting at|starts at|from|minimum of|at least)\s*$",
+                  re.IGNORECASE)
+CONTEXT = 80
+
+
+class Salary(NamedTuple):
+    min: Optional[Decimal]
+    max: Optional[Decimal]
+    currency: str
+    unit: str
+    raw: str
+
+
+def _currency(text, match):
+    """
+    ``(currency, start)`` of an amount: its ISO code (``None`` if it has
+    none) and where its text starts, letters before a sign included.
+    """
+    start = match.start()
+    prefix = PREFIX.search(text, max(start - 4, 0), start)
+    letters = prefix.group(0) if prefix else ""
+    if match.group("sign"):
+        before = SYMBOLS.get(letters + match.group("sign"))
+        if before is None:
+            before, letters = SYMBOLS[match.group("sign")], ""
+    elif letters.strip() in CODES:
+        before = letters.strip()
+    else:
+        before, letters = None, ""
+    between = match.group("between")
+    # A currency code after the amount is more specific than a "$" before.
+    currency = (match.group("after") or SYMBOLS.get(between, between)
+                or before)
+    return currency, start - len(letters)
+
+
+def _not_salary(window):
+    """
+    Whether the sentence before an amount says it is no salary ("raised",
+    "reimbursement") and no salary word comes after that.
+    """
+    sentences = SENTENCES.match(window)
+    clause = window[sentences.end():] if sentences else window
+    veto = None
+    for veto in NOT_SALARY_WORDS.finditer(clause):
+        pass
+    return veto is not None and not SALARY_WORDS.search(clause, veto.end())
+
+
+def _value(match, name):
+    digits = NOT_DIGITS.sub("", match.group(name))
+    value = Decimal(f"{digits}.{match.group(name + '_frac') or 0}")
+    return value * 1000 if match.group(name + "_k") else value
+
+
+def _candidate(text, match):
+    """``(score, Salary)`` for one amount, or ``None`` if it is no salary."""
+    currency, start = _currency(text, match)
+    if currency is None or MAGNITUDE.match(text, match.end()):
+        return None
+    window = text[max(start - CONTEXT, 0):start]
+    window = window[window.rfind("\n") + 1:]
+    if _not_salary(window):
+        return None
+
+    low = _value(match, "low")
+    high = _value(match, "high") if match.group("high") else None
+    if high is not None and match.group("high_k") and not match.group("low_k") \
+            and low < 1000:
+        low *= 1000  # "$120-150k"
+
+    score, end = 0, match.end()
+    unit = UNIT.match(text, end)
+    if unit:
+        score += 2
+        end = unit.end()
+        unit = UNITS[unit.group("unit").lower()]
+    else:
+        words = UNIT_WORDS.findall(window)
+        unit = UNITS[words[-1].lower()] if words else "YEAR"
+        score += bool(words)
+    if SALARY_WORDS.search(window):
+        score += 1
+
+    factor = SMALL_UNIT_CURRENCIES.get(currency, 1)
+    least, most = PLAUSIBLE[unit]
+    if high is not None:
+        if not least <= low / factor <= high / factor <= most:
+            return None
+        score += 2
+    elif not least <= low / factor <= most:
+        return None
+    elif UP_TO.search(window):
+        low, high = None, low
+    elif FROM.search(window):
+        high = None
+    else:
+        high = low
+    raw = text[start:end].strip()
+    return score, Salary(low, high, currency, unit, raw)
+
+
+def find_salary(text):
+    """The most salary-like amount in ``text`` as a ``Salary``, or ``None``."""
+    best = best_score = None
+    for match in SALARY.finditer(text or ""):
+        found = _candidate(text, match)
+        if found and (best is None or found[0] > best_score):
+            best_score, best = found
+    return best
@@ -0,0 +1,99 @@
+"""
+One parsed HTML document, shared by every stage of a ``Parser``.
+
+The HTML is parsed at most once into an lxml tree, on first access to
+``Document.root``. Stages query it with XPath expressions compiled at
+import time (``xpath_class`` covers the ``.class`` selectors the old
+BeautifulSoup parsers used). ``Document.jsonld`` reads JSON-LD with the
+streaming tokenizer in ``jobs.parsing.jsonld`` unless the tree already
+exists, so a page whose JSON-LD has everything never builds a DOM.
+"""
+from urllib.parse import urlsplit
+
+import lxml.html
+from lxml import etree
+
+from .jsonld import decode, iter_jsonld
+
+# Matches the type as loosely as jsonld.JSONLD_TYPE: any case, parameters.
+JSONLD = etree.XPath(
+    "//script[starts-with(translate(normalize-space(@type),"
+    " 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'),"
+    " 'application/ld+json')]/text()", smart_strings=False)
+
+
+def xpath_class(name, tail=""):
+    """Compiled XPath for elements with CSS class ``name`` (``.name``)."""
+    return etree.XPath(
+        "//*[contains(concat(' ', normalize-space(@class), ' '), "
+        f"' {name} ')]{tail}")
+
+
+def text(element, separator="", strip=True):
+    """
+    Text content of ``element``, like BeautifulSoup's ``get_text``: with
+    ``strip`` each string is stripped and empty ones are dropped before
+    joining with ``separator``.
+    """
+    if element is None:
+        return ""
+    strings = element.itertext()
+    if strip:
+        strings = (s.strip() for s in strings)
+        strings = (s for s in strings if s)
+    return separator.join(strings)
+
+
+class Document:
+    def __init__(self, html, url="", lazy=True):
+        self.html = html or ""
+        self.url = url or ""
+        self.domain = urlsplit(self.url).netloc.lower()
+        self._root = None
+        self._jsonld = None
+        if not lazy:
+            self.build()
+
+    def build(self):
+        """Build the lxml tree now rather than on first use; returns it."""
+        return self.root
+
+    @property
+    def root(self):
+        if self._root is None:
+            try:
+                self._root = lxml.html.document_fromstring(
+                    self.html or "<html/>")
+            except (etree.ParserError, ValueError):
+                # Nothing but whitespace/comments, or undecodable bytes.
+                self._root = lxml.html.document_fromstring("<html/>")
+        return self._root
+
+    @property
+    def has_dom(self):
+        return self._root is not None
+
+    @staticmethod
+    def first(xpath, context):
+        """First match of a compiled ``xpath`` in ``context``, or ``None``."""
+        found = xpath(context)
+        return found[0] if found else None
+
+    def find(self, xpath):
+        return self.first(xpath, self.root)
+
+    @property
+    def body_text(self):
+        body = self.root.find("body")
+        return text(body if body is not None else self.root, " ", strip=False)
+
+    def jsonld(self):
+        """Decoded ``application/ld+json`` blocks (invalid ones skipped)."""
+        if self._jsonld is None:
+            if self._root is None:
+                self._jsonld = list(iter_jsonld(self.html))
+            else:
+                # Decoded like the streaming path, wrappers and all.
+                self._jsonld = [data for data in map(decode, JSONLD(self._root))
+                                if data is not None]
+        return self._jsonld
@@ -0,0 +1,98 @@
+"""
+Golden expected outputs, for checking parser accuracy.
+
+Golden files use the layout of ``testing/parsing/samples/goal.txt``: one
+section per sample headed ``Parsed file: <name>``, then ``field: value``
+lines. A value spanning lines is written as ``field:`` followed by its
+lines, up to the next blank line. ``field: None`` means the field must
+*not* be found (e.g. a benefit amount that is not a salary). Fields that
+``ParsedJob`` does not have, and the summary after a section's closing
+rule, are ignored.
+"""
+import re
+from dataclasses import fields
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from .result import ParsedJob
+
+RULE = "=" * 70
+SUBRULE = "-" * 70
+HEADER = re.compile(r"^Parsed file:\s*(.+?)\s*$")
+FIELD = re.compile(r"^([a-z_]+):(?: (.*))?$")
+IS_RULE = re.compile(r"^(?:-{10,}|={10,})$")
+
+FIELDS = {f.name for f in fields(ParsedJob)} - {"structured"}
+# Written as blocks of lines; compared with whitespace collapsed.
+TEXT_FIELDS = ("about", "responsibilities", "requirements", "benefits")
+
+
+def read_golden(text):
+    """``{sample name: {field: expected string or None}}`` from ``text``."""
+    samples = {}
+    expected = block = None
+    for line in text.splitlines():
+        line = line.rstrip()
+        header = HEADER.match(line)
+        if header:
+            expected = samples[header.group(1)] = {}
+            block = None
+            continue
+        if expected is None:
+            continue
+        if block is not None:
+            if line and not IS_RULE.match(line):
+                block.append(line.strip())
+                continue
+            block = None
+        if IS_RULE.match(line):
+            if expected:  # the closing rule: skip the summary
+                expected = None
+            continue
+        match = FIELD.match(line)
+        if not match or match.group(1) not in FIELDS:
+            continue
+        name, value = match.groups()
+        if value is None:
+            block = []
+            expected[name] = block
+        else:
+            expected[name] = None if value.strip() == "None" else value.strip()
+    for expected in samples.values():
+        for name, value in expected.items():
+            if isinstance(value, list):
+                expected[name] = "\n".join(value)
+    return samples
+
+
+def format_golden(name, job):
+    """A golden section for ``job`` (a ``ParsedJob``), to review and edit."""
+    lines = [RULE, f"Parsed file: {name}", SUBRULE]
+    blocks = []
+    for field, value in job.as_dict().items():
+        if field in TEXT_FIELDS:
+            body = [line.strip() for line in str(value).splitlines()]
+            blocks += ["", f"{field}:", *filter(None, body)]
+        else:
+            lines.append(f"{field}: {value}")
+    return "\n".join(lines + blocks + ["", SUBRULE, ""])
+
+
+def field_matches(expected, value):
+    """Whether a found ``value`` matches the ``expected`` golden string."""
+    if expected is None or value is None:
+        return expected is None and value is None
+    if isinstance(value, Decimal):
+        try:
+            return Decimal(expected) == value
+        except InvalidOperation:
+            return False
+    if isinstance(value, date):
+        return value.isoformat() == expected
+    return " ".join(str(value).split()) == " ".join(expected.split())
+
+
+def score(job, expected):
+    """``{field: matched}`` for each field in ``expected``."""
+    return {name: field_matches(value, getattr(job, name))
+            for name, value in expected.items()}
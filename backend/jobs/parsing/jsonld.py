@@ -0,0 +1,82 @@
+"""
+Streaming JSON-LD extraction.
+
+``iter_jsonld`` finds ``<script type="application/ld+json">`` blocks with a
+small incremental tokenizer instead of building a DOM. It only recognises
+what can hide or contain a script tag: comments, and the raw text of
+``<script>`` / ``<style>`` elements, which is skipped whole so markup-like
+text inside other scripts is never mistaken for a tag. Input may arrive in
+chunks (e.g. read from a spooled ``FetchedPage``), and a caller that stops
+iterating at the first ``JobPosting`` never scans the rest of the page.
+"""
+import codecs
+import json
+import re
+
+# The next comment or <script>/<style> start tag. Quoted attribute values
+# may contain ">".
+MARKUP = re.compile(
+    r"""<(?:(!--)|(script|style)\b((?:[^>"']|"[^"]*"|'[^']*')*)>)""",
+    re.IGNORECASE)
+END_TAG = {
+    "script": re.compile(r"</script\b[^>]*>", re.IGNORECASE),
+    "style": re.compile(r"</style\b[^>]*>", re.IGNORECASE),
+}
+JSONLD_TYPE = re.compile(
+    r"""\btype\s*=\s*["']?\s*application/ld\+json\b""", re.IGNORECASE)
+# Wrappers some pages put around the JSON: <!-- -->, (//)<![CDATA[ ]]>.
+WRAPPER = re.compile(
+    r"^\s*(?:<!--|(?://\s*)?<!\[CDATA\[)|(?:-->|(?://\s*)?\]\]>)\s*$")
+
+
+def iter_blocks(chunks):
+    """Yield the raw text of each JSON-LD script in ``chunks`` of HTML."""
+    if isinstance(chunks, (str, bytes)):
+        chunks = [chunks]
+    utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = utf8.decode(chunk)
+        buffer += chunk
+        pos = 0
+        while True:
+            match = MARKUP.search(buffer, pos)
+            if match is None:
+                # Keep a tag that may be cut off at the chunk boundary.
+                cut = buffer.rfind("<", pos)
+                buffer = buffer[cut:] if cut != -1 else ""
+                break
+            if match.group(1):  # comment
+                end = buffer.find("-->", match.end())
+                if end == -1:
+                    buffer = buffer[match.start():]
+                    break
+                pos = end + 3
+                continue
+            tag = match.group(2).lower()
+            end = END_TAG[tag].search(buffer, match.end())
+            if end is None:
+                buffer = buffer[match.start():]
+                break
+            if tag == "script" and JSONLD_TYPE.search(match.group(3)):
+                yield buffer[match.end():end.start()]
+            pos = end.end()
+
+
+def decode(raw):
+    """Parse one JSON-LD block, or return ``None`` if it is not JSON."""
+    raw = WRAPPER.sub("", raw)
+    try:
+        # strict=False: raw newlines/tabs inside strings are common.
+        return json.loads(raw, strict=False)
+    except ValueError:
+        return None
+
+
+def iter_jsonld(chunks):
+    """Yield each decodable JSON-LD block in ``chunks`` of HTML."""
+    for raw in iter_blocks(chunks):
+        data = decode(raw)
+        if data is not None:
+            yield data
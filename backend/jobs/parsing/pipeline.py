@@ -0,0 +1,63 @@
+from .document import Document
+from .result import ParsedJob
+from . import boards, stages
+
+DEFAULT_STAGES = (
+    stages.jsonld,
+    boards.board,
+    stages.fallback,
+    boards.unknown_hosts(stages.company_scan),
+    stages.salary,
+    stages.remote,
+)
+
+# Bump whenever a change alters what the default pipeline extracts (check
+# with ``manage.py check_parser``): ``parse_attachments`` re-parses stored
+# posts whose last parse was by another version.
+PARSER_VERSION = "3"
+
+# Fields that must be found before the DOM stages may be skipped.
+REQUIRED_FIELDS = ("position_title", "company", "about")
+
+
+class Parser:
+    """
+    Runs ``stages`` in order over a single shared parse of the document.
+
+    Pass your own list to add, drop or reorder stages; each one is a
+    callable ``stage(doc, result)`` (see ``jobs.parsing.stages``).
+
+    Fast path: the tree is only built when a stage needs it. If the
+    ``@text_only`` stages (JSON-LD first) fill every ``required`` field,
+    the DOM stages are skipped and the page is never parsed as HTML.
+    ``lazy_dom=False`` always builds the tree up front.
+    """
+
+    def __init__(self, stages=DEFAULT_STAGES, required=REQUIRED_FIELDS,
+                 lazy_dom=True):
+        self.stages = tuple(stages)
+        self.required = tuple(required)
+        self.lazy_dom = lazy_dom
+
+    def parse(self, html, url=""):
+        """Parse ``html`` (or a ready ``Document``); returns a ``ParsedJob``."""
+        if isinstance(html, Document):
+            doc = html
+        else:
+            doc = Document(html, url, lazy=self.lazy_dom)
+        result = ParsedJob(job_post_url=doc.url or None,
+                           domain=doc.domain or None)
+        for stage in self.stages:
+            if (getattr(stage, "needs_dom", True) and not doc.has_dom
+                    and result.has(*self.required)):
+                continue
+            stage(doc, result)
+        return result
+
+
+default_parser = Parser()
+
+
+def parse(html, url=""):
+    """Parse a job post with the default stages; returns a ``ParsedJob``."""
+    return default_parser.parse(html, url)
@@ -0,0 +1,76 @@
+from dataclasses import asdict, dataclass, field, fields
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+
+@dataclass
+class ParsedJob:
+    """
+    Fields a parser could extract from a job post, named after ``Job``.
+
+    Stages only fill fields that are still ``None``, so earlier (more
+    reliable) stages win. ``structured`` keeps the raw schema.org
+    ``JobPosting`` object when the page had one.
+    """
+
+    job_post_url: Optional[str] = None
+    domain: Optional[str] = None
+
+    position_title: Optional[str] = None
+    company: Optional[str] = None
+    location: Optional[str] = None
+    is_remote: Optional[bool] = None
+    department: Optional[str] = None
+    employment_type: Optional[str] = None
+    date_posted: Optional[date] = None
+
+    salary_min: Optional[Decimal] = None
+    salary_max: Optional[Decimal] = None
+    salary_currency: Optional[str] = None
+    # schema.org unitText: HOUR, DAY, WEEK, MONTH or YEAR.
+    salary_unit: Optional[str] = None
+    salary_raw: Optional[str] = None
+
+    about: Optional[str] = None
+    responsibilities: Optional[str] = None
+    requirements: Optional[str] = None
+    benefits: Optional[str] = None
+
+    structured: dict = field(default_factory=dict, repr=False)
+
+    def set(self, name, value):
+        """Fill ``name`` with ``value`` unless it is already set or empty."""
+        if getattr(self, name) is None and value not in (None, ""):
+            setattr(self, name, value)
+
+    def has(self, *names):
+        return all(getattr(self, name) is not None for name in names)
+
+    def as_dict(self):
+        """The fields that were found, without ``structured``."""
+        data = asdict(self)
+        data.pop("structured")
+        return {key: value for key, value in data.items() if value is not None}
+
+    def to_json(self):
+        """A JSON-ready dict of the found fields, ``structured`` included."""
+        data = self.as_dict()
+        for name, value in data.items():
+            if isinstance(value, (date, Decimal)):
+                data[name] = str(value)
+        if self.structured:
+            data["structured"] = self.structured
+        return data
+
+    @classmethod
+    def from_json(cls, data):
+        """The ``ParsedJob`` that ``to_json`` returned ``data`` for."""
+        known = {f.name for f in fields(cls)}
+        job = cls(**{k: v for k, v in data.items() if k in known})
+        if job.date_posted is not None:
+            job.date_posted = date.fromisoformat(job.date_posted)
+        for name in ("salary_min", "salary_max"):
+            if getattr(job, name) is not None:
+                setattr(job, name, Decimal(getattr(job, name)))
+        return job
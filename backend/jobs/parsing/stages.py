@@ -0,0 +1,223 @@
+"""
+Extractor stages.
+
+A stage is any callable ``stage(doc, result)`` that reads the shared
+``Document`` and fills fields of the ``ParsedJob`` it is handed. Stages
+run in order and only fill what is still empty, so put the most reliable
+sources first. XPath expressions are compiled once, here, at import time.
+
+Stages marked ``@text_only`` do not need the DOM; the others are skipped
+once the required fields are filled without one (see ``Parser``).
+"""
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+import lxml.html
+from lxml import etree
+
+from .compensation import find_salary
+from .document import text
+
+H1 = etree.XPath("(//h1)[1]")
+TITLE = etree.XPath("(//title)[1]")
+PUBLISHED = etree.XPath(
+    "//meta[@property='article:published_time']/@content")
+OG_SITE_NAME = etree.XPath("(//meta[@property='og:site_name'])[1]/@content")
+LOGO = etree.XPath(
+    "//img[contains(@alt, 'Logo')]"
+    " | //*[contains(concat(' ', normalize-space(@class), ' '),"
+    " ' image-container ')]//img[@alt]")
+# Leaf <div>/<span> elements, for the last-resort company name scan.
+SHORT_LEAVES = etree.XPath("//div[not(*)] | //span[not(*)]")
+
+
+def text_only(stage):
+    """Mark ``stage`` as not needing ``doc.root`` (it runs on the fast path)."""
+    stage.needs_dom = False
+    return stage
+
+
+def _decimal(value):
+    if value in (None, ""):
+        return None
+    try:
+        return Decimal(str(value).replace(",", ""))
+    except InvalidOperation:
+        return None
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+# ----------------------------------------------------------------------
+# schema.org JobPosting (JSON-LD)
+# ----------------------------------------------------------------------
+
+def is_jobposting(obj):
+    if not isinstance(obj, dict):
+        return False
+    kind = obj.get("@type")
+    return kind == "JobPosting" or (
+        isinstance(kind, list) and "JobPosting" in kind)
+
+
+def find_jobposting(blocks):
+    """The first ``JobPosting`` in decoded JSON-LD blocks (incl. @graph)."""
+    for data in blocks:
+        for item in data if isinstance(data, list) else [data]:
+            if is_jobposting(item):
+                return item
+            graph = item.get("@graph") if isinstance(item, dict) else None
+            for node in graph if isinstance(graph, list) else ():
+                if is_jobposting(node):
+                    return node
+    return None
+
+
+def _name(value):
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        return value.get("name")
+    return value if isinstance(value, str) else None
+
+
+def _location(value):
+    if isinstance(value, list):
+        return _location(value[0]) if value else None
+    if not isinstance(value, dict):
+        return None
+    address = value.get("address") or {}
+    if isinstance(address, str):
+        return address
+    parts = [address.get("addressLocality"), address.get("addressRegion"),
+             _name(address.get("addressCountry"))]
+    return ", ".join(part for part in parts if part) or None
+
+
+def _clean(value):
+    return value.strip() if isinstance(value, str) else value
+
+
+def _html_text(html):
+    if not html or "<" not in html:
+        return html
+    try:
+        fragment = lxml.html.fragment_fromstring(html, create_parent="div")
+    except (etree.ParserError, ValueError):
+        return html
+    return text(fragment, "\n")
+
+
+def apply_jobposting(posting, result):
+    """Fill ``result`` from a schema.org ``JobPosting`` dict."""
+    result.structured = posting
+    result.set("position_title", _clean(posting.get("title")))
+    result.set("company", _clean(_name(posting.get("hiringOrganization"))))
+    result.set("location", _location(posting.get("jobLocation")))
+    if posting.get("jobLocationType"):
+        result.set("is_remote", posting["jobLocationType"] == "TELECOMMUTE")
+    employment = posting.get("employmentType")
+    if isinstance(employment, list):
+        employment = ", ".join(map(str, employment))
+    result.set("employment_type", _clean(employment))
+    result.set("date_posted", _date(posting.get("datePosted") or ""))
+
+    salary = posting.get("baseSalary")
+    if isinstance(salary, dict):
+        value = salary.get("value")
+        if isinstance(value, dict):
+            low, high = value.get("minValue"), value.get("maxValue")
+            low = low if low is not None else value.get("value")
+            unit = value.get("unitText") or salary.get("unitText")
+        else:
+            low = high = value
+            unit = salary.get("unitText")
+        result.set("salary_min", _decimal(low))
+        result.set("salary_max", _decimal(high if high is not None else low))
+        result.set("salary_currency", salary.get("currency")
+                   or posting.get("salaryCurrency"))
+        result.set("salary_unit", unit)
+
+    result.set("about", _html_text(posting.get("description")))
+    result.set("responsibilities", _clean(posting.get("responsibilities")))
+    result.set("requirements", _clean(posting.get("qualifications")))
+    result.set("benefits", _clean(posting.get("jobBenefits")))
+
+
+@text_only
+def jsonld(doc, result):
+    """schema.org ``JobPosting`` JSON-LD, the most reliable source."""
+    posting = find_jobposting(doc.jsonld())
+    if posting is not None:
+        apply_jobposting(posting, result)
+
+
+# ----------------------------------------------------------------------
+# Generic fallbacks
+# ----------------------------------------------------------------------
+
+def fallback(doc, result):
+    """Title/company from ``<h1>``, ``<title>``, logos and site metadata."""
+    if result.position_title is None:
+        title = text(doc.find(H1))
+        if not title:
+            element = doc.find(TITLE)
+            title = (element.text or "").strip() if element is not None else ""
+        result.set("position_title", title)
+
+    if result.company is None:
+        logo = doc.find(LOGO)
+        if logo is not None and logo.get("alt"):
+            result.set("company", logo.get("alt").replace(" Logo", "").strip())
+    if result.company is None:
+        site = doc.find(OG_SITE_NAME)
+        result.set("company", site.strip() if site else None)
+
+
+def company_scan(doc, result):
+    """
+    Last resort for ``company``: the first short ``<div>``/``<span>`` leaf
+    that reads like a name. Walks every leaf, so it is slow on big pages.
+    """
+    if result.company is None:
+        for element in SHORT_LEAVES(doc.root):
+            raw = element.text or ""
+            if not raw or "©" in raw or len(raw) >= 60:
+                continue
+            name = raw.strip()
+            if not name or "career" in name.lower() or "job" in name.lower():
+                continue
+            if len(name.split()) <= 3:
+                result.set("company", name)
+                break
+
+
+@text_only
+def salary(doc, result):
+    """
+    Salary from the description text only (see ``jobs.parsing.compensation``),
+    so amounts elsewhere on the page are never mistaken for one.
+    """
+    if result.salary_min is not None or result.salary_max is not None:
+        return
+    found = find_salary(result.about)
+    if found is None:
+        return
+    result.set("salary_min", found.min)
+    result.set("salary_max", found.max)
+    result.set("salary_currency", found.currency)
+    result.set("salary_unit", found.unit)
+    result.set("salary_raw", found.raw)
+
+
+@text_only
+def remote(doc, result):
+    """``is_remote`` from the location, else from the description."""
+    if result.is_remote is None:
+        haystack = result.location or result.about or ""
+        result.is_remote = "remote" in haystack.lower()
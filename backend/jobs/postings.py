@@ -0,0 +1,268 @@
+"""
+Re-fetching job posts without rewriting unchanged ones.
+
+A stored ``job_post`` attachment keeps the SHA-256 of its body and the
+``ETag`` / ``Last-Modified`` it was served with. Re-fetches send those
+back as ``If-None-Match`` / ``If-Modified-Since``; a ``304``, or a ``200``
+whose body hashes the same as the stored copy, leaves storage untouched.
+Every attempt is recorded as a ``FetchLog`` row.
+
+Fetches also tell whether a posting was taken down (``404``/``410``, a
+redirect back to the board, or a "no longer available" page). Such jobs
+get ``posting_closed_at`` set and their last good copy is kept.
+``manage.py refresh_postings`` uses ``plan_refresh`` to re-check open jobs
+a budget at a time.
+"""
+import re
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+import requests
+from lxml import etree
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from jobs.crawler import host_of
+from jobs.fetchers import conditional_headers, fetch_job_post
+from jobs.models import Attachment, FetchLog, Job
+from jobs.parsing.document import Document, text
+from jobs.storage import save_job_post
+
+CLOSED_STATUSES = (404, 410)
+
+# Wording boards use in place of a posting that was taken down.
+CLOSED_PAGE = re.compile(
+    r"no longer (?:available|accepting applications|open|active)"
+    r"|(?:job|position|posting|role|vacancy) (?:has been|was) "
+    r"(?:filled|closed|removed)"
+    r"|this (?:job|position|posting|vacancy) (?:has )?(?:expired|closed)"
+    r"|(?:job|posting) (?:not found|does not exist|doesn't exist)"
+    r"|page you are looking for (?:does not|doesn't|can't|cannot) "
+    r"(?:exist|be found)",
+    re.IGNORECASE,
+)
+# The notice sits in the title or main heading, or at the top of the
+# body: only those are searched, so a live posting whose description
+# mentions a role "no longer open" is not flagged. Only the first
+# CLOSED_SCAN_BYTES of the page are parsed for them.
+CLOSED_PLACES = etree.XPath("//title | //h1")
+CLOSED_TOP_CHARS = 500
+CLOSED_SCAN_BYTES = 256 * 1024
+NOT_TEXT = etree.XPath("//script | //style | //noscript | //template")
+# Boards that redirect closed postings to the listing (Greenhouse).
+CLOSED_URL = re.compile(r"[?&]error=true(?:&|$)")
+
+# Statuses not worth re-checking: the posting no longer matters.
+FINISHED_STATUSES = (Job.Status.ARCHIVED, Job.Status.ACCEPTED)
+# Re-check order: closing deadline first, then jobs not yet applied to,
+# then ones in progress, then the rest; stalest first within each.
+DEADLINE_SOON = timedelta(days=14)
+NOT_APPLIED_STATUSES = (Job.Status.BOOKMARKED, Job.Status.APPLYING)
+IN_PROGRESS_STATUSES = (
+    Job.Status.APPLIED, Job.Status.INTERVIEWING, Job.Status.NEGOTIATING)
+
+
+def current_job_posts(jobs):
+    """Map job id -> its stored ``job_post`` attachment, in one query."""
+    posts = {}
+    for attachment in Attachment.objects.filter(
+            job__in=jobs, type="job_post").order_by("uploaded_at"):
+        posts[attachment.job_id] = attachment  # newest wins
+    return posts
+
+
+def revalidation_headers(attachment):
+    """Conditional request headers for a stored job post (or ``{}``)."""
+    if attachment is None:
+        return {}
+    return conditional_headers(attachment.etag, attachment.last_modified)
+
+
+def shared_revalidation_headers(jobs_by_url, current):
+    """
+    Headers per URL for a crawl. A URL shared by several jobs is only sent
+    conditionally when they all hold the same copy.
+    """
+    headers = {}
+    for url, jobs in jobs_by_url.items():
+        sent = {tuple(revalidation_headers(current.get(job.pk)).items())
+                for job in jobs}
+        if len(sent) == 1:
+            headers[url] = dict(sent.pop())
+    return headers
+
+
+def closed_reason(status, page=None):
+    """Why a fetch shows the posting was taken down, or ``""``."""
+    if status in CLOSED_STATUSES:
+        return f"HTTP {status}"
+    if page is None or page.not_modified:
+        return ""
+    if CLOSED_URL.search(page.url or ""):
+        return "Redirected to the job board"
+    notice = closed_notice(page.text(CLOSED_SCAN_BYTES))
+    return f"Page says {notice!r}" if notice else ""
+
+
+def closed_notice(html):
+    """
+    The "no longer available" wording in the page's title, main heading or
+    first ``CLOSED_TOP_CHARS`` of body text, or ``""``.
+    """
+    root = Document(html).root
+    for element in NOT_TEXT(root):
+        element.drop_tree()
+    body = root.find("body")
+    places = [text(element, " ") for element in CLOSED_PLACES(root)]
+    places.append(text(body if body is not None else root, " ")
+                  [:CLOSED_TOP_CHARS])
+    for place in places:
+        match = CLOSED_PAGE.search(place)
+        if match:
+            return match.group(0)
+    return ""
+
+
+def store_page(job, page, current=None):
+    """
+    Save ``page`` as the job's post unless it matches ``current``.
+    Returns ``(attachment, changed)``.
+    """
+    if page.not_modified:
+        return current, False
+    if current is not None and current.sha256 == page.sha256:
+        # Same body; only refresh the validators if the server rotated them.
+        if (current.etag, current.last_modified) != (page.etag,
+                                                     page.last_modified):
+            current.etag, current.last_modified = page.etag, page.last_modified
+            current.save(update_fields=["etag", "last_modified"])
+        return current, False
+    return save_job_post(job, page), True
+
+
+def record_fetch(job, url, elapsed, page=None, attachment=None,
+                 changed=False, closed=False, status=None, error=""):
+    """Append a ``FetchLog`` row for one fetch of ``job``'s post."""
+    return FetchLog.objects.create(
+        job=job,
+        url=url,
+        status=page.status if page is not None else status,
+        size_bytes=page.size if page is not None else 0,
+        duration_ms=round(elapsed * 1000),
+        changed=changed,
+        closed=closed,
+        sha256=attachment.sha256 if attachment is not None else "",
+        error=error,
+    )
+
+
+def apply_fetch(jobs, url, elapsed, page=None, status=None, error="",
+                current=None):
+    """
+    Record one fetch of ``url`` for every job tracking it: store the page
+    where it changed, log it, stamp ``posting_checked_at`` and flag the
+    jobs if the posting was taken down. Returns the ``FetchLog`` rows.
+    """
+    if current is None:
+        current = current_job_posts(jobs)
+    status = page.status if page is not None else status
+    reason = closed_reason(status, page)
+    logs = []
+    for job in jobs:
+        attachment, changed = current.get(job.pk), False
+        if page is not None and not reason:
+            attachment, changed = store_page(job, page, attachment)
+        logs.append(record_fetch(
+            job, url, elapsed, page=page,
+            attachment=attachment if page is not None else None,
+            changed=changed, closed=bool(reason), status=status,
+            error=error or reason))
+
+    now = timezone.now()
+    fields = {"posting_checked_at": now}
+    if reason:
+        # Flagging is a visible change: bump updated_at for ETags.
+        fields.update(posting_closed_at=now, updated_at=now)
+    Job.objects.filter(pk__in=[job.pk for job in jobs]).update(**fields)
+    for job in jobs:
+        for name, value in fields.items():
+            setattr(job, name, value)
+    return logs
+
+
+def refresh_job_post(job, timeout=(5, 15)):
+    """
+    Conditionally re-fetch ``job``'s posting and store it if it changed.
+    Returns the ``FetchLog``. Fetch errors are logged, then re-raised
+    unless they show the posting was taken down.
+    """
+    url = job.job_post_url
+    current = current_job_posts([job])
+    start = time.perf_counter()
+    try:
+        page = fetch_job_post(url, timeout=timeout,
+                              headers=revalidation_headers(current.get(job.pk)))
+    except (requests.RequestException, ValueError) as exc:
+        response = getattr(exc, "response", None)
+        [log] = apply_fetch([job], url, time.perf_counter() - start,
+                            status=getattr(response, "status_code", None),
+                            error=str(exc), current=current)
+        if not log.closed:
+            raise
+        return log
+    with page:
+        [log] = apply_fetch([job], url, time.perf_counter() - start,
+                            page=page, current=current)
+    return log
+
+
+def refresh_queue(min_age=timedelta(hours=24), now=None):
+    """
+    Open jobs with a posting URL that are due for a re-check, most
+    urgent first (see ``DEADLINE_SOON`` and the status groups above).
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    return (
+        Job.objects
+        .exclude(status__in=FINISHED_STATUSES)
+        .exclude(job_post_url__isnull=True).exclude(job_post_url="")
+        .filter(posting_closed_at__isnull=True)
+        .filter(Q(posting_checked_at__isnull=True)
+                | Q(posting_checked_at__lte=now - min_age))
+        .annotate(refresh_rank=Case(
+            When(date_deadline__range=(today, today + DEADLINE_SOON),
+                 then=Value(0)),
+            When(status__in=NOT_APPLIED_STATUSES, then=Value(1)),
+            When(status__in=IN_PROGRESS_STATUSES, then=Value(2)),
+            default=Value(3),
+            output_field=IntegerField(),
+        ))
+        .order_by("refresh_rank",
+                  F("posting_checked_at").asc(nulls_first=True),
+                  F("date_deadline").asc(nulls_last=True), "id")
+        .select_related("company")
+    )
+
+
+def plan_refresh(budget, per_host=None, min_age=timedelta(hours=24),
+                 now=None):
+    """
+    Pick up to ``budget`` URLs (one request each) from ``refresh_queue``,
+    at most ``per_host`` per host, so one run never spends its budget on a
+    single board. Returns ``{url: [jobs]}`` in priority order.
+    """
+    plan = defaultdict(list)
+    per_host_count = Counter()
+    for job in refresh_queue(min_age, now).iterator(chunk_size=500):
+        url = job.job_post_url
+        if url not in plan:
+            if len(plan) >= budget:
+                break
+            host = host_of(url)
+            if per_host is not None and per_host_count[host] >= per_host:
+                continue
+            per_host_count[host] += 1
+        plan[url].append(job)
+    return dict(plan)
@@ -0,0 +1,254 @@
+"""
+Creating a job from its posting URL in one call (``POST /api/jobs/from-url/``).
+
+``JobIntake.run`` goes through the phases in ``PHASES``: fetch the page
+(``jobs.fetchers``), parse it (through ``jobs.parse_cache``), get or
+create the ``Company`` by normalized name, create the ``Job`` and store
+the page as its ``job_post`` attachment (``jobs.postings.apply_fetch``,
+which also logs the fetch). Each phase's duration is kept for the
+response's ``Server-Timing`` header.
+
+``start`` runs an intake on a small shared thread pool and
+``JobIntake.wait`` waits for it at most the time budget. The caller
+answers with whatever is done by then; the thread finishes the rest in
+the background. The job's id is picked up front and doubles as the id of
+a ``job_from_url`` task (``jobs.tasks``) that records how the intake
+ended, so the outcome can be read back (``intake_task``). Should the
+process die mid-way, the task is requeued and a worker runs the intake
+again, reusing the job if it was already created.
+"""
+import logging
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from jobs import extraction, tasks
+from jobs.fetchers import fetch_job_post
+from jobs.models import Attachment, Company, Job, Task
+from jobs.parse_cache import cached_parse
+from jobs.parsing import PARSER_VERSION
+from jobs.postings import apply_fetch
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("fetch", "parse", "company", "job", "store")
+TASK = "job_from_url"
+
+# Trailing legal forms ignored when matching company names.
+LEGAL_SUFFIX = re.compile(
+    r"\s+(?:inc|incorporated|llc|llp|ltd|limited|corp|corporation|co|company"
+    r"|gmbh|ag|plc|sa|sas|bv|nv|pty|oy|ab)$")
+PUNCTUATION = re.compile(r"[^\w\s&]")
+
+
+def normalize_company_name(name):
+    """``"Acme, Inc."`` -> ``"acme"``: casefolded, no punctuation or legal form."""
+    key = " ".join(PUNCTUATION.sub(" ", name.casefold()).split())
+    return LEGAL_SUFFIX.sub("", key) or key
+
+
+def _company_key(name):
+    # Names that are all punctuation ("|") match as written.
+    return normalize_company_name(name) or " ".join(name.casefold().split())
+
+
+def get_or_create_company(name):
+    """
+    The company whose normalized name matches ``name``, created if none.
+    Created companies keep the key in the unique ``name_key``: of two
+    concurrent creates, the second gets the first one's company.
+    """
+    name = " ".join(name.split())
+    key = _company_key(name)
+    if not key:
+        raise ValueError("Empty company name.")
+    candidates = Company.objects.filter(
+        Q(name_key=key) | Q(name__istartswith=key.split()[0])).order_by("name")
+    for company in candidates:
+        if company.name_key == key or _company_key(company.name) == key:
+            return company, False
+    try:
+        with transaction.atomic():
+            return Company.objects.create(name=name, name_key=key), True
+    except IntegrityError:
+        return Company.objects.get(name_key=key), False
+
+
+class IntakeFailed(Exception):
+    """A worker's run of an intake failed; the message is the intake's."""
+
+
+class JobIntake:
+    """One URL's way to a stored job, readable while it is under way."""
+
+    def __init__(self, url, job_id=None):
+        self.url = url
+        self.job_id = uuid.UUID(str(job_id)) if job_id else uuid.uuid4()
+        self.timings = {}  # phase -> milliseconds, in the order they ran
+        self.parsed = None
+        self.company_created = False
+        self.resumed = False  # the job was left by an earlier run
+        self.error = None
+        self.task = None  # the Task recording this run, if ``start``-ed
+        self.finished = threading.Event()
+        self._future = None
+
+    @property
+    def done(self):
+        return list(self.timings)
+
+    @property
+    def pending(self):
+        return [phase for phase in PHASES if phase not in self.timings]
+
+    def _timed(self, phase, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.timings[phase] = (time.perf_counter() - start) * 1000
+        return result
+
+    def run(self):
+        """
+        Run every phase. Errors end up in ``error`` (and the log), and the
+        outcome in ``task`` if there is one.
+        """
+        close_old_connections()
+        try:
+            page = self._timed("fetch", fetch_job_post, self.url)
+            with page:
+                self.parsed = self._timed(
+                    "parse", cached_parse, page.text(), page.url, page.sha256)
+                company = self._timed("company", self._company)
+                job = self._timed("job", self._job, company)
+                self._timed("store", self._store, job, page)
+        except (requests.RequestException, ValueError) as exc:
+            self.error = str(exc)
+            logger.warning("Job from %s failed: %s", self.url, exc)
+        except Exception as exc:
+            self.error = f"{type(exc).__name__}: {exc}"
+            logger.exception("Job from %s failed", self.url)
+        try:
+            if self.task is not None:
+                tasks.finish(self.task, None if self.error else self.outcome(),
+                             self.error or "")
+        except Exception:
+            # Left RUNNING, the task is requeued and a worker retries.
+            logger.exception("Could not record the job from %s", self.url)
+        finally:
+            close_old_connections()
+            self.finished.set()
+
+    def outcome(self):
+        """The finished run, as stored in its task's result."""
+        return {"job_id": str(self.job_id),
+                "company_created": self.company_created,
+                "timings_ms": {phase: round(ms, 1)
+                               for phase, ms in self.timings.items()}}
+
+    def _company(self):
+        # Without a usable name on the page, the host stands in until edited.
+        name = self.parsed.company or ""
+        if not normalize_company_name(name):
+            name = urlsplit(self.url).hostname.removeprefix("www.")
+        company, self.company_created = get_or_create_company(name)
+        return company
+
+    def _job(self, company):
+        job = Job.objects.filter(pk=self.job_id).first()
+        if job is not None:
+            self.resumed = True
+            return job
+        job = Job(id=self.job_id, company=company, job_post_url=self.url,
+                  position_title="")
+        extraction.apply_parsed(job, self.parsed)
+        job.position_title = job.position_title or "Untitled"
+        job.save(force_insert=True)
+        return job
+
+    def _store(self, job, page):
+        elapsed = self.timings["fetch"] / 1000
+        with transaction.atomic():
+            apply_fetch([job], self.url, elapsed, page=page,
+                        current=None if self.resumed else {})
+            # Parsed just now: parse_attachments can skip it.
+            Attachment.objects.filter(
+                job=job, type="job_post", sha256=page.sha256,
+            ).update(parsed_sha256=page.sha256, parser_version=PARSER_VERSION)
+
+    def wait(self, seconds):
+        """Wait up to ``seconds`` for the run; ``True`` if it finished."""
+        try:
+            self._future.result(timeout=max(seconds, 0))
+        except FutureTimeout:
+            return False
+        return True
+
+    def server_timing(self, total_ms):
+        """A ``Server-Timing`` header value for the phases done so far."""
+        metrics = [f"{phase};dur={ms:.1f}"
+                   for phase, ms in list(self.timings.items())]
+        metrics.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(metrics)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process's intake thread pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.JOB_FROM_URL_WORKERS,
+                    thread_name_prefix="job-from-url")
+    return _executor
+
+
+def clean_url(url):
+    """``url`` stripped, or a ``ValidationError`` unless it is http(s)."""
+    url = url.strip() if isinstance(url, str) else ""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValidationError({"url": "Expected an http(s) URL."})
+    return url
+
+
+def start(url):
+    """Start a ``JobIntake`` for ``url`` in the background and return it."""
+    intake = JobIntake(clean_url(url))
+    intake.task = tasks.start(
+        TASK, {"url": intake.url, "job_id": str(intake.job_id)},
+        worker=f"web:{socket.gethostname()}:{os.getpid()}", pk=intake.job_id)
+    intake._future = get_executor().submit(intake.run)
+    return intake
+
+
+def intake_task(job_id):
+    """The ``Task`` of the intake that creates job ``job_id``, or ``None``."""
+    try:
+        job_id = uuid.UUID(str(job_id))
+    except ValueError:
+        return None
+    return Task.objects.filter(pk=job_id, name=TASK).first()
+
+
+def task_error(task_obj):
+    """The error a failed intake task ended with, as ``JobIntake.error``."""
+    last = task_obj.error.strip().splitlines()[-1] if task_obj.error else ""
+    # A worker's run records the traceback of an ``IntakeFailed``.
+    return last.partition(f"{IntakeFailed.__name__}: ")[2] or last
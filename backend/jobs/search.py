@@ -0,0 +1,212 @@
+"""
+Full-text search over job descriptions and notes.
+
+The inverted index lives next to ``jobs_job`` and is maintained row by row
+from the ``Job`` save/delete signals (see ``jobs.signals``):
+
+* SQLite: an FTS5 virtual table, ranked with ``bm25()`` and highlighted
+  with ``snippet()``.
+* PostgreSQL: a ``tsvector`` side table with a GIN index, ranked with
+  ``ts_rank_cd()`` and highlighted with ``ts_headline()``.
+
+Other backends fall back to ``icontains`` without ranking. The tables are
+created by migration ``0007_job_search_index``; changing ``INDEXED_FIELDS``
+takes a new migration (and a ``rebuild()``).
+"""
+import html
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from jobs.models import Job
+
+FTS_TABLE = "jobs_job_fts"
+PG_TABLE = "jobs_job_search"
+
+# Indexed columns, most important first, with their ranking weight.
+INDEXED_FIELDS = [
+    ("position_title", 10.0),
+    ("requirements", 4.0),
+    ("responsibilities", 4.0),
+    ("about", 2.0),
+    ("benefits", 1.0),
+    ("job_notes", 2.0),
+]
+_PG_WEIGHTS = ["A", "B", "B", "C", "D", "C"]
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# The database marks matches with these private-use characters; snippets
+# are HTML-escaped before they become HIGHLIGHT_START/END, so markup in
+# scraped posting text comes back as text.
+_MARK_START = "\ue000"
+_MARK_END = "\ue001"
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit.
+_CHUNK = 500
+
+
+def is_supported(conn=None):
+    return (conn or connection).vendor in ("sqlite", "postgresql")
+
+
+def _pg_document_sql():
+    return " || ".join(
+        f"setweight(to_tsvector('english', coalesce({name}, '')), '{weight}')"
+        for (name, _), weight in zip(INDEXED_FIELDS, _PG_WEIGHTS)
+    )
+
+
+# ----------------------------------------------------------------------
+# Incremental maintenance
+# ----------------------------------------------------------------------
+
+def _db_ids(job_ids):
+    """Yield chunks of job ids in the form the backend stores them."""
+    job_ids = [str(pk) if connection.vendor == "postgresql" else pk.hex
+               for pk in job_ids]
+    for start in range(0, len(job_ids), _CHUNK):
+        yield job_ids[start:start + _CHUNK]
+
+
+def index_jobs(job_ids):
+    """(Re)index the given jobs from their current database rows."""
+    if not is_supported():
+        return
+    for chunk in _db_ids(job_ids):
+        _index_chunk(chunk)
+
+
+def _index_chunk(job_ids):
+    columns = ", ".join(name for name, _ in INDEXED_FIELDS)
+    placeholders = ", ".join(["%s"] * len(job_ids))
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE job_id IN ({placeholders})", job_ids)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (job_id, {columns}) "
+                f"SELECT id, {columns} FROM jobs_job WHERE id IN ({placeholders})",
+                job_ids,
+            )
+        else:
+            cursor.execute(
+                f"INSERT INTO {PG_TABLE} (job_id, document) "
+                f"SELECT id, {_pg_document_sql()} FROM jobs_job "
+                f"WHERE id IN ({placeholders}) "
+                "ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document",
+                job_ids,
+            )
+
+
+def remove_jobs(job_ids):
+    if not is_supported():
+        return
+    table = FTS_TABLE if connection.vendor == "sqlite" else PG_TABLE
+    with connection.cursor() as cursor:
+        for chunk in _db_ids(job_ids):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"DELETE FROM {table} WHERE job_id IN ({placeholders})", chunk)
+
+
+def rebuild():
+    """Rebuild the whole index from ``jobs_job``. Returns the row count."""
+    if not is_supported():
+        return 0
+    columns = ", ".join(name for name, _ in INDEXED_FIELDS)
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (job_id, {columns}) "
+                f"SELECT id, {columns} FROM jobs_job")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        else:
+            cursor.execute(f"TRUNCATE {PG_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {PG_TABLE} (job_id, document) "
+                f"SELECT id, {_pg_document_sql()} FROM jobs_job")
+        cursor.execute("SELECT COUNT(*) FROM jobs_job")
+        return cursor.fetchone()[0]
+
+
+# ----------------------------------------------------------------------
+# Querying
+# ----------------------------------------------------------------------
+
+def _fts5_query(q):
+    """
+    Turn free text into a safe FTS5 query: every word must match, the last
+    one as a prefix so results show up while typing.
+    """
+    terms = _TERM.findall(q)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " AND ".join(quoted)
+
+
+def search(q, limit=20):
+    """
+    Return up to ``limit`` hits as ``(job_id, rank, snippet)`` tuples, best
+    match first. ``rank`` is higher-is-better on every backend. Snippets
+    are HTML-escaped, with matches in ``HIGHLIGHT_START``/``HIGHLIGHT_END``.
+    """
+    if not q or not q.strip():
+        return []
+    vendor = connection.vendor
+
+    if vendor == "sqlite":
+        match = _fts5_query(q)
+        if match is None:
+            return []
+        weights = ", ".join(["0.0"] + [str(w) for _, w in INDEXED_FIELDS])
+        sql = (
+            f"SELECT job_id, -bm25({FTS_TABLE}, {weights}) AS score, "
+            f"snippet({FTS_TABLE}, -1, %s, %s, '…', 16) "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            "ORDER BY score DESC LIMIT %s"
+        )
+        params = [_MARK_START, _MARK_END, match, limit]
+    elif vendor == "postgresql":
+        text = " || ' ' || ".join(
+            f"coalesce(j.{name}, '')" for name, _ in INDEXED_FIELDS)
+        sql = (
+            "SELECT hit.job_id, hit.score, ts_headline('english', "
+            f"{text}, hit.query, %s) FROM ("
+            "  SELECT s.job_id, ts_rank_cd(s.document, q) AS score, q AS query"
+            f"  FROM {PG_TABLE} s, websearch_to_tsquery('english', %s) q"
+            "  WHERE s.document @@ q ORDER BY score DESC LIMIT %s"
+            ") hit JOIN jobs_job j ON j.id = hit.job_id ORDER BY hit.score DESC"
+        )
+        options = (f'StartSel="{_MARK_START}", StopSel="{_MARK_END}", '
+                   "MaxFragments=2, MaxWords=20, MinWords=5")
+        params = [options, q, limit]
+    else:
+        condition = Q()
+        for name, _ in INDEXED_FIELDS:
+            condition |= Q(**{f"{name}__icontains": q})
+        ids = Job.objects.filter(condition).values_list("id", flat=True)[:limit]
+        return [(pk, 0.0, "") for pk in ids]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    id_field = Job._meta.pk
+    return [
+        (id_field.to_python(job_id), float(rank), _highlight(snippet))
+        for job_id, rank, snippet in rows
+    ]
+
+
+def _highlight(snippet):
+    """Escape ``snippet``, then turn the match markers into tags."""
+    return (html.escape(snippet or "")
+            .replace(_MARK_START, HIGHLIGHT_START)
+            .replace(_MARK_END, HIGHLIGHT_END))
@@ -1,11 +1,17 @@
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from jobs.models import Company, Job, Attachment
 
 
+def _split_param(value):
+    """Split a comma-separated query param into a list of names."""
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
 class CompanySerializer(serializers.ModelSerializer):
     class Meta:
         model = Company
-        fields = "__all__"
+        exclude = ["name_key"]
 
 
 class AttachmentSerializer(serializers.ModelSerializer):
@@ -39,3 +45,44 @@ class JobSerializer(serializers.ModelSerializer):
     class Meta:
         model = Job
         fields = "__all__"
+
+    # Nested objects that are only rendered on request in sparse mode.
+    EXPANDABLE_FIELDS = ("company", "attachments")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fieldset = self.get_sparse_fieldset(self.context.get("request"))
+        if fieldset is not None:
+            self._apply_sparse_fieldset(*fieldset)
+
+    @classmethod
+    def get_sparse_fieldset(cls, request):
+        """
+        Read ``?fields=`` / ``?expand=`` from a read request.
+
+        Returns ``None`` when neither is given (full representation, with
+        company and attachments nested), otherwise ``(fields, expand)`` where
+        ``fields`` is the list of requested names or ``None`` for all of them.
+        """
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        params = request.query_params
+        if "fields" not in params and "expand" not in params:
+            return None
+        expand = set(_split_param(params.get("expand"))) & set(
+            cls.EXPANDABLE_FIELDS)
+        fields = _split_param(params.get("fields")) or None
+        return fields, expand
+
+    def _apply_sparse_fieldset(self, fields, expand):
+        if "company" not in expand:
+            # Uses company_id directly; never touches the companies table.
+            self.fields["company"] = serializers.PrimaryKeyRelatedField(
+                read_only=True)
+        if "attachments" not in expand:
+            self.fields.pop("attachments")
+        if fields is not None:
+            keep = set(fields) | expand
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
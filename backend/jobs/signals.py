@@ -1,7 +1,9 @@
 # jobs/signals.py
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from jobs.models import Attachment
+from django.utils import timezone
+from jobs import search, stats
+from jobs.models import Attachment, Company, Job
 
 
 @receiver(post_delete, sender=Attachment)
@@ -9,3 +11,30 @@ def delete_file_from_storage(sender, instance, **kwargs):
     file_field = instance.file
     if file_field and file_field.storage.exists(file_field.name):
         file_field.storage.delete(file_field.name)
+
+
+@receiver(post_save, sender=Attachment)
+@receiver(post_delete, sender=Attachment)
+def touch_job_on_attachment_change(sender, instance, **kwargs):
+    # Attachments are nested in the job representation; bump updated_at so
+    # the job's ETag / Last-Modified change with them.
+    Job.objects.filter(pk=instance.job_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Job)
+def index_job_for_search(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_jobs([instance.pk])
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_from_search(sender, instance, **kwargs):
+    search.remove_jobs([instance.pk])
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_job_stats(sender, **kwargs):
+    stats.invalidate()
@@ -0,0 +1,150 @@
+"""
+Pipeline analytics for ``/api/jobs/stats/``.
+
+Everything is computed in the database with a handful of aggregate /
+GROUP BY queries, then cached until a job or company changes (see
+``jobs.signals`` and ``jobs.bulk``), so the dashboard costs one cache read
+however much history there is.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Count, DurationField, ExpressionWrapper, F, FloatField, Q)
+from django.db.models.functions import Cast, Round
+from django.utils import timezone
+
+from jobs.models import Job
+
+CACHE_KEY = "jobs:stats"
+
+Status = Job.Status
+
+# Funnel stages and what counts as having reached each one: the stage's
+# date is set, or the job's status is at or past it.
+FUNNEL = [
+    (Status.APPLIED, Q(date_applied__isnull=False) | Q(status__in=[
+        Status.APPLIED, Status.INTERVIEWING, Status.NEGOTIATING,
+        Status.ACCEPTED, Status.NOT_ACCEPTED, Status.NO_RESPONSE])),
+    (Status.INTERVIEWING, Q(date_interviewed__isnull=False) | Q(status__in=[
+        Status.INTERVIEWING, Status.NEGOTIATING, Status.ACCEPTED])),
+    (Status.NEGOTIATING, Q(date_offered__isnull=False) | Q(status__in=[
+        Status.NEGOTIATING, Status.ACCEPTED])),
+    (Status.ACCEPTED, Q(date_accepted__isnull=False) | Q(status=Status.ACCEPTED)),
+]
+
+APPLIED = FUNNEL[0][1]
+# An application got a response if it moved on to an interview or was
+# turned down.
+RESPONDED = APPLIED & (
+    FUNNEL[1][1] | Q(date_rejected__isnull=False) | Q(status=Status.NOT_ACCEPTED))
+
+# Medians reported in days, as (name, start date, end date).
+DURATIONS = [
+    ("applied_to_interviewed", "date_applied", "date_interviewed"),
+    ("applied_to_rejected", "date_applied", "date_rejected"),
+]
+
+# Response-rate breakdowns, as (name, {output key: GROUP BY column}).
+BREAKDOWNS = [
+    ("company", {"id": "company_id", "name": "company__name"}),
+    ("industry", {"industry": "company__industry"}),
+    ("size", {"size": "company__size"}),
+]
+
+
+def get_stats():
+    """Return the cached stats, computing them on a miss."""
+    stats = cache.get(CACHE_KEY)
+    if stats is None:
+        stats = compute_stats()
+        cache.set(CACHE_KEY, stats, settings.JOB_STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def invalidate():
+    cache.delete(CACHE_KEY)
+
+
+def compute_stats(queryset=None):
+    queryset = (Job.objects.all() if queryset is None else queryset).order_by()
+
+    by_status = dict.fromkeys(Status.values, 0)
+    by_status.update(
+        queryset.values_list("status").annotate(n=Count("pk")))
+
+    totals = queryset.aggregate(
+        total=Count("pk"),
+        **{f"stage_{stage}": Count("pk", filter=reached)
+           for stage, reached in FUNNEL},
+        **{f"pairs_{name}": Count("pk", filter=Q(**{
+            f"{start}__isnull": False, f"{end}__isnull": False}))
+           for name, start, end in DURATIONS},
+    )
+
+    funnel = []
+    previous = None
+    for stage, _ in FUNNEL:
+        count = totals[f"stage_{stage}"]
+        funnel.append({
+            "stage": stage,
+            "count": count,
+            "conversion": (round(count / previous, 4) if previous else None),
+        })
+        previous = count
+
+    return {
+        "total": totals["total"],
+        "by_status": by_status,
+        "funnel": funnel,
+        "response_rates": {
+            name: _response_rates(queryset, keys)
+            for name, keys in BREAKDOWNS
+        },
+        "median_days": {
+            name: _median_days(queryset, start, end, totals[f"pairs_{name}"])
+            for name, start, end in DURATIONS
+        },
+        "generated_at": timezone.now().isoformat(),
+    }
+
+
+def _response_rates(queryset, keys):
+    columns = list(keys.values())
+    rows = (
+        queryset.values(*columns)
+        .annotate(applied=Count("pk", filter=APPLIED),
+                  responded=Count("pk", filter=RESPONDED))
+        .filter(applied__gt=0)
+        .annotate(rate=Round(
+            Cast("responded", FloatField()) / Cast("applied", FloatField()), 4))
+        .order_by("-applied", *columns)
+    )
+    return [
+        {**{key: row[column] for key, column in keys.items()},
+         "applied": row["applied"], "responded": row["responded"],
+         "rate": row["rate"]}
+        for row in rows
+    ]
+
+
+def _median_days(queryset, start, end, count):
+    """
+    Median of ``end - start`` in days over rows with both dates. Fetches
+    just the middle one or two values with ORDER BY ... LIMIT/OFFSET, which
+    works on every backend (SQLite has no median aggregate).
+    """
+    if not count:
+        return None
+    elapsed = ExpressionWrapper(F(end) - F(start), output_field=DurationField())
+    middle = list(
+        queryset.filter(**{f"{start}__isnull": False, f"{end}__isnull": False})
+        .annotate(_elapsed=elapsed)
+        .order_by("_elapsed")
+        .values_list("_elapsed", flat=True)[(count - 1) // 2:count // 2 + 1]
+    )
+    if not middle:
+        return None
+    median = sum(middle, timedelta()) / len(middle)
+    return round(median.total_seconds() / 86400, 1)
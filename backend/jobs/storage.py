@@ -0,0 +1,72 @@
+"""Helpers for storing and removing attachment files."""
+import logging
+
+from django.core.files.base import File
+from django.db import transaction
+
+from jobs.models import Attachment
+
+logger = logging.getLogger(__name__)
+
+# S3 DeleteObjects accepts at most 1000 keys per request.
+S3_DELETE_BATCH = 1000
+
+
+def delete_files(storage, names):
+    """
+    Delete many stored files at once.
+
+    On S3-compatible storage this issues one ``DeleteObjects`` request per
+    1000 keys instead of an ``exists`` + ``delete`` round trip per file;
+    other storages fall back to deleting one by one. Missing files are
+    ignored either way.
+    """
+    names = [name for name in names if name]
+    if not names:
+        return
+
+    bucket = getattr(storage, "bucket", None)
+    if bucket is not None and hasattr(storage, "_normalize_name"):
+        for start in range(0, len(names), S3_DELETE_BATCH):
+            batch = names[start:start + S3_DELETE_BATCH]
+            bucket.delete_objects(Delete={
+                "Objects": [{"Key": storage._normalize_name(name)} for name in batch],
+                "Quiet": True,
+            })
+        return
+
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.warning("Could not delete stored file %s", name, exc_info=True)
+
+
+def job_post_filename(job):
+    return (
+        f"{job.company.name or 'unknown'}-{job.position_title}.html"
+    ).replace(" ", "_")
+
+
+def save_job_post(job, page):
+    """
+    Store a fetched page (``jobs.fetchers.FetchedPage``) as the job's
+    ``job_post`` attachment, replacing any previous one. The body is handed
+    to the storage backend as a file, so it is streamed (multipart on S3)
+    rather than copied into memory. Returns the new ``Attachment``.
+    """
+    filename = job_post_filename(job)
+
+    # Remove old job_post attachments for this job
+    Attachment.objects.filter(job=job, type="job_post").delete()
+
+    # Save file and record atomically
+    with transaction.atomic():
+        page.file.seek(0)
+        attachment = Attachment(job=job, type="job_post", sha256=page.sha256,
+                                etag=page.etag,
+                                last_modified=page.last_modified)
+        attachment.file.save(filename, File(page.file, name=filename),
+                             save=False)
+        attachment.save()
+    return attachment
@@ -0,0 +1,219 @@
+"""
+DB-backed background tasks.
+
+Functions registered with ``@task`` are enqueued as ``Task`` rows and run
+by ``manage.py run_workers``. Claiming is a conditional UPDATE
+(``... WHERE id = %s AND status = 'QUEUED'``), so any number of worker
+threads or processes can share the table on SQLite or PostgreSQL without a
+broker. Failures are retried with exponential backoff up to
+``max_attempts``. A running task's lock is renewed by ``heartbeat``; tasks
+whose lock is older than ``TASK_LOCK_TIMEOUT`` seconds (their worker
+died) are requeued by ``requeue_stale``, which the workers call
+periodically.
+"""
+import logging
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+from jobs.models import Job, Task
+from jobs.postings import refresh_job_post
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(func=None, *, name=None):
+    """Register ``func`` as a task runnable by the workers."""
+    def register(func):
+        _registry[name or func.__name__] = func
+        return func
+    return register(func) if func is not None else register
+
+
+def _task_kwargs(name, payload, max_attempts, run_after):
+    if name not in _registry:
+        raise LookupError(f"Unknown task {name!r}")
+    return dict(
+        name=name,
+        payload=payload or {},
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+        run_after=run_after or timezone.now(),
+    )
+
+
+def enqueue(name, payload=None, max_attempts=None, run_after=None):
+    return Task.objects.create(
+        **_task_kwargs(name, payload, max_attempts, run_after))
+
+
+def enqueue_many(name, payloads, max_attempts=None):
+    return Task.objects.bulk_create([
+        Task(**_task_kwargs(name, payload, max_attempts, None))
+        for payload in payloads
+    ])
+
+
+def start(name, payload=None, worker="", pk=None, max_attempts=None):
+    """
+    Record a task that the caller runs itself, claimed by ``worker``;
+    ``finish`` records the outcome. If the caller dies first, the task is
+    requeued like any other abandoned one and a worker runs it.
+    """
+    kwargs = _task_kwargs(name, payload, max_attempts, None)
+    if pk is not None:
+        kwargs["id"] = pk
+    return Task.objects.create(
+        **kwargs, status=Task.Status.RUNNING, locked_by=worker,
+        locked_at=kwargs["run_after"], attempts=1)
+
+
+def finish(task_obj, result=None, error=""):
+    """Record the outcome of a task run by whoever ``start``-ed it."""
+    task_obj.status = Task.Status.FAILED if error else Task.Status.SUCCEEDED
+    task_obj.result = result
+    task_obj.error = error
+    task_obj.finished_at = timezone.now()
+    task_obj.locked_by = ""
+    task_obj.save(update_fields=[
+        "status", "result", "error", "finished_at", "locked_by"])
+    return task_obj
+
+
+# ----------------------------------------------------------------------
+# Worker side
+# ----------------------------------------------------------------------
+
+def claim(worker, now=None):
+    """Atomically take the oldest due task for ``worker``, or return None."""
+    now = now or timezone.now()
+    due = Task.objects.filter(
+        status=Task.Status.QUEUED, run_after__lte=now).order_by("run_after")
+    # Another worker may win the race for a candidate; try the next one.
+    for _ in range(5):
+        pk = due.values_list("pk", flat=True).first()
+        if pk is None:
+            return None
+        claimed = Task.objects.filter(pk=pk, status=Task.Status.QUEUED).update(
+            status=Task.Status.RUNNING, locked_by=worker, locked_at=now,
+            attempts=F("attempts") + 1)
+        if claimed:
+            return Task.objects.get(pk=pk)
+    return None
+
+
+def run(task_obj):
+    """Run a claimed task and record its outcome."""
+    func = _registry.get(task_obj.name)
+    now = timezone.now
+    try:
+        if func is None:
+            raise LookupError(f"Unknown task {task_obj.name!r}")
+        result = func(**task_obj.payload)
+    except Exception:
+        task_obj.error = traceback.format_exc()
+        logger.warning("Task %s (%s) failed, attempt %d/%d",
+                       task_obj.pk, task_obj.name, task_obj.attempts,
+                       task_obj.max_attempts)
+        if task_obj.attempts < task_obj.max_attempts:
+            delay = settings.TASK_RETRY_BACKOFF * 2 ** (task_obj.attempts - 1)
+            task_obj.status = Task.Status.QUEUED
+            task_obj.run_after = now() + timedelta(seconds=delay)
+        else:
+            task_obj.status = Task.Status.FAILED
+            task_obj.finished_at = now()
+    else:
+        task_obj.status = Task.Status.SUCCEEDED
+        task_obj.result = result
+        task_obj.error = ""
+        task_obj.finished_at = now()
+    task_obj.locked_by = ""
+    task_obj.save(update_fields=[
+        "status", "result", "error", "run_after", "finished_at", "locked_by"])
+    return task_obj
+
+
+@contextmanager
+def heartbeat(task_obj, interval=None):
+    """
+    Renew ``task_obj``'s lock every ``interval`` seconds (a third of
+    ``TASK_LOCK_TIMEOUT`` by default) while the body runs, so a task that
+    takes longer than the timeout is not mistaken for an abandoned one.
+    """
+    if interval is None:
+        interval = settings.TASK_LOCK_TIMEOUT / 3
+    done = threading.Event()
+
+    def beat():
+        try:
+            while not done.wait(interval):
+                Task.objects.filter(
+                    pk=task_obj.pk, status=Task.Status.RUNNING,
+                    locked_by=task_obj.locked_by,
+                ).update(locked_at=timezone.now())
+        except Exception:
+            logger.exception("Heartbeat of task %s failed", task_obj.pk)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, daemon=True,
+                              name=f"heartbeat-{task_obj.pk}")
+    thread.start()
+    try:
+        yield task_obj
+    finally:
+        done.set()
+        thread.join()
+
+
+def requeue_stale(timeout=None):
+    """Hand tasks whose worker died (RUNNING past the timeout) back out."""
+    timeout = settings.TASK_LOCK_TIMEOUT if timeout is None else timeout
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = Task.objects.filter(status=Task.Status.RUNNING, locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Task.Status.FAILED, locked_by="", finished_at=timezone.now(),
+        error="Worker stopped responding.")
+    requeued = stale.update(status=Task.Status.QUEUED, locked_by="")
+    return requeued + failed
+
+
+# ----------------------------------------------------------------------
+# Tasks
+# ----------------------------------------------------------------------
+
+@task
+def fetch_job_post(job_id):
+    """
+    (Re-)fetch a job's posting and store it as its ``job_post`` attachment
+    if it changed (see ``jobs.postings``).
+    """
+    job = Job.objects.select_related("company").get(pk=job_id)
+    if not job.job_post_url:
+        raise ValueError(f"{job} has no job_post_url set.")
+    log = refresh_job_post(job)
+    return {"status": log.status, "bytes": log.size_bytes,
+            "changed": log.changed, "sha256": log.sha256}
+
+
+@task
+def job_from_url(url, job_id):
+    """
+    Finish a ``POST /api/jobs/from-url/`` whose process went away before
+    it did (see ``jobs.quick_entry``), picking up after the last phase
+    that was committed.
+    """
+    # quick_entry starts these tasks through this module.
+    from jobs.quick_entry import IntakeFailed, JobIntake
+    intake = JobIntake(url, job_id)
+    intake.run()
+    if intake.error:
+        raise IntakeFailed(intake.error)
+    return intake.outcome()
@@ -1,3 +1,1936 @@
-from django.test import TestCase
+import base64
+import csv
+import hashlib
+import io
+import json
+import re
+import tempfile
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock, skipIf
 
-# Create your tests here.
+import requests
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import PROTECT
+from django.db.models.deletion import get_candidate_relations_to_delete
+from django.http import QueryDict
+from django.test import (
+    SimpleTestCase, TestCase, TransactionTestCase, override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jobs import (
+    bulk, extraction, fetchers, parse_cache, postings, quick_entry, search,
+    tasks)
+from jobs.crawler import Crawler
+from jobs.filters import JobFilterSet
+from jobs.http_standin import StandInServer
+from jobs.parse_cache import ParseCache
+from jobs.management.commands.benchmark_parsing import (
+    HEAP_SAMPLING, SAMPLES_DIR, docs_per_second, legacy_parse,
+    load_legacy_parsers, peak_heap, with_jsonld)
+from jobs.management.commands.benchmark_salary import read_corpus
+from jobs.management.commands.check_parser import regressions
+from jobs.parsing import (
+    PARSER_VERSION, Document, ParsedJob, Parser, boards, golden, iter_jsonld,
+    parse, stages)
+from jobs.parsing.compensation import find_salary
+from jobs.renderers import orjson
+from jobs.storage import save_job_post
+from jobs.models import (
+    Attachment, Company, FetchLog, Job, ParseResult, Task)
+from jobs.views import CompanyViewSet, JobViewSet
+
+
+def seed_jobs(company, count, attachments_per_job=2):
+    """Bulk-insert ``count`` jobs, each with a few attachment rows."""
+    jobs = Job.objects.bulk_create([
+        Job(company=company, position_title=f"Job {i}", priority=i % 5)
+        for i in range(count)
+    ])
+    Attachment.objects.bulk_create([
+        Attachment(job=job, type="job_post", file=f"attachments/{job.id}-{n}.html",
+                   filename=f"{job.id}-{n}.html", mime_type="text/html")
+        for job in jobs
+        for n in range(attachments_per_job)
+    ])
+    return jobs
+
+
+class QueryCountRegressionTests(TestCase):
+    """
+    Guard against N+1 queries: every list/detail endpoint must issue the same
+    number of queries whether the table holds 10 or 1000 jobs.
+    """
+
+    SIZES = (10, 100, 1000)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _query_counts(self, build_url):
+        counts = {}
+        for size in self.SIZES:
+            Job.objects.all().delete()
+            Company.objects.all().delete()
+            company = Company.objects.create(name=f"Company {size}")
+            jobs = seed_jobs(company, size)
+
+            url = build_url(company, jobs)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            counts[size] = len(ctx.captured_queries)
+        return counts
+
+    def assertConstantQueries(self, build_url):
+        counts = self._query_counts(build_url)
+        self.assertEqual(
+            len(set(counts.values())), 1,
+            f"query count grows with row count: {counts}",
+        )
+
+    def test_job_list(self):
+        self.assertConstantQueries(lambda c, j: "/api/jobs/?page_size=500")
+
+    def test_job_detail(self):
+        self.assertConstantQueries(lambda c, j: f"/api/jobs/{j[-1].id}/")
+
+    def test_company_list(self):
+        self.assertConstantQueries(lambda c, j: "/api/companies/?page_size=500")
+
+    def test_company_detail(self):
+        self.assertConstantQueries(lambda c, j: f"/api/companies/{c.id}/")
+
+    def test_company_jobs(self):
+        self.assertConstantQueries(
+            lambda c, j: f"/api/companies/{c.id}/jobs/?page_size=500")
+
+    def test_attachment_list(self):
+        self.assertConstantQueries(lambda c, j: "/api/attachments/?page_size=500")
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursors of jobs.pagination.KeysetCursorPagination."""
+
+    def setUp(self):
+        self.client = APIClient()
+        company = Company.objects.create(name="Acme")
+        # Ties on priority and on the deadline, and NULL deadlines.
+        deadlines = [None, date(2025, 1, 1), date(2025, 1, 1), None,
+                     date(2024, 6, 1), date(2025, 3, 1), None]
+        self.jobs = Job.objects.bulk_create([
+            Job(company=company, position_title=f"Job {i}", priority=i % 3,
+                date_deadline=deadline)
+            for i, deadline in enumerate(deadlines)])
+
+    def pages(self, url, link="next"):
+        """Follow ``link`` from ``url``: the ids on each page."""
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            data = response.json()
+            pages.append([job["id"] for job in data["results"]])
+            url = data[link]
+        return pages
+
+    def test_forward_and_back(self):
+        cases = {
+            "/api/jobs/?fields=id&page_size=2":
+                lambda job: (-job.priority, job.id.hex),
+            # NULLs sort last ascending.
+            "/api/jobs/?fields=id&page_size=2&ordering=date_deadline":
+                lambda job: (job.date_deadline is None, job.date_deadline
+                             or date.min, job.id.hex),
+        }
+        for url, key in cases.items():
+            with self.subTest(url=url):
+                expected = [str(job.id) for job in sorted(self.jobs, key=key)]
+                forward = self.pages(url)
+                self.assertEqual([len(page) for page in forward], [2, 2, 2, 1])
+                self.assertEqual(sum(forward, []), expected)
+
+                # Back from the last page retraces the same pages.
+                last = self.client.get(url).json()
+                while last["next"]:
+                    last = self.client.get(last["next"]).json()
+                back = self.pages(last["previous"], link="previous")
+                self.assertEqual(back, forward[-2::-1])
+
+    def test_tampered_cursors(self):
+        def cursor(payload):
+            return base64.urlsafe_b64encode(
+                json.dumps(payload).encode()).decode()
+
+        for value in ["not-base64!", cursor([1, 2]), cursor({"p": "x"}),
+                      cursor({"r": 1}), cursor({"p": [1]}),
+                      cursor({"p": ["high", str(self.jobs[0].id)]}),
+                      base64.urlsafe_b64encode(b"\xff\xfe").decode()]:
+            with self.subTest(cursor=value):
+                response = self.client.get("/api/jobs/", {"cursor": value})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {"detail": "Invalid cursor"})
+
+    def test_page_size_is_capped(self):
+        seed_jobs(Company.objects.create(name="Big"), 600,
+                  attachments_per_job=0)
+        for page_size, expected in [("10000", 500), ("500", 500), ("3", 3),
+                                    ("0", 50), ("-1", 50), ("many", 50)]:
+            with self.subTest(page_size=page_size):
+                response = self.client.get(
+                    "/api/jobs/", {"fields": "id", "page_size": page_size})
+                self.assertEqual(len(response.json()["results"]), expected)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.company = Company.objects.create(name="Acme")
+        seed_jobs(self.company, 3)
+
+    def test_fields_limits_output_and_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/jobs/?fields=id,position_title")
+        row = response.json()["results"][0]
+        self.assertEqual(set(row), {"id", "position_title"})
+        # Conditional-GET aggregate + the page itself.
+        self.assertEqual(len(ctx.captured_queries), 2)
+        for query in ctx.captured_queries:
+            self.assertNotIn('"about"', query["sql"])
+
+    def test_company_is_id_unless_expanded(self):
+        row = self.client.get(
+            "/api/jobs/?fields=id,company").json()["results"][0]
+        self.assertEqual(row["company"], str(self.company.id))
+
+        row = self.client.get(
+            "/api/jobs/?fields=id&expand=company,attachments").json()["results"][0]
+        self.assertEqual(row["company"]["name"], "Acme")
+        self.assertEqual(len(row["attachments"]), 2)
+
+    def test_default_representation_is_unchanged(self):
+        row = self.client.get("/api/jobs/").json()["results"][0]
+        self.assertIn("about", row)
+        self.assertEqual(row["company"]["name"], "Acme")
+        self.assertIn("attachments", row)
+
+
+class FastListPathTests(TestCase):
+    """The values()-based list path must render byte-for-byte the same JSON."""
+
+    def setUp(self):
+        self.client = APIClient()
+        company = Company.objects.create(
+            name="Ünïcode   Co", keywords=["AI", 1e16, 0.5])
+        Company.objects.create(name="Empty Co")
+        jobs = seed_jobs(company, 5)
+        Job.objects.filter(pk=jobs[0].pk).update(
+            salary_min="120000.5", salary_max=150000, about="line\nbreak\u2028sep",
+            date_applied="2025-01-31", education={"gpa": 3.5, "big": 1e-7},
+            archived_at="2025-02-01T12:30:45.123456Z",
+        )
+        Attachment.objects.filter(job=jobs[1]).update(file="")
+
+    def assertSameBytes(self, viewset, url):
+        fast = self.client.get(url)
+        with mock.patch.object(viewset, "fast_list", False):
+            slow = self.client.get(url)
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, slow.content)
+
+    def test_job_list(self):
+        self.assertSameBytes(JobViewSet, "/api/jobs/")
+        self.assertSameBytes(JobViewSet, "/api/jobs/?page_size=2")
+        self.assertSameBytes(
+            JobViewSet, "/api/jobs/?fields=id,salary_min,company&expand=attachments")
+
+    def test_company_list(self):
+        self.assertSameBytes(CompanyViewSet, "/api/companies/")
+
+
+class JobFilterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.acme = Company.objects.create(name="Acme")
+        self.other = Company.objects.create(name="Other")
+        Job.objects.bulk_create([
+            Job(company=self.acme, position_title="A", status="APPLIED",
+                priority=5, is_remote=True, salary_min=90000,
+                date_deadline="2025-03-01"),
+            Job(company=self.acme, position_title="B", status="INTERVIEWING",
+                priority=3, salary_min=120000),
+            Job(company=self.other, position_title="C", status="APPLIED",
+                priority=1, date_deadline="2025-01-15",
+                employment_type="Full-time"),
+        ])
+
+    def titles(self, query):
+        response = self.client.get(f"/api/jobs/?fields=position_title&{query}")
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row["position_title"] for row in response.json()["results"]]
+
+    def test_filters(self):
+        self.assertEqual(self.titles("status=APPLIED"), ["A", "C"])
+        self.assertEqual(
+            self.titles("status=APPLIED&status=INTERVIEWING"), ["A", "B", "C"])
+        self.assertEqual(self.titles(f"company={self.acme.id}"), ["A", "B"])
+        self.assertEqual(self.titles("is_remote=true"), ["A"])
+        self.assertEqual(self.titles("employment_type=full-time"), ["C"])
+        self.assertEqual(self.titles("salary_min__gte=100000"), ["B"])
+        self.assertEqual(
+            self.titles("date_deadline__gte=2025-02-01"), ["A"])
+        self.assertEqual(self.titles("search=oth"), ["C"])
+        self.assertEqual(self.titles("search=a&status=APPLIED"), ["A"])
+
+    def test_ordering_is_whitelisted(self):
+        self.assertEqual(self.titles("ordering=priority"), ["C", "B", "A"])
+        self.assertEqual(self.titles("ordering=about"), ["A", "B", "C"])
+
+    def test_ordering_on_nullable_field_pages_through_every_row(self):
+        seen, url = [], "/api/jobs/?fields=position_title&ordering=date_deadline&page_size=1"
+        while url:
+            data = self.client.get(url).json()
+            seen += [row["position_title"] for row in data["results"]]
+            url = data["next"]
+        self.assertEqual(seen, ["C", "A", "B"])
+
+
+class JobFilterIndexTests(TestCase):
+    """EXPLAIN each indexed filter to make sure it seeks rather than scans."""
+
+    CASES = [
+        ({"status": "APPLIED"}, "job_status_priority_idx"),
+        ({"company": None, "status": "APPLIED"}, "job_company_status_idx"),
+        ({"date_deadline__gte": "2025-01-01"}, "job_deadline_idx"),
+        ({"date_applied__lte": "2025-01-01"}, "job_applied_idx"),
+        ({"date_posted__gte": "2025-01-01"}, "job_posted_idx"),
+        ({"created_at__gte": "2025-01-01T00:00:00Z"}, "job_created_idx"),
+        ({"updated_at__gte": "2025-01-01T00:00:00Z"}, "job_updated_idx"),
+        ({"salary_min__gte": "50000"}, "job_salary_min_idx"),
+        ({"salary_max__lte": "50000"}, "job_salary_max_idx"),
+    ]
+
+    def test_filters_use_indexes(self):
+        company = Company.objects.create(name="Acme")
+        for params, index in self.CASES:
+            data = QueryDict(mutable=True)
+            for key, value in params.items():
+                data[key] = value if value is not None else str(company.id)
+            filterset = JobFilterSet(data, queryset=Job.objects.all())
+            self.assertTrue(filterset.is_valid(), filterset.errors)
+            # Plan the WHERE clause alone; ORDER BY is served by the
+            # pagination index and is checked separately.
+            plan = filterset.qs.order_by().explain()
+            if connection.vendor == "sqlite":
+                self.assertIn(f"USING INDEX {index}", plan, params)
+                self.assertNotRegex(plan, r"SCAN jobs_job(?! USING)")
+            else:
+                self.assertIn(index, plan, params)
+
+
+class JobSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.company = Company.objects.create(name="Acme")
+        self.k8s = Job.objects.create(
+            company=self.company, position_title="Platform Engineer",
+            requirements="Experience operating Kubernetes clusters in production.")
+        self.other = Job.objects.create(
+            company=self.company, position_title="Kubernetes Specialist",
+            about="Kubernetes all day.")
+        Job.objects.create(company=self.company, position_title="Accountant",
+                           about="Spreadsheets.")
+
+    def search(self, q):
+        response = self.client.get("/api/jobs/search/", {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_ranked_results_with_snippets(self):
+        results = self.search("kubernetes")
+        self.assertEqual([r["id"] for r in results],
+                         [str(self.other.id), str(self.k8s.id)])
+        self.assertIn("<mark>Kubernetes</mark>", results[1]["snippet"])
+        self.assertEqual(results[0]["company"]["name"], "Acme")
+
+    def test_index_follows_save_and_delete(self):
+        self.k8s.requirements = "Terraform only."
+        self.k8s.save()
+        self.assertEqual([r["id"] for r in self.search("kubern")],
+                         [str(self.other.id)])
+        self.other.delete()
+        self.assertEqual(self.search("kubernetes"), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.search('"NEAR( OR *'), [])
+
+    def test_snippets_are_escaped(self):
+        Job.objects.create(
+            company=self.company, position_title="Designer",
+            about='<img src=x onerror="alert(1)"> Figma & <b>Sketch</b>')
+        [hit] = self.search("figma")
+        self.assertEqual(
+            hit["snippet"],
+            "&lt;img src=x onerror=&quot;alert(1)&quot;&gt; <mark>Figma</mark>"
+            " &amp; &lt;b&gt;Sketch&lt;/b&gt;")
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.company = Company.objects.create(name="Acme")
+        self.job = Job.objects.create(company=self.company, position_title="A")
+
+    def assertRevalidates(self, url, change):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+        self.assertIn("Last-Modified", first)
+
+        with CaptureQueriesContext(connection) as ctx:
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        change()
+        fresh = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh["ETag"], etag)
+
+    def test_job_detail(self):
+        def change():
+            self.job.status = "APPLIED"
+            self.job.save()
+        self.assertRevalidates(f"/api/jobs/{self.job.id}/", change)
+
+    def test_job_list_tracks_company_edits(self):
+        def change():
+            self.company.name = "Acme Inc"
+            self.company.save()
+        self.assertRevalidates("/api/jobs/", change)
+
+    def test_job_tracks_posting_checks(self):
+        def check():
+            postings.apply_fetch([self.job], "https://example.com/post", 0.1,
+                                 error="timed out", current={})
+        self.assertRevalidates(f"/api/jobs/{self.job.id}/", check)
+        self.assertRevalidates("/api/jobs/", check)
+
+    def test_job_list_tracks_deletes(self):
+        other = Job.objects.create(company=self.company, position_title="B")
+        self.assertRevalidates("/api/jobs/", other.delete)
+
+    def test_company_list_and_detail(self):
+        def add():
+            Company.objects.create(name="Other")
+        self.assertRevalidates("/api/companies/", add)
+
+        def edit():
+            self.company.industry = "Tech"
+            self.company.save()
+        self.assertRevalidates(f"/api/companies/{self.company.id}/", edit)
+
+    def test_if_modified_since(self):
+        first = self.client.get(f"/api/jobs/{self.job.id}/")
+        cached = self.client.get(
+            f"/api/jobs/{self.job.id}/",
+            HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(cached.status_code, 304)
+
+
+class BulkJobTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.company = Company.objects.create(name="Acme")
+        self.jobs = seed_jobs(self.company, 20)
+
+    def test_create(self):
+        items = [{"company_id": str(self.company.id), "position_title": f"New {i}"}
+                 for i in range(50)]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post("/api/jobs/bulk/", items, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["created"], 50)
+        self.assertEqual(Job.objects.filter(position_title__startswith="New").count(), 50)
+        # Multi-row INSERTs; SQLite caps the rows per statement by its
+        # bound-parameter limit.
+        inserts = [q for q in ctx.captured_queries
+                   if q["sql"].startswith('INSERT INTO "jobs_job" ')]
+        self.assertLessEqual(len(inserts), 3)
+
+    def test_create_is_all_or_nothing(self):
+        items = [{"company_id": str(self.company.id), "position_title": "Ok"},
+                 {"position_title": "Missing company"}]
+        response = self.client.post("/api/jobs/bulk/", items, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Job.objects.filter(position_title="Ok").exists())
+
+    def test_update_by_ids_and_filter(self):
+        ids = [str(job.id) for job in self.jobs[:5]]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(
+                "/api/jobs/bulk/", {"ids": ids, "changes": {"status": "APPLIED"}},
+                format="json")
+        self.assertEqual(response.json(), {"updated": 5})
+        self.assertEqual(
+            len([q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]), 1)
+
+        response = self.client.patch(
+            "/api/jobs/bulk/",
+            {"filter": {"status": "APPLIED"}, "changes": {"priority": 9}},
+            format="json")
+        self.assertEqual(response.json(), {"updated": 5})
+        self.assertEqual(Job.objects.filter(priority=9).count(), 5)
+
+        response = self.client.patch(
+            "/api/jobs/bulk/", {"filter": {"nope": 1}, "changes": {"priority": 1}},
+            format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_update_items(self):
+        items = [{"id": str(job.id), "position_title": f"Renamed {n}"}
+                 for n, job in enumerate(self.jobs[:3])]
+        response = self.client.patch("/api/jobs/bulk/", {"items": items},
+                                     format="json")
+        self.assertEqual(response.json()["updated"], 3)
+        self.assertEqual(
+            set(Job.objects.filter(position_title__startswith="Renamed")
+                .values_list("position_title", flat=True)),
+            {"Renamed 0", "Renamed 1", "Renamed 2"})
+
+    def test_delete_batches_file_cleanup(self):
+        ids = [str(job.id) for job in self.jobs[:10]]
+        with mock.patch("jobs.bulk.delete_files") as delete_files, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete("/api/jobs/bulk/", {"ids": ids},
+                                          format="json")
+        self.assertEqual(response.json(), {"deleted": 10})
+        self.assertEqual(Job.objects.count(), 10)
+        self.assertEqual(Attachment.objects.count(), 20)
+        delete_files.assert_called_once()
+        self.assertEqual(len(delete_files.call_args.args[1]), 20)
+
+    def test_delete_fetched_jobs(self):
+        fetched = self.jobs[:3]
+        FetchLog.objects.bulk_create([
+            FetchLog(job=job, url="https://example.com/post", status=200)
+            for job in fetched for _ in range(2)])
+        FetchLog.objects.create(job=self.jobs[3],
+                                url="https://example.com/post", status=200)
+        response = self.client.delete(
+            "/api/jobs/bulk/", {"ids": [str(job.id) for job in fetched]},
+            format="json")
+        self.assertEqual(response.json(), {"deleted": 3})
+        # Foreign keys are only checked at commit; check them now.
+        connection.check_constraints()
+        self.assertEqual(Job.objects.count(), 17)
+        self.assertEqual(FetchLog.objects.get().job, self.jobs[3])
+        # Whatever points at jobs, now or later, went with them.
+        for rel in get_candidate_relations_to_delete(Job._meta):
+            with self.subTest(rel.related_model.__name__):
+                self.assertFalse(rel.related_model._base_manager.filter(
+                    **{f"{rel.field.name}__in": fetched}).exists())
+
+    def test_delete_refuses_unsupported_on_delete(self):
+        rel = Job._meta.get_field("fetch_logs")
+        with mock.patch.object(rel, "on_delete", PROTECT), \
+                self.assertRaisesMessage(NotImplementedError, "PROTECT"):
+            bulk.delete_jobs(Job.objects.filter(pk=self.jobs[0].pk))
+        self.assertEqual(Job.objects.count(), 20)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.company = Company.objects.create(name="Acme", industry="Tech")
+        Job.objects.create(
+            company=self.company, position_title="Engineer", status="APPLIED",
+            languages=["English", "French"],
+            education={"bachelor": {"requirement": "REQUIRED",
+                                    "majors": ["CS", "Math"]}})
+        Job.objects.create(
+            company=self.company, position_title="Designer",
+            shifts_and_schedules={"availability": {"weekend": "REQUIRED"}})
+
+    def read_csv(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        body = b"".join(response.streaming_content).decode("utf-8")
+        return list(csv.DictReader(io.StringIO(body)))
+
+    def test_csv_flattens_json_and_joins_company(self):
+        rows = {row["position_title"]: row for row in
+                self.read_csv("/api/jobs/export.csv")}
+        engineer, designer = rows["Engineer"], rows["Designer"]
+        self.assertEqual(engineer["company.name"], "Acme")
+        self.assertEqual(engineer["languages"], "English; French")
+        self.assertEqual(engineer["education.bachelor.requirement"], "REQUIRED")
+        self.assertEqual(engineer["education.bachelor.majors"], "CS; Math")
+        self.assertEqual(engineer["shifts_and_schedules.availability.weekend"], "")
+        self.assertEqual(designer["shifts_and_schedules.availability.weekend"],
+                         "REQUIRED")
+
+    def test_csv_honours_list_filters(self):
+        rows = self.read_csv("/api/jobs/export.csv?status=APPLIED")
+        self.assertEqual([row["position_title"] for row in rows], ["Engineer"])
+
+    def test_ndjson_streams_with_constant_queries(self):
+        seed_jobs(self.company, 300, attachments_per_job=0)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/jobs/export.ndjson")
+            lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(lines), 302)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        first = orjson.loads(lines[0])
+        self.assertEqual(first["company"]["name"], "Acme")
+
+    def test_company_export(self):
+        rows = self.read_csv("/api/companies/export.csv")
+        self.assertEqual([row["name"] for row in rows], ["Acme"])
+
+
+class JobStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        acme = Company.objects.create(name="Acme", industry="Tech", size="11-50")
+        globex = Company.objects.create(name="Globex", industry="Energy")
+        applied = date(2025, 1, 1)
+        Job.objects.create(company=acme, position_title="A", status="ACCEPTED",
+                           date_applied=applied, date_interviewed=date(2025, 1, 5))
+        Job.objects.create(company=acme, position_title="B", status="INTERVIEWING",
+                           date_applied=applied, date_interviewed=date(2025, 1, 11))
+        Job.objects.create(company=acme, position_title="C", status="NOT_ACCEPTED",
+                           date_applied=applied, date_rejected=date(2025, 1, 3))
+        Job.objects.create(company=globex, position_title="D", status="APPLIED",
+                           date_applied=applied)
+        Job.objects.create(company=globex, position_title="E")
+
+    def test_stats(self):
+        data = self.client.get("/api/jobs/stats/").json()
+        self.assertEqual(data["total"], 5)
+        self.assertEqual(data["by_status"]["BOOKMARKED"], 1)
+        self.assertEqual(data["by_status"]["WITHDREW"], 0)
+        self.assertEqual([(s["stage"], s["count"]) for s in data["funnel"]],
+                         [("APPLIED", 4), ("INTERVIEWING", 2),
+                          ("NEGOTIATING", 1), ("ACCEPTED", 1)])
+        self.assertEqual(data["funnel"][1]["conversion"], 0.5)
+
+        companies = {row["name"]: row for row in data["response_rates"]["company"]}
+        self.assertEqual((companies["Acme"]["applied"],
+                          companies["Acme"]["responded"]), (3, 3))
+        self.assertEqual(companies["Globex"]["rate"], 0.0)
+        industries = {row["industry"]: row["rate"]
+                      for row in data["response_rates"]["industry"]}
+        self.assertEqual(industries, {"Tech": 1.0, "Energy": 0.0})
+        sizes = {row["size"]: row["applied"]
+                 for row in data["response_rates"]["size"]}
+        self.assertEqual(sizes, {"11-50": 3, None: 1})
+
+        self.assertEqual(data["median_days"],
+                         {"applied_to_interviewed": 7.0, "applied_to_rejected": 2.0})
+
+    def test_cached_until_jobs_change(self):
+        self.client.get("/api/jobs/stats/")
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get("/api/jobs/stats/")
+        # Only the lookup in the (shared, database) cache.
+        [query] = ctx.captured_queries
+        self.assertIn("django_cache", query["sql"])
+
+        Job.objects.filter(position_title="E").get().delete()
+        self.assertEqual(self.client.get("/api/jobs/stats/").json()["total"], 4)
+
+        job = Job.objects.get(position_title="D")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch("/api/jobs/bulk/", {"ids": [str(job.id)],
+                              "changes": {"status": "ACCEPTED"}}, format="json")
+        data = self.client.get("/api/jobs/stats/").json()
+        self.assertEqual(data["by_status"]["ACCEPTED"], 2)
+
+
+class PooledFetchTests(TestCase):
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.addCleanup(self.server.stop)
+        client = fetchers.HttpClient(pool_maxsize=4, retries=2, backoff_factor=0)
+        self.addCleanup(client.close)
+        patcher = mock.patch.object(fetchers, "_client", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_connections_are_reused(self):
+        url = self.server.url("/jobs/1")
+        for _ in range(5):
+            fetchers.fetch_job_post_for_save(url).close()
+        job = Job(job_post_url=url)
+        self.assertTrue(job.fetch_post_preview().startswith("<html>"))
+        self.assertEqual(self.server.requests, 6)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_concurrent_fetches_share_the_pool(self):
+        url = self.server.url("/jobs/1")
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            pages = list(pool.map(lambda _: fetchers.fetch_job_post_html(url),
+                                  range(40)))
+        self.assertEqual(len(set(pages)), 1)
+        # The pool keeps 4 connections; surplus ones under contention are
+        # closed after use, so only assert that most requests reused one.
+        self.assertLess(self.server.connections, 20)
+
+    def test_retries_429_and_5xx(self):
+        self.server.script(
+            "/flaky",
+            (429, {"Retry-After": "0"}, ""),
+            (503, {}, ""),
+        )
+        html = fetchers.fetch_job_post_html(self.server.url("/flaky"))
+        self.assertIn("Job description", html)
+        self.assertEqual(self.server.hits["/flaky"], 3)
+
+        self.server.script("/down", *[(502, {}, "")] * 3)
+        with self.assertRaises(requests.HTTPError):
+            fetchers.fetch_job_post_html(self.server.url("/down"))
+
+
+def make_page(body, url="https://example.com/a"):
+    page = fetchers.FetchedPage(url, 200, "text/html")
+    page.write(body)
+    return page
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name="Acme")
+        self.job = Job.objects.create(company=self.company, position_title="A",
+                                      job_post_url="https://example.com/a")
+
+    def test_admin_action_only_enqueues(self):
+        User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.login(username="admin", password="password")
+        nourl = Job.objects.create(company=self.company, position_title="B")
+        with mock.patch("jobs.postings.fetch_job_post") as fetch:
+            response = self.client.post("/admin/jobs/job/", {
+                "action": "fetch_job_post",
+                "_selected_action": [str(self.job.pk), str(nourl.pk)],
+            })
+        self.assertEqual(response.status_code, 302)
+        fetch.assert_not_called()
+        task = Task.objects.get()
+        self.assertEqual((task.name, task.status, task.payload),
+                         ("fetch_job_post", "QUEUED", {"job_id": str(self.job.pk)}))
+
+    @mock.patch("jobs.postings.fetch_job_post",
+                side_effect=lambda url, **kwargs: make_page(b"<html></html>"))
+    def test_worker_runs_task_and_records_result(self, fetch):
+        tasks.enqueue("fetch_job_post", {"job_id": str(self.job.pk)})
+        with tempfile.TemporaryDirectory() as tmp, \
+                override_settings(MEDIA_ROOT=tmp):
+            task = tasks.run(tasks.claim("test"))
+        self.assertEqual(task.status, Task.Status.SUCCEEDED)
+        self.assertEqual(task.result, {
+            "status": 200, "bytes": 13, "changed": True,
+            "sha256": hashlib.sha256(b"<html></html>").hexdigest()})
+        self.assertEqual(fetch.call_args.args, ("https://example.com/a",))
+        self.assertIsNone(tasks.claim("test"))
+
+    @override_settings(TASK_RETRY_BACKOFF=60)
+    @mock.patch("jobs.postings.fetch_job_post",
+                side_effect=requests.ConnectionError("boom"))
+    def test_failures_retry_with_backoff_then_fail(self, fetch):
+        tasks.enqueue("fetch_job_post", {"job_id": str(self.job.pk)},
+                      max_attempts=2)
+        task = tasks.run(tasks.claim("test"))
+        self.assertEqual((task.status, task.attempts), ("QUEUED", 1))
+        self.assertIn("boom", task.error)
+        self.assertIsNone(tasks.claim("test"))  # backing off
+
+        later = timezone.now() + timedelta(seconds=61)
+        task = tasks.run(tasks.claim("test", now=later))
+        self.assertEqual((task.status, task.attempts), ("FAILED", 2))
+        self.assertEqual(
+            list(self.job.fetch_logs.values_list("status", "error")),
+            [(None, "boom")] * 2)
+
+    def test_stale_running_tasks_are_requeued(self):
+        task = tasks.enqueue("fetch_job_post", {"job_id": str(self.job.pk)})
+        tasks.claim("dead-worker")
+        Task.objects.filter(pk=task.pk).update(
+            locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(tasks.requeue_stale(timeout=60), 1)
+        self.assertEqual(Task.objects.get().status, "QUEUED")
+
+
+class RunWorkersCommandTests(TransactionTestCase):
+    @mock.patch("jobs.postings.save_job_post")
+    @mock.patch("jobs.postings.fetch_job_post",
+                side_effect=lambda url, **kwargs: make_page(b"<html></html>"))
+    def test_drains_queue_with_several_workers(self, fetch, save):
+        save.return_value.sha256 = "abc"
+        company = Company.objects.create(name="Acme")
+        jobs = [Job.objects.create(company=company, position_title=str(n),
+                                   job_post_url=f"https://example.com/{n}")
+                for n in range(6)]
+        tasks.enqueue_many("fetch_job_post",
+                           [{"job_id": str(job.pk)} for job in jobs])
+        call_command("run_workers", workers=3, once=True, stdout=io.StringIO())
+        self.assertEqual(
+            Task.objects.filter(status=Task.Status.SUCCEEDED).count(), 6)
+        self.assertEqual(fetch.call_count, 6)
+
+    def test_running_tasks_keep_their_lock(self):
+        company = Company.objects.create(name="Acme")
+        job = Job.objects.create(company=company, position_title="A",
+                                 job_post_url="https://example.com/a")
+        tasks.enqueue("fetch_job_post", {"job_id": str(job.pk)})
+        task = tasks.claim("worker")
+        with tasks.heartbeat(task, interval=0.05):
+            time.sleep(0.5)
+            self.assertEqual(tasks.requeue_stale(timeout=0.3), 0)
+        time.sleep(0.5)
+        self.assertEqual(tasks.requeue_stale(timeout=0.3), 1)
+
+    @mock.patch("jobs.postings.save_job_post")
+    @mock.patch("jobs.postings.fetch_job_post")
+    def test_stale_tasks_are_requeued_while_running(self, fetch, save):
+        save.return_value.sha256 = "abc"
+        company = Company.objects.create(name="Acme")
+        job = Job.objects.create(company=company, position_title="A",
+                                 job_post_url="https://example.com/a")
+        # A task claimed by a worker that died while the first one ran.
+        abandoned = tasks.enqueue("fetch_job_post", {"job_id": str(job.pk)})
+
+        def slow(url, **kwargs):
+            if not fetch.call_args_list[1:]:
+                tasks.claim("dead-worker")
+                Task.objects.filter(pk=abandoned.pk).update(
+                    locked_at=timezone.now() - timedelta(hours=1))
+                time.sleep(0.5)
+            return make_page(b"<html></html>")
+
+        fetch.side_effect = slow
+        tasks.enqueue("fetch_job_post", {"job_id": str(job.pk)},
+                      run_after=timezone.now() - timedelta(minutes=1))
+        out = io.StringIO()
+        call_command("run_workers", workers=1, once=True,
+                     requeue_interval=0.05, stdout=out)
+        self.assertIn("Requeued 1 stale task(s).", out.getvalue())
+        self.assertEqual(
+            Task.objects.filter(status=Task.Status.SUCCEEDED).count(), 2)
+
+
+class HostGuardTests(TestCase):
+    """Per-host rate limiting and circuit breaking against a 429/503 stand-in."""
+
+    def setUp(self):
+        self.now = 1000.0
+        self.slept = []
+        self.guard = fetchers.HostGuard(
+            failures=3, cooldown=30, throttle_interval=1, max_interval=8,
+            max_wait=5, clock=lambda: self.now, sleep=self.advance)
+        client = fetchers.HttpClient(retries=0, retry_statuses=(),
+                                     guard=self.guard)
+        self.addCleanup(client.close)
+        patcher = mock.patch.object(fetchers, "_client", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.server = StandInServer().start()
+        self.addCleanup(self.server.stop)
+        self.url = self.server.url("/post")
+        self.host = fetchers.host_of(self.url)
+
+    def advance(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+    def fetch(self):
+        with fetchers.fetch_job_post(self.url) as page:
+            return page.status
+
+    def state(self):
+        [state] = self.guard.snapshot()
+        return state
+
+    def test_throttling_widens_the_gap_then_recovers(self):
+        self.server.script("/post", (429, {}, ""), (503, {}, ""))
+        for _ in range(2):
+            with self.assertRaises(requests.HTTPError):
+                self.fetch()
+        self.assertEqual(self.state()["interval"], 2)
+        self.assertEqual(self.fetch(), 200)
+        self.assertEqual(self.slept, [1, 2])  # waited out each gap
+        self.assertEqual(self.state()["breaker"], "closed")
+        for _ in range(20):
+            self.fetch()
+        self.assertEqual(self.state()["interval"], 0)
+
+    def test_retry_after_beyond_max_wait_fails_fast(self):
+        self.server.script("/post", (429, {"Retry-After": "120"}, ""))
+        with self.assertRaises(requests.HTTPError):
+            self.fetch()
+        with self.assertRaisesMessage(fetchers.HostUnavailable, "rate limited"):
+            self.fetch()
+        self.assertEqual(self.server.requests, 1)
+        self.now += 120
+        self.assertEqual(self.fetch(), 200)
+
+    @override_settings(FETCH_RETRIES=2, FETCH_BACKOFF=0)
+    def test_configured_client_leaves_throttling_to_the_guard(self):
+        client = fetchers.HttpClient.from_settings()
+        self.addCleanup(client.close)
+        self.server.script("/post", (429, {"Retry-After": "120"}, ""),
+                           (503, {"Retry-After": "120"}, ""))
+        with mock.patch.object(fetchers, "_client", client):
+            start = time.monotonic()
+            with self.assertRaises(requests.HTTPError):
+                self.fetch()
+            # Neither retried nor slept out in urllib3 ...
+            self.assertLess(time.monotonic() - start, 5)
+            self.assertEqual(self.server.requests, 1)
+            # ... the guard saw it and holds the host back instead.
+            [state] = client.guard.snapshot()
+            self.assertEqual((state["throttled"], state["last_status"]),
+                             (1, 429))
+            with self.assertRaisesMessage(fetchers.HostUnavailable,
+                                          "rate limited"):
+                self.fetch()
+        self.assertEqual(self.server.requests, 1)
+        # Other 5xx are still retried in-process.
+        self.assertEqual(sorted(client.retry.status_forcelist), [500, 502, 504])
+
+    def test_breaker_opens_fails_fast_and_probes(self):
+        self.server.script("/post", *[(503, {}, "")] * 3)
+        for _ in range(3):
+            with self.assertRaises(requests.HTTPError):
+                self.fetch()
+        state = self.state()
+        self.assertEqual((state["breaker"], state["failures"]), ("open", 3))
+
+        # Fails fast without touching the host, and so does the preview.
+        for _ in range(5):
+            with self.assertRaises(fetchers.HostUnavailable):
+                self.fetch()
+        job = Job(company=Company(name="Acme"), job_post_url=self.url)
+        self.assertIn("circuit open", job.fetch_post_preview())
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(self.state()["rejected"], 6)
+
+        # After the cool-down one failing probe re-opens it ...
+        self.now += 30
+        self.server.script("/post", (500, {}, ""))
+        with self.assertRaises(requests.HTTPError):
+            self.fetch()
+        self.assertEqual(self.state()["breaker"], "open")
+        # ... and a successful one closes it.
+        self.now += 30
+        self.assertEqual(self.fetch(), 200)
+        self.assertEqual(self.state()["breaker"], "closed")
+        self.assertEqual(self.server.requests, 5)
+
+    def test_connection_errors_count_as_failures(self):
+        self.server.stop()
+        for _ in range(3):
+            with self.assertRaises(requests.ConnectionError):
+                self.fetch()
+        self.assertEqual(self.state()["breaker"], "open")
+        self.assertEqual(self.state()["last_status"], None)
+
+    def test_diagnostics_view(self):
+        self.server.script("/post", (429, {}, ""))
+        with self.assertRaises(requests.HTTPError):
+            self.fetch()
+        client = APIClient()
+        url = "/api/diagnostics/fetch-hosts/"
+        self.assertEqual(client.get(url).status_code, 403)
+
+        admin = User.objects.create_superuser("admin", "a@example.com", "pw")
+        client.force_authenticate(admin)
+        [host] = client.get(url).json()["hosts"]
+        self.assertEqual(
+            {k: host[k] for k in ("host", "throttled", "last_status")},
+            {"host": self.host, "throttled": 1, "last_status": 429})
+        response = client.post(url, {"host": self.host}, format="json")
+        self.assertEqual(response.json(), {"hosts": []})
+
+
+class ParsingTests(SimpleTestCase):
+    url = "https://job-boards.greenhouse.io/example/jobs/1"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.samples = {path.name: path.read_text(encoding="utf-8")
+                       for path in sorted(SAMPLES_DIR.glob("greenhouse-*.html"))}
+
+    def test_matches_legacy_parsers_on_samples(self):
+        legacy = load_legacy_parsers()
+        for name, html in self.samples.items():
+            with self.subTest(name):
+                core, old = legacy_parse(legacy, html, self.url)
+                new = parse(html, self.url)
+                location = old["jobLocation"]["address"]["addressLocality"]
+                self.assertEqual(new.position_title, core["title"])
+                # The legacy leaf scan took "New" for Vultr's name; the
+                # Greenhouse page title has it right.
+                if name != "greenhouse-vultr.html":
+                    self.assertEqual(new.company, core["company"])
+                self.assertEqual(new.about, old["employerOverview"])
+                self.assertEqual(new.location, location)
+                self.assertEqual(new.is_remote,
+                                 old["jobLocationType"] == "TELECOMMUTE")
+
+    def test_faster_than_legacy_parsers(self):
+        legacy = load_legacy_parsers()
+        docs = list(self.samples.values())
+        old = docs_per_second(
+            lambda html: legacy_parse(legacy, html, self.url), docs, 0.5)
+        new = docs_per_second(lambda html: parse(html, self.url), docs, 0.5)
+        self.assertGreater(new, 3 * old)
+
+    def test_jsonld_graph_and_type_list(self):
+        html = """<html><head><script type="application/ld+json">
+            {"@context": "https://schema.org", "@graph": [
+              {"@type": "WebPage", "name": "Careers"},
+              {"@type": ["JobPosting", "Thing"], "title": " Data Engineer ",
+               "hiringOrganization": {"name": "Acme"},
+               "datePosted": "2025-03-01T00:00:00Z",
+               "jobLocationType": "TELECOMMUTE",
+               "jobLocation": {"address": {"addressLocality": "Austin",
+                                           "addressRegion": "TX"}},
+               "baseSalary": {"currency": "USD", "value": {
+                 "minValue": 100000, "maxValue": 140000, "unitText": "YEAR"}},
+               "description": "<p>Build <b>pipelines</b>.</p><p>Remote.</p>"}
+            ]}</script></head><body><h1>Ignored</h1></body></html>"""
+        job = parse(html, "https://example.com/jobs/1")
+        self.assertEqual(job.as_dict(), {
+            "job_post_url": "https://example.com/jobs/1",
+            "domain": "example.com",
+            "position_title": "Data Engineer",
+            "company": "Acme",
+            "location": "Austin, TX",
+            "is_remote": True,
+            "date_posted": date(2025, 3, 1),
+            "salary_min": Decimal("100000"),
+            "salary_max": Decimal("140000"),
+            "salary_currency": "USD",
+            "salary_unit": "YEAR",
+            "about": "Build\npipelines\n.\nRemote.",
+        })
+        self.assertEqual(job.structured["title"], " Data Engineer ")
+
+    def test_boards_dispatch_on_host(self):
+        for host, extractor in [
+                ("job-boards.greenhouse.io", boards.greenhouse),
+                ("job-boards.eu.greenhouse.io", boards.greenhouse),
+                ("boards.greenhouse.io:443", boards.greenhouse),
+                ("jobs.eu.lever.co", boards.lever),
+                ("jobs.ashbyhq.com", boards.ashby),
+                ("acme.wd5.myworkdayjobs.com", boards.workday),
+                ("notgreenhouse.io", None), ("careers.acme.com", None),
+                ("", None)]:
+            with self.subTest(host):
+                self.assertIs(boards.board_for(host), extractor)
+
+    def test_board_markup(self):
+        cases = [
+            ("https://jobs.lever.co/acme/1",
+             "<div class='main-header-logo'><img alt='Acme logo'></div>"
+             "<div class='posting-headline'><h2>Dev</h2>"
+             "<div class='posting-categories'><div class='sort-by-time"
+             " posting-category location'>Remote - EU</div>"
+             "<div class='department'>Engineering</div>"
+             "<div class='commitment'>Full-time</div></div></div>"
+             "<div data-qa='job-description'><p>Build things.</p></div>",
+             {"position_title": "Dev", "company": "Acme",
+              "location": "Remote - EU", "is_remote": True,
+              "department": "Engineering", "employment_type": "Full-time",
+              "about": "Build things."}),
+            ("https://jobs.ashbyhq.com/acme/1",
+             "<title>Data Engineer @ Acme</title>",
+             {"position_title": "Data Engineer", "company": "Acme"}),
+            ("https://acme.wd1.myworkdayjobs.com/en-US/careers/job/1",
+             "<h2 data-automation-id='jobPostingHeader'>Analyst</h2>"
+             "<div data-automation-id='locations'><dl><dt>locations</dt>"
+             "<dd>Austin, TX</dd></dl></div><div data-automation-id='time'>"
+             "<dl><dt>time type</dt><dd>Full time</dd></dl></div>"
+             "<div data-automation-id='jobPostingDescription'><p>Analyse.</p>"
+             "</div><meta property='og:site_name' content='Acme'>",
+             {"position_title": "Analyst", "company": "Acme",
+              "location": "Austin, TX", "is_remote": False,
+              "employment_type": "Full time", "about": "Analyse."}),
+        ]
+        for url, html, expected in cases:
+            with self.subTest(url):
+                job = parse(html, url).as_dict()
+                self.assertEqual({k: job.get(k) for k in expected}, expected)
+
+    def test_generic_scan_only_for_unknown_hosts(self):
+        html = "<div>Acme</div><p>Hiring.</p>"
+        with mock.patch.object(stages, "SHORT_LEAVES",
+                               wraps=stages.SHORT_LEAVES) as leaves:
+            self.assertIsNone(parse(html, self.url).company)
+            leaves.assert_not_called()
+            self.assertEqual(parse(html, "https://careers.acme.com/1").company,
+                             "Acme")
+            leaves.assert_called_once()
+
+    def test_stages_are_pluggable(self):
+        def department(doc, result):
+            result.set("department", "Engineering")
+
+        parser = Parser([stages.fallback, department])
+        job = parser.parse("<title>Dev</title><img alt='Acme Logo'>")
+        self.assertEqual((job.position_title, job.company, job.department),
+                         ("Dev", "Acme", "Engineering"))
+        self.assertIsNone(job.salary_min)
+
+    def test_empty_and_malformed_documents(self):
+        for html in ("", "   ", "<!-- nothing -->", b"\xff\xfe<h1>x", "<h1>Dev"):
+            with self.subTest(html=html):
+                parse(html)
+        self.assertEqual(parse("<h1>Dev").position_title, "Dev")
+
+    def test_jsonld_tokenizer_across_chunks(self):
+        html = ("<html><head><!-- <script type='application/ld+json'>{}"
+                "</script> --><script>var s = '<script type=application/ld+json>';"
+                "</script><SCRIPT TYPE='Application/LD+JSON'>//<![CDATA[\n"
+                '{"@type": "JobPosting", "title": "a > b"}\n//]]></SCRIPT>'
+                '<script type="application/ld+json">not json</script>'
+                '<script type="application/ld+json"><!-- [{"@type": "Thing"}] -->'
+                "</script></head></html>")
+        expected = [{"@type": "JobPosting", "title": "a > b"}, [{"@type": "Thing"}]]
+        self.assertEqual(list(iter_jsonld(html)), expected)
+        encoded = html.encode("utf-8")
+        for size in (1, 7, 64):
+            with self.subTest(size=size):
+                chunks = [encoded[i:i + size]
+                          for i in range(0, len(encoded), size)]
+                self.assertEqual(list(iter_jsonld(chunks)), expected)
+        # The DOM path decodes the same blocks the same way.
+        self.assertEqual(Document(html, lazy=False).jsonld(), expected)
+
+    def test_fast_path_skips_the_dom(self):
+        for name, html in self.samples.items():
+            with self.subTest(name):
+                dom = parse(html, self.url)
+                rich = with_jsonld(html, dom)
+                doc = Document(rich, self.url)
+                fast = Parser().parse(doc)
+                self.assertFalse(doc.has_dom)
+                self.assertEqual(
+                    {k: v for k, v in fast.as_dict().items() if k != "is_remote"},
+                    {k: v for k, v in Parser(lazy_dom=False).parse(
+                        rich, self.url).as_dict().items() if k != "is_remote"})
+                for field in ("position_title", "company", "location"):
+                    self.assertEqual(getattr(fast, field), getattr(dom, field))
+                self.assertEqual(fast.about.split(), dom.about.split())
+
+    @skipIf(not HEAP_SAMPLING, "heap sampling needs glibc")
+    def test_fast_path_saves_the_tree_memory(self):
+        rich = [with_jsonld(html, parse(html, self.url))
+                for html in self.samples.values()]
+        dom, _ = peak_heap(Parser(lazy_dom=False), rich, self.url)
+        fast, _ = peak_heap(Parser(), rich, self.url)
+        self.assertGreater(dom, 100)  # KiB: the lxml tree
+        self.assertLess(fast, dom / 4)
+
+    def test_fast_path_falls_back_when_fields_are_missing(self):
+        html = ("<html><head><script type='application/ld+json'>"
+                '{"@type": "JobPosting", "title": "Dev"}</script>'
+                "<title>Dev</title></head><body><img alt='Acme Logo'>"
+                "<p>About us</p></body></html>")
+        doc = Document(html)
+        job = Parser().parse(doc)
+        self.assertTrue(doc.has_dom)
+        self.assertEqual((job.position_title, job.company), ("Dev", "Acme"))
+
+        # No JobPosting at all: same as the DOM path.
+        plain = "<title>Dev</title><img alt='Acme Logo'>"
+        self.assertEqual(parse(plain).as_dict(),
+                         Parser(lazy_dom=False).parse(plain).as_dict())
+
+
+class ParserSuiteTests(SimpleTestCase):
+    def test_reads_goal_format(self):
+        [(name, expected)] = golden.read_golden(
+            (SAMPLES_DIR / "goal.txt").read_text(encoding="utf-8")).items()
+        self.assertEqual(name, "honehealth-senior-ai-engineer.html")
+        self.assertEqual(expected["salary_min"], "145000.00")
+        self.assertTrue(expected["about"].startswith("Hone Health is building"))
+        self.assertEqual(expected["benefits"].count("\n"), 4)
+        # Fields ParsedJob lacks and the summary are ignored.
+        self.assertNotIn("role_type", expected)
+        self.assertNotIn("education", expected)
+
+    def test_golden_round_trip(self):
+        html = (SAMPLES_DIR / "greenhouse-speechify.html").read_text("utf-8")
+        job = parse(html)
+        expected = golden.read_golden(golden.format_golden("s.html", job))
+        self.assertTrue(all(golden.score(job, expected["s.html"]).values()))
+
+        job.salary_min, job.salary_max = Decimal("145000"), None
+        self.assertEqual(golden.score(job, {"salary_min": "145000.00",
+                                            "salary_max": None,
+                                            "is_remote": "False"}),
+                         {"salary_min": True, "salary_max": True,
+                          "is_remote": True})
+        self.assertFalse(golden.field_matches(None, Decimal("500")))
+        self.assertFalse(golden.field_matches("500", None))
+
+    def test_regressions(self):
+        base = {"docs_per_sec": 100.0,
+                "accuracy": {"company": [9, 10], "location": [5, 10]}}
+        same = dict(base, docs_per_sec=95.0)
+        self.assertEqual(regressions(base, same, 0.10, 0.0), [])
+        worse = {"docs_per_sec": 80.0,
+                 "accuracy": {"company": [8, 10], "location": [6, 10]}}
+        problems = regressions(base, worse, 0.10, 0.0)
+        self.assertEqual(len(problems), 2)
+        self.assertIn("throughput 80.0 docs/s", problems[0])
+        self.assertIn("company accuracy fell from 90% to 80%", problems[1])
+        self.assertEqual(regressions(base, worse, 0.5, 0.1), [])
+
+    def test_command_compares_with_a_saved_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "report.json"
+            call_command("check_parser", "--seconds", "0.05", "--no-memory",
+                         "--save", str(path), stdout=io.StringIO())
+            report = json.loads(path.read_text())
+            self.assertEqual(report["docs"], 10)
+            self.assertIn("board", report["stages_ms"])
+            self.assertEqual(report["accuracy"]["position_title"], [10, 10])
+
+            report["accuracy"]["location"] = [10, 10]
+            path.write_text(json.dumps(report))
+            with self.assertRaisesMessage(CommandError, "location accuracy"):
+                call_command("check_parser", "--seconds", "0.05",
+                             "--no-memory", "--baseline", str(path),
+                             "--max-slowdown", "1", stdout=io.StringIO())
+
+
+class SalaryTests(SimpleTestCase):
+    def test_corpus(self):
+        for text, expected in read_corpus():
+            with self.subTest(text):
+                found = find_salary(text)
+                values = tuple(found) if found else (None,) * 5
+                self.assertEqual(values, (
+                    *(Decimal(v) if v else None for v in expected[:2]),
+                    *expected[2:]))
+
+    def test_every_job_currency(self):
+        for code in Job.Currency.values:
+            if code == Job.Currency.OTHER:
+                continue
+            with self.subTest(code):
+                self.assertEqual(find_salary(
+                    f"Salary: {code} 9,000,000 - 9,500,000").currency, code)
+        job = Job()
+        extraction.apply_parsed(job, ParsedJob(salary_currency="CHF"))
+        self.assertEqual(job.salary_currency, Job.Currency.OTHER)
+
+    def test_only_the_description_is_scanned(self):
+        html = ("<h1>Dev</h1><img alt='Acme Logo'><p>Base salary: $150,000</p>"
+                "<div class='job__description'><p>{}</p></div>")
+        url = "https://job-boards.greenhouse.io/acme/jobs/1"
+        self.assertIsNone(parse(html.format("Build things."), url).salary_min)
+        job = parse(html.format("Pay: $40 - $50 per hour"), url)
+        self.assertEqual((job.salary_min, job.salary_max, job.salary_unit),
+                         (Decimal(40), Decimal(50), "HOUR"))
+
+    def test_benchmark_command(self):
+        out = io.StringIO()
+        call_command("benchmark_salary", "--seconds", "0.01", stdout=out)
+        rows = len(read_corpus())
+        self.assertIn(f"compensation: {rows}/{rows} right", out.getvalue())
+
+
+class ParseAttachmentsTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.company = Company.objects.create(name="Twilio")
+        self.html = (SAMPLES_DIR / "greenhouse-twilio.html").read_bytes()
+
+    def post(self, body, sha256=None, **job_fields):
+        job_fields.setdefault(
+            "job_post_url", "https://job-boards.greenhouse.io/twilio/jobs/1")
+        job = Job.objects.create(company=self.company,
+                                 position_title="Untitled", **job_fields)
+        attachment = Attachment(
+            job=job, type="job_post",
+            sha256=hashlib.sha256(body).hexdigest() if sha256 is None
+            else sha256)
+        attachment.file.save("post.html", ContentFile(body), save=False)
+        attachment.save()
+        return job, attachment
+
+    def run_command(self, *args):
+        out = io.StringIO()
+        call_command("parse_attachments", "--workers", "2",
+                     "--chunk-size", "2", *args, stdout=out)
+        return out.getvalue()
+
+    def counts(self, out):
+        *_, summary = out.strip().splitlines()
+        return {name: int(count) for count, name in
+                re.findall(r"(\d+) (parsed|cached|updated|failed)", summary)}
+
+    def test_fills_jobs_and_skips_parsed_posts(self):
+        first, _ = self.post(self.html)
+        same, _ = self.post(self.html, location="Denver")
+        _, legacy_post = self.post(self.html, sha256="")
+        _, gone = self.post(b"<h1>x</h1>")
+        gone.file.delete(save=False)
+
+        counts = self.counts(self.run_command())
+        self.assertEqual(counts["parsed"] + counts["cached"], 3)
+        self.assertEqual((counts["updated"], counts["failed"]), (3, 1))
+        first.refresh_from_db()
+        self.assertEqual(first.position_title, "Untitled")  # kept
+        self.assertEqual(first.location, "Remote - US")
+        self.assertTrue(first.is_remote)
+        self.assertEqual(first.salary_min, Decimal("104300"))
+        self.assertEqual(first.salary_currency, "USD")
+        self.assertTrue(first.about.startswith("Who we are"))
+        same.refresh_from_db()
+        self.assertEqual(same.location, "Denver")
+        legacy_post.refresh_from_db()
+        self.assertEqual(legacy_post.sha256, hashlib.sha256(self.html).hexdigest())
+        self.assertEqual((legacy_post.parsed_sha256, legacy_post.parser_version),
+                         (legacy_post.sha256, PARSER_VERSION))
+
+        # Resumable: only the failed post is tried again.
+        self.assertEqual(self.counts(self.run_command()),
+                         {"parsed": 0, "cached": 0, "updated": 0, "failed": 1})
+        gone.delete()
+        self.assertIn("Every job post is parsed", self.run_command())
+
+        # Another parser version re-parses (here from the parse cache);
+        # --overwrite replaces fields.
+        Attachment.objects.update(parser_version="0")
+        self.assertEqual(self.counts(self.run_command("--overwrite")),
+                         {"parsed": 0, "cached": 3, "updated": 3, "failed": 0})
+        same.refresh_from_db()
+        self.assertEqual((same.location, same.position_title),
+                         ("Remote - US", "Junior Software Engineer"))
+
+    def test_parsed_text_is_searchable(self):
+        job, _ = self.post(self.html)
+        self.assertEqual(search.search("twilio"), [])
+        with mock.patch("jobs.stats.invalidate") as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.run_command()
+        self.assertEqual([pk for pk, _, _ in search.search("twilio")], [job.pk])
+        invalidate.assert_called()
+
+    def test_only_the_newest_post_of_a_job_is_parsed(self):
+        job, old = self.post(b"<h1>Old</h1>")
+        new = Attachment(job=job, type="job_post")
+        new.file.save("new.html", ContentFile(b"<h1>New</h1>"), save=False)
+        new.save()
+        Attachment.objects.filter(pk=old.pk).update(
+            uploaded_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(list(extraction.pending_attachments()), [new])
+
+
+class ParseCacheTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.cache = ParseCache(max_bytes=10_000, evict_every=1,
+                                clock=lambda: self.now)
+        self.html = (SAMPLES_DIR / "greenhouse-twilio.html").read_text("utf-8")
+
+    def test_parsed_job_json_round_trip(self):
+        job = parse(self.html, "https://example.com/1")
+        job.date_posted = date(2025, 3, 1)
+        job.structured = {"@type": "JobPosting"}
+        self.assertEqual(ParsedJob.from_json(json.loads(json.dumps(
+            job.to_json()))), job)
+
+    def test_second_parse_is_a_hit(self):
+        with mock.patch("jobs.parse_cache.parse", wraps=parse) as parser:
+            first = self.cache.parse(self.html, "https://a.example/1")
+            second = self.cache.parse(self.html.encode(), "https://b.example/2")
+        parser.assert_called_once()
+        self.assertEqual(second.domain, "b.example")
+        self.assertEqual(second.salary_min, first.salary_min)
+        self.assertEqual(second.about, first.about)
+        self.assertEqual({k: self.cache.stats()[k] for k in
+                          ("entries", "hits", "misses", "hit_rate")},
+                         {"entries": 1, "hits": 1, "misses": 1, "hit_rate": 0.5})
+
+    def test_results_are_kept_per_board(self):
+        url = "https://job-boards.greenhouse.io/twilio/jobs/1"
+        self.assertEqual(parse_cache.board_of(url), "greenhouse")
+        self.assertEqual(parse_cache.board_of("https://example.com/1"), "")
+        with mock.patch("jobs.parse_cache.parse", wraps=parse) as parser:
+            on_board = self.cache.parse(self.html, url)
+            generic = self.cache.parse(self.html, "https://example.com/1")
+            again = self.cache.parse(self.html, url.replace("/1", "/2"))
+        self.assertEqual(parser.call_count, 2)
+        self.assertEqual(generic, parse(self.html, "https://example.com/1"))
+        self.assertEqual(again.position_title, on_board.position_title)
+        self.assertEqual(sorted(ParseResult.objects.values_list(
+            "board", flat=True)), ["", "greenhouse"])
+
+    def test_new_parser_version_invalidates(self):
+        self.cache.parse(self.html)
+        bumped = ParseCache(max_bytes=10_000, version=PARSER_VERSION + "+1")
+        self.assertIsNone(bumped.get(parse_cache.sha256_of(self.html)))
+        bumped.parse(self.html)
+        self.assertEqual(
+            list(ParseResult.objects.values_list("parser_version", flat=True)),
+            [PARSER_VERSION + "+1"])
+
+    def test_least_recently_used_are_evicted_past_the_budget(self):
+        job = parse(self.html)
+        size = len(json.dumps(job.to_json(), separators=(",", ":")))
+        self.cache.max_bytes = int(size * 2.5)
+        for key in ("a", "b"):
+            self.cache.put(key, job)
+            self.now += timedelta(hours=1)
+        self.cache.get("a")  # a is now more recent than b
+        self.now += timedelta(hours=1)
+        self.cache.put("c", job, board="greenhouse")
+        self.assertEqual(set(ParseResult.objects.values_list("sha256", flat=True)),
+                         {"a", "c"})
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_diagnostics_view(self):
+        client = APIClient()
+        url = "/api/diagnostics/parse-cache/"
+        self.assertEqual(client.get(url).status_code, 403)
+        admin = User.objects.create_superuser("admin", "a@example.com", "pw")
+        client.force_authenticate(admin)
+        with mock.patch.object(parse_cache, "_cache", self.cache):
+            self.cache.parse(self.html)
+            stats = client.get(url).json()
+            self.assertEqual((stats["entries"], stats["misses"]), (1, 1))
+            stats = client.post(url, {}, format="json").json()
+            self.assertEqual(stats["misses"], 0)
+
+
+class StreamingFetchTests(TestCase):
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.addCleanup(self.server.stop)
+        client = fetchers.HttpClient(retries=0)
+        self.addCleanup(client.close)
+        patcher = mock.patch.object(fetchers, "_client", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_hash_and_size_are_computed_while_streaming(self):
+        body = "<html>" + "é" * 1_000_000 + "</html>"
+        encoded = body.encode("utf-8")
+        self.server.script("/big", (200, {"Content-Type": "text/html; charset=utf-8"},
+                                    encoded))
+        with override_settings(FETCH_SPOOL_BYTES=64 * 1024):
+            tracemalloc.start()
+            with fetchers.fetch_job_post(self.server.url("/big")) as page:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.assertEqual(page.size, len(encoded))
+                self.assertEqual(page.sha256, hashlib.sha256(encoded).hexdigest())
+                self.assertEqual(page.text(), body)
+        # 2 MB body read in 64 KB chunks and spooled to disk past 64 KB.
+        self.assertLess(peak, len(encoded) // 4)
+
+    def test_size_cap_aborts_early(self):
+        self.server.script("/huge", (200, {"Content-Type": "text/html"},
+                                     "x" * 2_000_000))
+        with self.assertRaises(fetchers.ResponseTooLarge):
+            fetchers.fetch_job_post(self.server.url("/huge"), max_bytes=100_000)
+
+        # Without (or with a lying) Content-Length it is cut off mid-stream.
+        resp = mock.Mock(url="u", status_code=200,
+                         headers={"content-type": "text/html"})
+        resp.iter_content.return_value = iter([b"x" * 64 * 1024] * 100)
+        with self.assertRaises(fetchers.ResponseTooLarge):
+            fetchers.read_body(resp, max_bytes=100_000)
+        resp.close.assert_called_once()
+
+    def test_non_html_is_rejected_before_the_body(self):
+        self.server.script("/file.pdf", (200, {"Content-Type": "application/pdf"},
+                                         "%PDF" * 1000))
+        with self.assertRaisesMessage(ValueError, "Non-HTML content type"):
+            fetchers.fetch_job_post(self.server.url("/file.pdf"))
+
+    def test_save_job_post_stores_the_streamed_file(self):
+        company = Company.objects.create(name="Acme")
+        job = Job.objects.create(company=company, position_title="Dev")
+        self.server.script("/post", (200, {"Content-Type": "text/html"},
+                                     "<html>stored</html>"))
+        with tempfile.TemporaryDirectory() as tmp, \
+                override_settings(MEDIA_ROOT=tmp):
+            with fetchers.fetch_job_post(self.server.url("/post")) as page:
+                attachment = save_job_post(job, page)
+            self.assertEqual(attachment.size_bytes, 19)
+            self.assertEqual(attachment.mime_type, "text/html")
+            with attachment.file.open("rb") as stored:
+                self.assertEqual(stored.read(), b"<html>stored</html>")
+
+
+class RevalidationTests(TestCase):
+    """Re-fetches are conditional and unchanged bodies are not stored."""
+
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.addCleanup(self.server.stop)
+        client = fetchers.HttpClient(retries=0)
+        self.addCleanup(client.close)
+        patcher = mock.patch.object(fetchers, "_client", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.media = Path(tmp.name)
+        media = override_settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.body = "<html>v1</html>"
+        self.etag = '"v1"'
+        self.seen = []
+        company = Company.objects.create(name="Acme")
+        self.job = Job.objects.create(company=company, position_title="Dev",
+                                      job_post_url=self.server.url("/post"))
+
+    def respond(self, handler):
+        self.seen.append(handler.headers.get("If-None-Match"))
+        headers = {"Content-Type": "text/html"}
+        if self.etag:
+            if handler.headers.get("If-None-Match") == self.etag:
+                return 304, {"ETag": self.etag}, ""
+            headers["ETag"] = self.etag
+        return 200, headers, self.body
+
+    def refresh(self):
+        self.server.script("/post", self.respond)
+        return postings.refresh_job_post(self.job)
+
+    def stored_files(self):
+        return sorted(p.name for p in self.media.rglob("*") if p.is_file())
+
+    def test_unchanged_posts_are_not_rewritten(self):
+        first = self.refresh()
+        self.assertEqual((first.status, first.changed), (200, True))
+        attachment = self.job.attachments.get()
+        self.assertEqual(attachment.etag, '"v1"')
+        files = self.stored_files()
+
+        second = self.refresh()
+        self.assertEqual(self.seen, [None, '"v1"'])
+        self.assertEqual((second.status, second.changed, second.size_bytes),
+                         (304, False, 0))
+        self.assertEqual(second.sha256, first.sha256)
+        self.assertEqual(self.job.attachments.get().pk, attachment.pk)
+        self.assertEqual(self.stored_files(), files)
+
+        # A server without validators still avoids the write, via the hash.
+        self.etag = ""
+        third = self.refresh()
+        self.assertEqual((third.status, third.changed), (200, False))
+        self.assertEqual(self.job.attachments.get().pk, attachment.pk)
+        self.assertEqual(self.stored_files(), files)
+
+    def test_changed_posts_replace_the_stored_copy(self):
+        self.refresh()
+        self.body, self.etag = "<html>v2</html>", '"v2"'
+        log = self.refresh()
+        self.assertEqual((log.status, log.changed), (200, True))
+        attachment = self.job.attachments.get()
+        self.assertEqual(attachment.sha256,
+                         hashlib.sha256(b"<html>v2</html>").hexdigest())
+        self.assertEqual(
+            list(self.job.fetch_logs.order_by("fetched_at").values_list(
+                "changed", flat=True)), [True, True])
+
+    def test_errors_are_logged(self):
+        self.server.script("/post", (500, {}, ""))
+        with self.assertRaises(requests.HTTPError):
+            postings.refresh_job_post(self.job)
+        log = self.job.fetch_logs.get()
+        self.assertEqual((log.status, log.changed, log.closed),
+                         (500, False, False))
+        self.assertIn("500", log.error)
+
+        # A taken-down posting is flagged rather than raised (and retried).
+        self.server.script("/post", (410, {}, ""))
+        log = postings.refresh_job_post(self.job)
+        self.assertEqual((log.status, log.closed), (410, True))
+        self.job.refresh_from_db()
+        self.assertIsNotNone(self.job.posting_closed_at)
+
+    def test_crawl_revalidates_the_board(self):
+        out = io.StringIO()
+        self.server.script("/post", self.respond)
+        call_command("crawl_job_posts", jobs=True, rate=50, stdout=out)
+        self.server.script("/post", self.respond)
+        call_command("crawl_job_posts", jobs=True, rate=50, stdout=out)
+        self.assertEqual(self.seen, [None, '"v1"'])
+        self.assertIn("0 saved, 1 unchanged", out.getvalue())
+        self.assertEqual(
+            list(self.job.fetch_logs.order_by("fetched_at").values_list(
+                "status", "changed")), [(200, True), (304, False)])
+
+
+class RefreshPostingsTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name="Acme")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def job(self, url, **fields):
+        return Job.objects.create(company=self.company, position_title=url,
+                                  job_post_url=url, **fields)
+
+    def test_plan_is_prioritised_and_capped_per_host(self):
+        now = timezone.now()
+        today = timezone.localdate()
+        stale = now - timedelta(days=3)
+        applied = self.job("https://a.test/applied", status="APPLIED")
+        rejected = self.job("https://a.test/rejected", status="NOT_ACCEPTED")
+        deadline = self.job("https://b.test/deadline", status="APPLIED",
+                            date_deadline=today + timedelta(days=2),
+                            posting_checked_at=stale)
+        bookmarked = self.job("https://c.test/new")
+        older = self.job("https://c.test/old", posting_checked_at=stale)
+        for skipped in (self.job("https://a.test/archived", status="ARCHIVED"),
+                        self.job("https://a.test/accepted", status="ACCEPTED"),
+                        self.job("https://a.test/closed", posting_closed_at=now),
+                        self.job("https://a.test/fresh", posting_checked_at=now)):
+            self.assertNotIn(skipped, postings.refresh_queue())
+        Job.objects.create(company=self.company, position_title="No URL")
+
+        plan = postings.plan_refresh(budget=10)
+        self.assertEqual([jobs[0] for jobs in plan.values()],
+                         [deadline, bookmarked, older, applied, rejected])
+        self.assertEqual(
+            list(postings.plan_refresh(budget=10, per_host=1)),
+            [deadline.job_post_url, bookmarked.job_post_url,
+             applied.job_post_url])
+        self.assertEqual(len(postings.plan_refresh(budget=2)), 2)
+
+    def test_closed_reason(self):
+        self.assertEqual(postings.closed_reason(410), "HTTP 410")
+        self.assertEqual(postings.closed_reason(500), "")
+        page = make_page(b"<h1>Sorry, this job is no longer available</h1>",
+                         url="https://boards.greenhouse.io/acme/jobs/1")
+        self.assertIn("no longer available", postings.closed_reason(200, page))
+        page = make_page(b"<h1>Engineer</h1><p>Apply by June</p>",
+                         url="https://boards.greenhouse.io/acme?error=true")
+        self.assertEqual(postings.closed_reason(200, page),
+                         "Redirected to the job board")
+        page = make_page(b"<h1>Engineer</h1><p>Apply by June</p>")
+        self.assertEqual(postings.closed_reason(200, page), "")
+
+    def test_closed_wording_in_a_live_description_is_ignored(self):
+        description = ("<p>" + "You will build our payments platform. " * 20
+                       + "Apply even if you think this role is no longer "
+                       "open: the position has been filled only when the "
+                       "page says so.</p>")
+        page = make_page(("<html><head><title>Engineer at Acme</title>"
+                          "<script>var msg = 'This job has expired';</script>"
+                          "</head><body><h1>Engineer</h1>"
+                          f"{description}</body></html>").encode())
+        self.assertEqual(postings.closed_reason(200, page), "")
+        # The same words in the title or above the fold still count.
+        for html in ("<title>Job not found</title><h1>Acme careers</h1>",
+                     "<nav>Careers</nav><p>This posting has expired.</p>"
+                     + description):
+            with self.subTest(html=html[:40]):
+                self.assertNotEqual(
+                    postings.closed_reason(200, make_page(html.encode())), "")
+
+    def test_command_flags_closed_postings(self):
+        with StandInServer() as server:
+            server.script("/gone", (404, {}, ""))
+            server.script("/filled", (200, {"Content-Type": "text/html"},
+                                      "<p>This position has been filled.</p>"))
+            gone = self.job(server.url("/gone"))
+            filled = self.job(server.url("/filled"))
+            live = self.job(server.url("/live"))
+            out = io.StringIO()
+            call_command("refresh_postings", rate=50, stdout=out)
+            self.assertIn("1 changed, 0 unchanged, 2 closed, 0 failed",
+                          out.getvalue())
+
+            for job in (gone, filled, live):
+                job.refresh_from_db()
+                self.assertIsNotNone(job.posting_checked_at)
+            self.assertIsNotNone(gone.posting_closed_at)
+            self.assertIsNotNone(filled.posting_closed_at)
+            self.assertIsNone(live.posting_closed_at)
+            self.assertFalse(filled.attachments.exists())
+            self.assertTrue(live.attachments.exists())
+            self.assertEqual(filled.fetch_logs.get().closed, True)
+
+            call_command("refresh_postings", rate=50, stdout=out)
+            self.assertIn("No postings are due", out.getvalue())
+            self.assertEqual(server.requests, 3)
+
+
+class CrawlerTests(TestCase):
+    def setUp(self):
+        self.servers = [StandInServer().start() for _ in range(3)]
+        for server in self.servers:
+            self.addCleanup(server.stop)
+
+    def crawl(self, urls, **options):
+        crawler = Crawler(**{"rate": 20, "burst": 1, "per_host": 1, **options})
+        self.addCleanup(crawler.client.close)
+        start = time.perf_counter()
+        results = list(crawler.crawl(urls))
+        return results, time.perf_counter() - start
+
+    def test_throughput_scales_with_hosts_not_urls(self):
+        one_host = [self.servers[0].url(f"/jobs/{n}") for n in range(6)]
+        results, single = self.crawl(one_host)
+        self.assertTrue(all(result.ok for result in results))
+        # 20 req/s with no burst: 6 requests need at least 5 intervals.
+        self.assertGreaterEqual(single, 0.25)
+
+        many_hosts = [server.url(f"/jobs/{n}")
+                      for server in self.servers for n in range(6)]
+        results, multi = self.crawl(many_hosts)
+        self.assertEqual(len(results), 18)
+        self.assertLess(multi, single * 2)
+
+    def test_retry_after_pauses_the_host(self):
+        server = self.servers[0]
+        server.script("/busy", (429, {"Retry-After": "1"}, ""))
+        results, elapsed = self.crawl([server.url("/busy")])
+        self.assertTrue(results[0].ok)
+        self.assertEqual(results[0].attempts, 2)
+        self.assertGreaterEqual(elapsed, 1.0)
+
+        server.script("/gone", (404, {}, ""))
+        server.script("/pdf", (200, {"Content-Type": "application/pdf"}, "%PDF"))
+        results, _ = self.crawl([server.url("/gone"), server.url("/pdf")])
+        self.assertEqual(sorted(result.error for result in results),
+                         ["HTTP 404", "Non-HTML content type: application/pdf"])
+
+    @mock.patch("jobs.postings.save_job_post")
+    def test_command_saves_attachments(self, save):
+        save.return_value.file.name = "attachments/a.html"
+        save.return_value.sha256 = "abc"
+        company = Company.objects.create(name="Acme")
+        job = Job.objects.create(company=company, position_title="A",
+                                 job_post_url=self.servers[0].url("/jobs/1"))
+        with tempfile.TemporaryDirectory() as tmp:
+            url_file = Path(tmp) / "urls.txt"
+            url_file.write_text(self.servers[1].url("/jobs/2") + "\n")
+            out = Path(tmp) / "out"
+            call_command("crawl_job_posts", str(url_file), jobs=True,
+                         output_dir=str(out), rate=50, stdout=io.StringIO())
+            self.assertEqual(len(list(out.iterdir())), 1)
+        save.assert_called_once()
+        self.assertEqual(save.call_args.args[0], job)
+
+
+class JobFromUrlTests(TransactionTestCase):
+    """POST /api/jobs/from-url/ and its time budget (jobs.quick_entry)."""
+
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.addCleanup(self.server.stop)
+        client = fetchers.HttpClient.from_settings()
+        self.addCleanup(client.close)
+        patcher = mock.patch.object(fetchers, "_client", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.html = (SAMPLES_DIR / "greenhouse-gofundme.html").read_text("utf-8")
+        self.client = APIClient()
+        self.intakes = []
+        start = quick_entry.start
+        patcher = mock.patch.object(
+            quick_entry, "start",
+            side_effect=lambda url: self.intakes.append(start(url))
+            or self.intakes[-1])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Background work must end before the test database is flushed.
+        self.addCleanup(lambda: [intake.finished.wait(10)
+                                 for intake in self.intakes])
+
+    def post(self, path="/post"):
+        return self.client.post("/api/jobs/from-url/",
+                                {"url": self.server.url(path)}, format="json")
+
+    def test_creates_job_company_and_attachment(self):
+        company = Company.objects.create(name="GoFundMe, Inc.")
+        self.server.script("/post", (200, {"Content-Type": "text/html"},
+                                     self.html))
+        response = self.post()
+
+        self.assertEqual(response.status_code, 201)
+        job = Job.objects.get()
+        self.assertEqual(response.json()["id"], str(job.id))
+        self.assertEqual(response["Location"], f"/api/jobs/{job.id}/")
+        self.assertEqual(job.company, company)
+        self.assertEqual(job.position_title, "Technical Security Program Intern")
+        self.assertEqual(job.job_post_url, self.server.url("/post"))
+        self.assertIsNotNone(job.posting_checked_at)
+        attachment = Attachment.objects.get(job=job, type="job_post")
+        self.assertEqual(attachment.parsed_sha256, attachment.sha256)
+        self.assertEqual(attachment.parser_version, PARSER_VERSION)
+        self.assertEqual(
+            re.findall(r"(\w+);dur=[\d.]+", response["Server-Timing"]),
+            [*quick_entry.PHASES, "total"])
+
+    def test_partial_result_when_over_budget(self):
+        def slow(handler):
+            time.sleep(0.5)
+            return 200, {"Content-Type": "text/html"}, self.html
+        self.server.script("/post", slow)
+        with override_settings(JOB_FROM_URL_BUDGET=0.1):
+            started = time.perf_counter()
+            response = self.post()
+            self.assertLess(time.perf_counter() - started, 0.4)
+
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertEqual((data["status"], data["done"], data["pending"]),
+                         ("pending", [], list(quick_entry.PHASES)))
+        status_url = f"/api/jobs/from-url/{data['id']}/"
+        self.assertEqual(response["Location"], status_url)
+        self.assertRegex(response["Server-Timing"], r"^total;dur=[\d.]+$")
+        self.assertFalse(Job.objects.exists())
+        response = self.client.get(status_url)
+        self.assertEqual((response.status_code, response.json()),
+                         (202, {"id": data["id"], "status": "pending"}))
+
+        self.assertTrue(self.intakes[0].finished.wait(10))
+        self.assertIsNone(self.intakes[0].error)
+        job = Job.objects.get(pk=data["id"])
+        self.assertEqual(job.company.name, "GoFundMe")
+        self.assertTrue(job.attachments.filter(type="job_post").exists())
+        response = self.client.get(status_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "done")
+        self.assertEqual(response.json()["job"]["id"], data["id"])
+        task = Task.objects.get(pk=data["id"])
+        self.assertEqual(list(task.result["timings_ms"]),
+                         list(quick_entry.PHASES))
+
+    def test_errors(self):
+        self.server.script("/gone", (404, {}, ""))
+        with self.assertLogs("jobs.quick_entry", "WARNING"):
+            response = self.post("/gone")
+        self.assertEqual(response.status_code, 502)
+        self.assertIn("404", response.json()["detail"])
+        self.assertRegex(response["Server-Timing"], r"^total;dur=[\d.]+$")
+        self.assertFalse(Company.objects.exists())
+        # The failure can be read back later too.
+        [intake] = self.intakes
+        response = self.client.get(f"/api/jobs/from-url/{intake.job_id}/")
+        self.assertEqual(response.json(), {
+            "id": str(intake.job_id), "status": "failed",
+            "detail": intake.error})
+        for intake_id in (uuid.uuid4(), "not-a-uuid"):
+            response = self.client.get(f"/api/jobs/from-url/{intake_id}/")
+            self.assertEqual(response.status_code, 404)
+
+        for url in ("ftp://example.com/post", "example.com/post", None):
+            response = self.client.post("/api/jobs/from-url/", {"url": url},
+                                        format="json")
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("url", response.json())
+        self.assertFalse(Job.objects.exists())
+
+    def test_abandoned_intake_is_finished_by_a_worker(self):
+        self.server.script("/post", (200, {"Content-Type": "text/html"},
+                                     self.html))
+        self.server.script("/gone", (404, {}, ""))
+        # Two intakes whose web process died: one had created the job.
+        done, gone = uuid.uuid4(), uuid.uuid4()
+        company = Company.objects.create(name="GoFundMe")
+        Job.objects.create(id=done, company=company, position_title="Intern",
+                           job_post_url=self.server.url("/post"))
+        for job_id, path in ((done, "/post"), (gone, "/gone")):
+            tasks.start(quick_entry.TASK, {"url": self.server.url(path),
+                                           "job_id": str(job_id)},
+                        worker="web:dead", pk=job_id, max_attempts=2)
+        Task.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(tasks.requeue_stale(timeout=60), 2)
+        with self.assertLogs("jobs", "WARNING"):
+            call_command("run_workers", workers=1, once=True,
+                         stdout=io.StringIO())
+
+        response = self.client.get(f"/api/jobs/from-url/{done}/")
+        self.assertEqual(response.json()["status"], "done")
+        job = Job.objects.get()
+        self.assertEqual((job.pk, job.position_title), (done, "Intern"))
+        self.assertEqual(job.attachments.filter(type="job_post").count(), 1)
+        response = self.client.get(f"/api/jobs/from-url/{gone}/").json()
+        self.assertEqual(response["status"], "failed")
+        self.assertRegex(response["detail"], r"^404 Client Error")
+
+    def test_company_names_are_normalized(self):
+        self.assertEqual(quick_entry.normalize_company_name("Acme, Inc."),
+                         "acme")
+        self.assertEqual(quick_entry.normalize_company_name(" ACME  corp "),
+                         "acme")
+        self.assertEqual(quick_entry.normalize_company_name("Co"), "co")
+        acme = Company.objects.create(name="Acme Inc")
+        self.assertEqual(quick_entry.get_or_create_company("acme"),
+                         (acme, False))
+        other, created = quick_entry.get_or_create_company("Acme Labs")
+        self.assertTrue(created)
+        self.assertNotEqual(other, acme)
+        self.assertEqual(other.name_key, "acme labs")
+
+        # Nothing left after normalizing: matched as written.
+        bar, created = quick_entry.get_or_create_company(" | ")
+        self.assertEqual((bar.name, bar.name_key, created), ("|", "|", True))
+        self.assertEqual(quick_entry.get_or_create_company("|"), (bar, False))
+        with self.assertRaises(ValueError):
+            quick_entry.get_or_create_company("  ")
+
+    def test_concurrent_create_returns_the_winner(self):
+        winner = Company.objects.create(name="Globex", name_key="globex")
+        # As if another request created it after this one looked.
+        with mock.patch.object(Company.objects, "filter",
+                               return_value=Company.objects.none()):
+            self.assertEqual(quick_entry.get_or_create_company("Globex Corp"),
+                             (winner, False))
+        self.assertEqual(Company.objects.count(), 1)
+
+    def test_unusable_company_name_falls_back_to_host(self):
+        self.server.script("/post", (200, {"Content-Type": "text/html"},
+                                     "<h1>Dev</h1>"))
+        with mock.patch.object(quick_entry, "cached_parse",
+                               return_value=ParsedJob(position_title="Dev",
+                                                      company="|")):
+            response = self.post()
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Job.objects.get().company.name, "127.0.0.1")
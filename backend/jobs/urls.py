@@ -1,11 +1,28 @@
-from django.urls import path
+from django.urls import path, re_path
 from rest_framework.routers import DefaultRouter
 from .views import JobViewSet, CompanyViewSet, AttachmentViewSet
-from .views import csrf as csrf_view
+from .views import csrf as csrf_view, fetch_hosts, parse_cache_stats
+from .renderers import CSVRenderer, NDJSONRenderer
 
 router = DefaultRouter()
 router.register(r'jobs', JobViewSet)
 router.register(r'companies', CompanyViewSet)
 router.register(r"attachments", AttachmentViewSet, basename="attachment")
 
-urlpatterns = router.urls + [path("csrf/", csrf_view, name="csrf")]
+
+def export_view(viewset):
+    return viewset.as_view({"get": "export"},
+                           renderer_classes=[CSVRenderer, NDJSONRenderer])
+
+
+# Streamed exports; routed by hand so the URL has no trailing slash.
+urlpatterns = [
+    re_path(r"^jobs/export\.(?P<export_format>csv|ndjson)$",
+            export_view(JobViewSet), name="job-export"),
+    re_path(r"^companies/export\.(?P<export_format>csv|ndjson)$",
+            export_view(CompanyViewSet), name="company-export"),
+] + router.urls + [
+    path("csrf/", csrf_view, name="csrf"),
+    path("diagnostics/fetch-hosts/", fetch_hosts, name="fetch-hosts"),
+    path("diagnostics/parse-cache/", parse_cache_stats, name="parse-cache"),
+]
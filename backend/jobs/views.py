@@ -1,10 +1,28 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.http import JsonResponse
-from rest_framework import viewsets
-from rest_framework.decorators import action
+from django.urls import reverse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers)
+from django.utils.http import http_date
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from .models import Job, Company, Attachment
+from .models import Job, Company, Attachment, Task
 from .serializers import JobSerializer, CompanySerializer, AttachmentSerializer
+from .pagination import JobPagination, CompanyPagination, AttachmentPagination
+from .fast_serializers import ValuesSerializer
+from .filters import JobFilterSet
+from .search import search as search_jobs
+from .stats import get_stats as get_job_stats
+from . import bulk, export, fetchers, parse_cache, quick_entry
 
 
 @ensure_csrf_cookie
@@ -12,24 +30,383 @@ def csrf(request):
     return JsonResponse({"detail": "CSRF cookie set"})
 
 
-class JobViewSet(viewsets.ModelViewSet):
-    queryset = Job.objects.select_related("company").all()
+@api_view(["GET", "POST"])
+@permission_classes([IsAdminUser])
+def fetch_hosts(request):
+    """
+    Rate limit and circuit breaker state of each host fetched by this
+    process (see ``jobs.fetchers.HostGuard``). POST ``{"host": ...}`` to
+    reset one host, or ``{}`` to reset them all.
+    """
+    guard = fetchers.get_client().guard
+    if guard is None:
+        return Response({"hosts": []})
+    if request.method == "POST":
+        guard.reset(request.data.get("host") or None)
+    return Response({"hosts": guard.snapshot()})
+
+
+@api_view(["GET", "POST"])
+@permission_classes([IsAdminUser])
+def parse_cache_stats(request):
+    """
+    Size and hit/miss counters of the parse result cache (counters are per
+    process; see ``jobs.parse_cache``). POST ``{}`` to reset the counters,
+    or ``{"evict": true}`` to run eviction now.
+    """
+    cache = parse_cache.get_cache()
+    if request.method == "POST":
+        if request.data.get("evict"):
+            cache.evict()
+        else:
+            cache.reset_counters()
+    return Response(cache.stats())
+
+
+def _job_queryset(queryset, request, extra_fields=()):
+    """
+    Trim a Job queryset to what ``JobSerializer`` will render for ``request``.
+
+    Without ``?fields=``/``?expand=`` the full nested representation is
+    loaded. Otherwise only the requested columns (plus ``id`` and any
+    ``extra_fields`` such as the pagination keys) are selected, and the
+    company join / attachments prefetch only happen when expanded.
+    """
+    fieldset = JobSerializer.get_sparse_fieldset(request)
+    if fieldset is None:
+        return queryset.select_related("company").prefetch_related("attachments")
+
+    fields, expand = fieldset
+    if "company" in expand:
+        queryset = queryset.select_related("company")
+    if "attachments" in expand:
+        queryset = queryset.prefetch_related("attachments")
+    if fields is not None:
+        concrete = {f.name for f in Job._meta.concrete_fields}
+        load = {"id", *extra_fields}
+        load.update(name for name in fields if name in concrete)
+        load.update(name for name in expand if name in concrete)
+        queryset = queryset.only(*load)
+    return queryset
+
+
+def _validators(request, queryset, timestamps):
+    """
+    Compute ``(etag, last_modified)`` for the rows of ``queryset`` with one
+    aggregate query: row count plus ``Max()`` of each timestamp field.
+
+    The ETag also covers the full request path (filters, cursor, fields) and
+    the negotiated media type, since those change the representation.
+    """
+    stats = queryset.order_by().aggregate(
+        _count=Count("pk"),
+        **{f"_max{i}": Max(field) for i, field in enumerate(timestamps)},
+    )
+    stamps = [stats[f"_max{i}"] for i in range(len(timestamps))]
+    present = [stamp for stamp in stamps if stamp is not None]
+    last_modified = max(present) if present else None
+
+    renderer = getattr(request, "accepted_media_type", "")
+    key = "|".join([
+        request.get_full_path(),
+        renderer,
+        str(stats["_count"]),
+        *(stamp.isoformat() if stamp else "-" for stamp in stamps),
+    ])
+    etag = '"%s"' % hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return etag, last_modified
+
+
+def _conditional(request, queryset, timestamps, respond):
+    """
+    Answer 304 Not Modified if the client's ``If-None-Match`` /
+    ``If-Modified-Since`` still match, otherwise call ``respond()`` and
+    attach the validators to its response.
+    """
+    try:
+        etag, last_modified = _validators(request, queryset, timestamps)
+    except (ValidationError, ValueError):
+        # Malformed lookup values; let the normal path produce the error.
+        return respond()
+
+    last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=last_modified_ts)
+    if not_modified is not None:
+        return not_modified
+
+    response = respond()
+    if response.status_code == 200:
+        response["ETag"] = etag
+        if last_modified_ts is not None:
+            response["Last-Modified"] = http_date(last_modified_ts)
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Accept"])
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Strong ETag / Last-Modified on ``list`` and ``retrieve``. Validators come
+    from ``conditional_timestamps`` (``updated_at`` and friends) plus the row
+    count, so a 304 costs one aggregate query and no serialization.
+    """
+
+    conditional_timestamps = ("updated_at",)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return _conditional(
+            request, queryset, self.conditional_timestamps,
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]})
+        return _conditional(
+            request, queryset, self.conditional_timestamps,
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs))
+
+
+class FastListMixin:
+    """
+    Serve ``list`` from ``values()`` rows through a compiled
+    ``ValuesSerializer`` instead of instantiating models and running DRF
+    field objects per row. Falls back to the regular path whenever the
+    serializer uses a field the fast path can't reproduce exactly.
+    """
+
+    fast_list = True
+    # Read by FastJSONRenderer: payload contains JSON primitives only.
+    primitive_payload = False
+
+    def list(self, request, *args, **kwargs):
+        plan = ValuesSerializer.compile(
+            self.get_serializer()) if self.fast_list else None
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = self.paginator.get_ordering(
+            request, queryset, self) if self.paginator else ()
+        rows = plan.values(
+            queryset, extra=[field for field, _, _ in ordering])
+
+        self.primitive_payload = True
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.build(page))
+        return Response(plan.build(rows))
+
+
+class ExportMixin:
+    """
+    ``export`` streams every row matching the list filters/ordering as CSV
+    or NDJSON (see ``jobs.export``). Routed in ``jobs.urls`` as
+    ``<prefix>/export.csv`` and ``<prefix>/export.ndjson``.
+    """
+
+    export_spec = None
+    export_filename = None
+
+    def export(self, request, export_format=None):
+        queryset = self.filter_queryset(self.queryset.all())
+        return export.stream(queryset, self.export_spec, export_format,
+                             self.export_filename)
+
+
+class JobViewSet(ConditionalGetMixin, FastListMixin, ExportMixin,
+                 viewsets.ModelViewSet):
+    # company and attachments are nested in JobSerializer; get_queryset loads
+    # them up front so list and detail run a fixed number of queries.
+    queryset = Job.objects.all()
     serializer_class = JobSerializer
+    pagination_class = JobPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = JobFilterSet
+    ordering_fields = [
+        "priority",
+        "status",
+        "position_title",
+        "salary_min",
+        "salary_max",
+        "date_deadline",
+        "date_applied",
+        "date_posted",
+        "created_at",
+        "updated_at",
+    ]
+    ordering = ["-priority"]
+    # Nested company edits change a job's representation too, and so does
+    # every posting check (jobs.postings stamps posting_checked_at without
+    # touching updated_at).
+    conditional_timestamps = ("updated_at", "company__updated_at",
+                              "posting_checked_at")
+    export_spec = export.JOB_EXPORT
+    export_filename = "jobs"
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        ordering = self.paginator.get_ordering(
+            self.request, queryset, self) if self.paginator else ()
+        return _job_queryset(queryset, self.request,
+                             extra_fields=[field for field, _, _ in ordering])
+
+    # /api/jobs/search/?q=kubernetes&limit=20
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+        except ValueError:
+            limit = 20
+        hits = search_jobs(request.query_params.get("q", ""), limit=limit)
 
+        jobs = Job.objects.filter(pk__in=[pk for pk, _, _ in hits]).values(
+            "id", "position_title", "status", "company_id", "company__name")
+        by_id = {job["id"]: job for job in jobs}
+        results = []
+        for pk, rank, snippet in hits:
+            job = by_id.get(pk)
+            if job is None:
+                continue
+            results.append({
+                "id": str(pk),
+                "position_title": job["position_title"],
+                "status": job["status"],
+                "company": {"id": str(job["company_id"]),
+                            "name": job["company__name"]},
+                "rank": rank,
+                "snippet": snippet,
+            })
+        return Response({"results": results})
 
-class CompanyViewSet(viewsets.ModelViewSet):
+    # /api/jobs/stats/ - pipeline analytics, cached until jobs change
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def stats(self, request):
+        return Response(get_job_stats())
+
+    # POST   /api/jobs/bulk/  [{...}, ...] or {"items": [{...}, ...]}
+    # PATCH  /api/jobs/bulk/  {"ids"|"filter": ..., "changes": {...}}
+    #                         or {"items": [{"id": ..., <field>: ...}, ...]}
+    # DELETE /api/jobs/bulk/  {"ids"|"filter": ...}
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request):
+        data = request.data
+        items = data.get("items") if isinstance(data, dict) else data
+        ids = bulk.create_jobs(items, self.get_serializer_context())
+        return Response({"created": len(ids), "ids": [str(pk) for pk in ids]},
+                        status=status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        context = self.get_serializer_context()
+        if "items" in request.data:
+            ids = bulk.update_job_items(request.data["items"], context)
+            return Response({"updated": len(ids),
+                             "ids": [str(pk) for pk in ids]})
+        queryset = bulk.select_jobs(request.data)
+        count = bulk.update_jobs(queryset, request.data.get("changes"), context)
+        return Response({"updated": count})
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request):
+        count = bulk.delete_jobs(bulk.select_jobs(request.data))
+        return Response({"deleted": count})
+
+    # POST /api/jobs/from-url/  {"url": ...}
+    # 201 with the job when everything finished within JOB_FROM_URL_BUDGET,
+    # else 202 with what is done so far (the rest finishes in the
+    # background) and the intake's status URL in Location. Phase
+    # durations are in the Server-Timing header.
+    @action(detail=False, methods=["post"], url_path="from-url")
+    def from_url(self, request):
+        start = time.perf_counter()
+        intake = quick_entry.start(request.data.get("url"))
+        finished = intake.wait(
+            settings.JOB_FROM_URL_BUDGET - (time.perf_counter() - start))
+        job_created = "job" in intake.timings
+
+        if finished and intake.error:
+            data = {"detail": intake.error}
+            if job_created:
+                data["id"] = str(intake.job_id)
+            response = Response(data, status=status.HTTP_502_BAD_GATEWAY)
+        elif finished:
+            response = Response(
+                self._job_data(intake.job_id), status=status.HTTP_201_CREATED,
+                headers={"Location": reverse("job-detail",
+                                             args=[intake.job_id])})
+        else:
+            data = {"id": str(intake.job_id), "status": "pending",
+                    "done": intake.done, "pending": intake.pending}
+            if intake.parsed is not None:
+                data["parsed"] = intake.parsed.to_json()
+                data["parsed"].pop("structured", None)
+            if job_created:
+                data["job"] = self._job_data(intake.job_id)
+            response = Response(
+                data, status=status.HTTP_202_ACCEPTED,
+                headers={"Location": reverse("job-from-url-status",
+                                             args=[intake.job_id])})
+        response["Server-Timing"] = intake.server_timing(
+            (time.perf_counter() - start) * 1000)
+        return response
+
+    # GET /api/jobs/from-url/<id>/
+    # How a from-url intake that outlived its request ended: 202 while it
+    # runs, else 200 with status "done" and the job, or "failed" and why.
+    @action(detail=False, methods=["get"],
+            url_path=r"from-url/(?P<intake_id>[0-9a-fA-F-]+)")
+    def from_url_status(self, request, intake_id=None):
+        task = quick_entry.intake_task(intake_id)
+        if task is None:
+            return Response({"detail": "No such job intake."},
+                            status=status.HTTP_404_NOT_FOUND)
+        data = {"id": str(task.pk), "status": "pending"}
+        if task.status == Task.Status.FAILED:
+            data.update(status="failed", detail=quick_entry.task_error(task))
+        elif task.status == Task.Status.SUCCEEDED:
+            data["status"] = "done"
+        if Job.objects.filter(pk=task.pk).exists():
+            data["job"] = self._job_data(task.pk)
+        return Response(data, status=status.HTTP_202_ACCEPTED
+                        if data["status"] == "pending" else status.HTTP_200_OK)
+
+    def _job_data(self, pk):
+        job = _job_queryset(Job.objects.all(), self.request).get(pk=pk)
+        return self.get_serializer(job).data
+
+
+class CompanyViewSet(ConditionalGetMixin, FastListMixin, ExportMixin,
+                     viewsets.ModelViewSet):
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
+    pagination_class = CompanyPagination
+    export_spec = export.COMPANY_EXPORT
+    export_filename = "companies"
 
     # /api/companies/<uuid:id>/jobs/
     @action(detail=True, methods=["get"])
     def jobs(self, request, pk=None):
         company = self.get_object()
+        paginator = JobPagination()
         jobs = Job.objects.filter(company=company)
-        serializer = JobSerializer(jobs, many=True)
-        return Response(serializer.data)
+
+        def respond():
+            ordering = paginator.get_ordering(request, jobs, None)
+            queryset = _job_queryset(
+                jobs, request, extra_fields=[field for field, _, _ in ordering])
+            page = paginator.paginate_queryset(queryset, request)
+            serializer = JobSerializer(
+                page, many=True, context=self.get_serializer_context())
+            return paginator.get_paginated_response(serializer.data)
+
+        return _conditional(request, jobs, JobViewSet.conditional_timestamps,
+                            respond)
 
 
 class AttachmentViewSet(viewsets.ModelViewSet):
     queryset = Attachment.objects.all()
     serializer_class = AttachmentSerializer
+    pagination_class = AttachmentPagination
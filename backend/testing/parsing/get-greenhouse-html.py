@@ -1,3 +1,7 @@
+# Sequential reference script. For concurrent, per-host rate-limited
+# crawling use: python manage.py crawl_job_posts testing/parsing/url-list.txt \
+#     --output-dir testing/parsing/samples
+
 import requests
 import os
 import re
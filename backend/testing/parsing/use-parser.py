@@ -1,7 +1,12 @@
 import os
-from parse_core import parse_core
+import sys
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# jobs.parsing lives in the Django backend two levels up.
+sys.path.insert(0, os.path.dirname(os.path.dirname(BASE_DIR)))
+
+from jobs.parsing import parse  # noqa: E402
+
 SAMPLES_DIR = os.path.join(BASE_DIR, "samples")
 OUTPUT_FILE = os.path.join(SAMPLES_DIR, "parsed.txt")
 
@@ -49,7 +54,7 @@ if __name__ == "__main__":
             with open(file_path, "r", encoding="utf-8") as f:
                 html = f.read()
 
-            parsed = parse_core(html)
+            parsed = parse(html).as_dict()
 
             out.write("=" * 70 + "\n")
             out.write(f"Parsed file: {os.path.basename(file_path)}\n")
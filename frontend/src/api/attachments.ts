@@ -1,5 +1,6 @@
 import { api } from "./client";
 import type { Attachment } from "../types/attachment";
+import { getAllPages } from "./pagination";
 
 export async function uploadAttachment(
   jobId: string,
@@ -18,8 +19,7 @@ export async function uploadAttachment(
 }
 
 export async function getAttachments(): Promise<Attachment[]> {
-  const { data } = await api.get<Attachment[]>("/attachments/");
-  return data;
+  return getAllPages<Attachment>("/attachments/");
 }
 
 export async function deleteAttachment(id: string): Promise<void> {
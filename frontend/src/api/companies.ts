@@ -1,10 +1,10 @@
 import { api } from "./client";
 import type { Company } from "../types/company";
 import type { Job } from "../types/job";
+import { getAllPages } from "./pagination";
 
 export async function getCompanies(): Promise<Company[]> {
-  const res = await api.get<Company[]>("/companies/");
-  return res.data;
+  return getAllPages<Company>("/companies/");
 }
 
 export async function getCompanyById(id: string): Promise<Company> {
@@ -14,8 +14,7 @@ export async function getCompanyById(id: string): Promise<Company> {
 
 // Assuming your DRF Company serializer nests jobs or you have an endpoint for this:
 export async function getCompanyJobs(id: string): Promise<Job[]> {
-  const res = await api.get<Job[]>(`/companies/${id}/jobs/`);
-  return res.data;
+  return getAllPages<Job>(`/companies/${id}/jobs/`);
 }
 
 export async function deleteCompany(id: string): Promise<void> {
@@ -1,8 +1,37 @@
 import { api } from "./client";
-import type { Job } from "../types/job";
+import { JOB_TABLE_COLUMNS, type Job } from "../types/job";
+import type { Paginated } from "../types/pagination";
 
-export async function getJobs(): Promise<Job[]> {
-  const res = await api.get<Job[]>("/jobs/");
+// Columns rendered by JobTable; the API only selects and returns these.
+const JOB_TABLE_FIELDS = ["id", ...JOB_TABLE_COLUMNS].join(",");
+
+// Rows per page of the job list.
+export const JOB_PAGE_SIZE = 50;
+
+export interface JobQuery {
+  search?: string;
+  status?: string | null;
+}
+
+// One page of the job list, searched and filtered by the backend. Pass a
+// page's `next`/`previous` URL as `pageUrl` to move through the results; it
+// already carries the query.
+export async function getJobs(
+  query: JobQuery,
+  pageUrl?: string | null
+): Promise<Paginated<Job>> {
+  if (pageUrl) {
+    const res = await api.get<Paginated<Job>>(pageUrl);
+    return res.data;
+  }
+  const params: Record<string, string | number> = {
+    fields: JOB_TABLE_FIELDS,
+    expand: "company",
+    page_size: JOB_PAGE_SIZE,
+  };
+  if (query.search?.trim()) params.search = query.search.trim();
+  if (query.status) params.status = query.status;
+  const res = await api.get<Paginated<Job>>("/jobs/", { params });
   return res.data;
 }
 
@@ -24,3 +53,22 @@ export async function updateJob(id: string, data: Partial<Job>): Promise<Job> {
   const res = await api.put<Job>(`/jobs/${id}/`, data);
   return res.data;
 }
+
+// Apply the same changes to many jobs in one request (single transaction).
+export async function bulkUpdateJobs(
+  ids: string[],
+  changes: Partial<Job>
+): Promise<number> {
+  const res = await api.patch<{ updated: number }>("/jobs/bulk/", {
+    ids,
+    changes,
+  });
+  return res.data.updated;
+}
+
+export async function bulkDeleteJobs(ids: string[]): Promise<number> {
+  const res = await api.delete<{ deleted: number }>("/jobs/bulk/", {
+    data: { ids },
+  });
+  return res.data.deleted;
+}
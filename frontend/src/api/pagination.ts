@@ -0,0 +1,25 @@
+import { api } from "./client";
+import type { Paginated } from "../types/pagination";
+
+// Largest page the backend serves (KeysetCursorPagination.max_page_size).
+export const MAX_PAGE_SIZE = 500;
+
+// Fetch every row of a paginated list endpoint by following `next` until it
+// is null. `params` go on the first request; the `next` URLs carry them on.
+export async function getAllPages<T>(
+  url: string,
+  params: Record<string, string | number> = {}
+): Promise<T[]> {
+  const results: T[] = [];
+  let page = (
+    await api.get<Paginated<T>>(url, {
+      params: { page_size: MAX_PAGE_SIZE, ...params },
+    })
+  ).data;
+  results.push(...page.results);
+  while (page.next) {
+    page = (await api.get<Paginated<T>>(page.next)).data;
+    results.push(...page.results);
+  }
+  return results;
+}
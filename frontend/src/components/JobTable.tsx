@@ -2,22 +2,9 @@ import { useState, useMemo } from "react";
 import { Table, Badge, Group, Text } from "@mantine/core";
 import { ArrowUp, ArrowDown } from "phosphor-react";
 import { useNavigate } from "react-router-dom";
-import type { Job } from "../types/job";
+import type { Job, JobTableColumn } from "../types/job";
 
-type SortKey =
-  | "position_title"
-  | "company"
-  | "status"
-  | "priority"
-  | "location"
-  | "is_remote"
-  | "salary_min"
-  | "salary_max"
-  | "date_posted"
-  | "date_applied"
-  | "date_follow_up"
-  | "date_deadline"
-  | "updated_at";
+type SortKey = JobTableColumn;
 
 interface JobTableProps {
   jobs: Job[];
@@ -13,10 +13,12 @@ import {
   Popover,
   Checkbox,
 } from "@mantine/core";
+import { useDebouncedValue } from "@mantine/hooks";
 import { MagnifyingGlass } from "phosphor-react";
-import { useQuery } from "@tanstack/react-query";
+import { keepPreviousData, useQuery } from "@tanstack/react-query";
 import { getJobs } from "../api/jobs";
 import JobTable from "../components/JobTable";
+import { JOB_TABLE_COLUMNS } from "../types/job";
 import { useNavigate } from "react-router-dom";
 
 export default function JobPage() {
@@ -24,32 +26,29 @@ export default function JobPage() {
   const [search, setSearch] = useState("");
   const [statusFilter, setStatusFilter] = useState<string | null>(null);
   const [columnsPopoverOpened, setColumnsPopoverOpened] = useState(false);
+  // next/previous URL of the page being shown; null is the first page.
+  const [pageUrl, setPageUrl] = useState<string | null>(null);
+  const [debouncedSearch] = useDebouncedValue(search, 300);
 
-  // 🔥 Fetch data with React Query
-  const {
-    data: jobs = [],
-    isLoading,
-    isError,
-  } = useQuery({
-    queryKey: ["jobs"],
-    queryFn: getJobs,
+  // 🔥 Fetch one page with React Query; the backend searches and filters
+  const { data, isLoading, isError, isFetching } = useQuery({
+    queryKey: ["jobs", debouncedSearch, statusFilter, pageUrl],
+    queryFn: () =>
+      getJobs({ search: debouncedSearch, status: statusFilter }, pageUrl),
+    placeholderData: keepPreviousData,
   });
+  const jobs = data?.results ?? [];
+
+  // A new search or filter starts again from the first page.
+  const [lastQuery, setLastQuery] = useState([debouncedSearch, statusFilter]);
+  if (lastQuery[0] !== debouncedSearch || lastQuery[1] !== statusFilter) {
+    setLastQuery([debouncedSearch, statusFilter]);
+    setPageUrl(null);
+  }
 
   // ✅ column visibility state
   const [visibleColumns, setVisibleColumns] = useState<string[]>([
-    "position_title",
-    "company",
-    "status",
-    "priority",
-    "location",
-    "is_remote",
-    "salary_min",
-    "salary_max",
-    "date_posted",
-    "date_applied",
-    "date_follow_up",
-    "date_deadline",
-    "updated_at",
+    ...JOB_TABLE_COLUMNS,
   ]);
 
   const toggleColumn = (col: string) => {
@@ -72,14 +71,6 @@ export default function JobPage() {
     { key: "updated_at", label: "Last Updated" },
   ];
 
-  const filteredJobs = jobs.filter((job) => {
-    const matchesSearch =
-      job.position_title.toLowerCase().includes(search.toLowerCase()) ||
-      job.company.name.toLowerCase().includes(search.toLowerCase());
-    const matchesStatus = !statusFilter || job.status === statusFilter;
-    return matchesSearch && matchesStatus;
-  });
-
   if (isLoading)
     return (
       <Center mt="xl">
@@ -183,7 +174,26 @@ export default function JobPage() {
       {/* =========================
           Job Table
       ========================== */}
-      <JobTable jobs={filteredJobs} visibleColumns={visibleColumns} />
+      <JobTable jobs={jobs} visibleColumns={visibleColumns} />
+
+      <Group justify="flex-end" mt="md">
+        <Button
+          variant="default"
+          size="xs"
+          disabled={!data?.previous || isFetching}
+          onClick={() => setPageUrl(data?.previous ?? null)}
+        >
+          Previous
+        </Button>
+        <Button
+          variant="default"
+          size="xs"
+          disabled={!data?.next || isFetching}
+          onClick={() => setPageUrl(data?.next ?? null)}
+        >
+          Next
+        </Button>
+      </Group>
     </Container>
   );
 }
@@ -27,4 +27,7 @@ export interface Company {
     | "5001-10000"
     | "10001+"
     | null;
+
+  // Metadata
+  updated_at?: string;
 }
@@ -75,7 +75,28 @@ export interface Job {
   created_at: string;
   updated_at: string;
   archived_at?: string | null;
+  posting_checked_at?: string | null;
+  posting_closed_at?: string | null;
 
   // Associated
   attachments?: Attachment[];
 }
+
+/** Columns JobTable can render (and sort by), in display order. */
+export const JOB_TABLE_COLUMNS = [
+  "position_title",
+  "company",
+  "status",
+  "priority",
+  "location",
+  "is_remote",
+  "salary_min",
+  "salary_max",
+  "date_posted",
+  "date_applied",
+  "date_follow_up",
+  "date_deadline",
+  "updated_at",
+] as const;
+
+export type JobTableColumn = (typeof JOB_TABLE_COLUMNS)[number];
@@ -0,0 +1,9 @@
+/**
+ * Envelope returned by the backend's keyset (cursor) paginated list endpoints.
+ * `next` / `previous` are full URLs carrying an opaque `cursor` parameter.
+ */
+export interface Paginated<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}